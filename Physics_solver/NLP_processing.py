@@ -1,46 +1,108 @@
 import re
+from collections import namedtuple
+from Physics_solver.template_library import TemplateLibrary, default_library
+
+
+class NoTemplateError(ValueError):
+    """Raised when no equation template fits a sentence."""
+
+
+# A keyword found in the sentence, with the number and unit text that follow it (or None).
+Token = namedtuple("Token", ["keyword", "number", "unit", "span"])
+
+# Number with any unit stuck to it, e.g. "10kg", "3e8m/s", "2m/s^2".
+VALUE_PATTERN = r"(?P<number>[+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(?P<unit>[a-z/^\d]*)"
+
+
+def _trie_pattern(words) -> str:
+    """
+    Builds a regex alternation with shared prefixes factored out
+    ("mass|magnet" -> "ma(?:ss|gnet)"), so matching a keyword costs about its
+    length at each position no matter how many keywords there are.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def to_pattern(node):
+        ends_here = "" in node
+        branches = [re.escape(char) + to_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            return "(?:" + body + ")?"
+        return body
+
+    return to_pattern(trie)
+
+
+def build_lexer(keywords):
+    """
+    Compiles the single-pass tokenizer for a keyword vocabulary: a keyword on
+    word boundaries, optionally followed by "is" or "=" and a value.
+    """
+    alternation = _trie_pattern(keywords) or "(?!)"  # an empty vocabulary matches nothing
+    return re.compile(
+        rf"(?<![a-z_])(?P<keyword>{alternation})(?![a-z_])"
+        rf"(?:\s*(?:is(?![a-z_])|=)?\s*{VALUE_PATTERN})?"
+    )
 
 class NLPProcessor:
-    def __init__(self):
-        # Map natural language terms to variable names
-        self.keyword_to_var = {
-            "mass": "m",
-            "acceleration": "a",
-            "force": "f",
-            "velocity": "v",
-            "speed": "v",
-            "displacement": "s",
-            "time": "t",
-            "energy": "e",
-            "power": "p",
-            "voltage": "v",
-            "current": "i",
-            "resistance": "r"
-        }
-
-        # Known equation templates
-        self.templates = {
-            frozenset(["force", "mass", "acceleration"]): "f = m * a",
-            frozenset(["energy", "mass", "speed"]): "e = m * v ** 2",  # e = mc²
-            frozenset(["voltage", "current", "resistance"]): "v = i * r",
-            frozenset(["power", "energy", "time"]): "p = e / t"
-        }
+    def __init__(self, library: TemplateLibrary = None):
+        # Equation templates and the keyword -> variable map come from a data file
+        self.library = library if library is not None else default_library()
+        self.keyword_to_var = dict(self.library.keyword_to_var)
+
+        self.rebuild_lexer()
+
+    def rebuild_lexer(self):
+        """Recompiles the tokenizer; call this after changing keyword_to_var."""
+        self.lexer = build_lexer(self.keyword_to_var)
+        self._keyword_order = {keyword: index for index, keyword in enumerate(self.keyword_to_var)}
+
+    def tokenize(self, sentence: str):
+        """
+        Walks the (lowercased) sentence once and yields a Token for every keyword.
+        A keyword picks up the number right after it, optionally with "is" or "="
+        in between, e.g. "mass is 10kg" or "speed = 3e8m/s".
+        """
+        for match in self.lexer.finditer(sentence):
+            yield Token(match.group("keyword"), match.group("number"), match.group("unit"), match.span())
+
+    def detect_keywords(self, sentence: str) -> set:
+        return {token.keyword for token in self.tokenize(sentence.lower())}
+
+    def match_templates(self, sentence: str, limit: int = 3) -> list:
+        """
+        The best few templates for a sentence, complete or not. Useful for
+        suggesting what is missing when parse() finds no equation.
+        """
+        return self.library.match(self.detect_keywords(sentence), limit)
 
     def parse(self, sentence: str):
         sentence = sentence.lower()
         values = {}
 
-        # Extract values like "mass is 10kg", "speed is 3e8m/s"
-        for keyword, var in self.keyword_to_var.items():
-            match = re.search(rf"{keyword}\s*(?:is|=)?\s*([\d\.eE+-]+(?:[a-zA-Z/^\d]*))", sentence)
-            if match:
-                values[var] = match.group(1).strip()
+        # Extract values like "mass is 10kg", "speed is 3e8m/s".
+        # The first value after each keyword counts.
+        detected_keywords = set()
+        keyword_values = {}
+        for token in self.tokenize(sentence):
+            detected_keywords.add(token.keyword)
+            if token.number is not None and token.keyword not in keyword_values:
+                keyword_values[token.keyword] = token.number + token.unit
 
-        # Detect keywords to match an equation
-        detected_keywords = set(k for k in self.keyword_to_var if k in sentence)
+        # When two keywords map to one variable the later one in keyword_to_var wins.
+        for keyword in sorted(keyword_values, key=self._keyword_order.get):
+            values[self.keyword_to_var[keyword]] = keyword_values[keyword]
 
-        for keyset, equation in self.templates.items():
-            if keyset.issubset(detected_keywords):
-                return equation, values
+        # Detect keywords to match an equation
+        match = self.library.best(detected_keywords, values)
+        if match:
+            return match.template.equation, values
 
         return None, values
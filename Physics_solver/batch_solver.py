@@ -0,0 +1,96 @@
+import numpy as np
+from Physics_solver.compiled_equation import CompiledEquation
+from Physics_solver.fast_engine import FastPathUnavailable, output_unit, to_dimension_vector
+from Physics_solver.numeric_solver import solve_numeric_batch
+from Physics_solver.physical_constants import check_shadowing
+from Physics_solver.rearrange import NotIsolableError
+from Physics_solver.unit_store import convert_value, default_units
+from Physics_solver.units import get_registry
+
+
+def column_to_quantity(var: str, column):
+    """
+    Turns one column of knowns into a single pint Quantity wrapping a float array.
+
+    A column can be:
+      - a NumPy array or list of numbers, taken to be in the variable's default unit
+      - a (values, unit) pair, e.g. (np.array([1, 2]), "km/h")
+      - a list of value+unit strings such as ["10kg", "2500 g"]
+    """
+    ureg = get_registry()
+    if isinstance(column, tuple) and len(column) == 2 and isinstance(column[1], str):
+        values, unit = column
+        return ureg.Quantity(np.asarray(values, dtype=float), unit)
+
+    if len(column) and isinstance(column[0], str):
+        return _strings_to_quantity(var, column)
+
+    unit = default_units.get(var, "dimensionless")
+    return ureg.Quantity(np.asarray(column, dtype=float), unit)
+
+
+def _strings_to_quantity(var: str, column):
+    """
+    Parses value+unit strings, then converts every distinct unit to the unit of
+    the first entry with one vectorized conversion per unit.
+    """
+    magnitudes = np.empty(len(column), dtype=float)
+    groups = {}
+    for index, raw in enumerate(column):
+        magnitude, unit = convert_value(var, raw)
+        magnitudes[index] = magnitude
+        groups.setdefault(str(unit), []).append(index)
+
+    ureg = get_registry()
+    target = next(iter(groups))
+    for unit, indices in groups.items():
+        if unit != target:
+            indices = np.asarray(indices)
+            converted = ureg.Quantity(magnitudes[indices], unit).to(target)
+            magnitudes[indices] = converted.magnitude
+    return ureg.Quantity(magnitudes, target)
+
+
+def solve_batch(compiled: CompiledEquation, knowns_columns: dict, unit: str = None):
+    """
+    Evaluates a compiled equation over whole columns of knowns at once.
+    Units are handled once per column and the arithmetic is one NumPy expression.
+    Returns (values, unit): a float array of the unknown and the unit it is in.
+    """
+    columns = {var.lower(): column for var, column in knowns_columns.items()}
+    check_shadowing(compiled.parser.constants, columns)
+    missing = [var for var in dict.fromkeys(compiled.parser.variables) if var not in columns]
+    if len(missing) != 1:
+        raise ValueError(f"Exactly one variable must be unknown for a batch solve. Found: {missing}")
+    unknown = missing[0]
+
+    quantities = {var: column_to_quantity(var, column) for var, column in columns.items()}
+    try:
+        form = compiled.solve_for(unknown)
+    except NotIsolableError:
+        return solve_numeric_batch(compiled, unknown, quantities, unit)
+    try:
+        result = form.evaluate(quantities)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error evaluating batch for '{compiled.parser.equation}': {e}")
+
+    if not hasattr(result, "units"):
+        result = get_registry().Quantity(result, "dimensionless")
+
+    if unit:
+        if not result.is_compatible_with(unit):
+            raise ValueError(f"Cannot express '{unknown}' in '{unit}': result is {result.units}")
+        result = result.to(unit)
+        return np.asarray(result.magnitude, dtype=float), str(result.units)
+    # The same output unit table as single solves, registrations included.
+    base = result.to_base_units()
+    try:
+        choice = output_unit(unknown, to_dimension_vector(base.dimensionality))
+    except FastPathUnavailable:
+        choice = None  # dimensions outside the SI base set
+    if choice is None:
+        return np.asarray(base.magnitude, dtype=float), str(base.units)
+    name, factor = choice
+    return np.asarray(base.magnitude, dtype=float) * factor, name
@@ -0,0 +1,165 @@
+import itertools
+from collections import namedtuple
+from Physics_solver.cache import LRUCache
+from Physics_solver.compiled_equation import compile_equation, normalize_equation
+from Physics_solver.equation_solver import to_preferred_units
+from Physics_solver.fast_engine import FastPathUnavailable, check_dimensions, output_units, unit_signature
+from Physics_solver.unit_store import UnitAwareVariableStore
+from Physics_solver.units import get_registry
+
+# One step of a plan: solve equation for unknown using values found so far.
+PlanStep = namedtuple("PlanStep", ["equation", "unknown"])
+
+# (equations, known variables and dimensions, target, output-unit revision) -> tuple of PlanSteps
+plan_cache = LRUCache(maxsize=1024)
+
+
+def _variables(compiled) -> set:
+    return set(compiled.parser.variables)
+
+
+def _isolated(compiled, unknown: str):
+    try:
+        return compiled.solve_for(unknown)
+    except ValueError:
+        return None
+
+
+def _dimensions(unit):
+    """Dimension vector of a known's unit, or None when it has none (degC...)."""
+    try:
+        return unit_signature(unit)[1]
+    except FastPathUnavailable:
+        return None
+
+
+def _derived_dimensions(form, inputs: tuple):
+    """
+    Dimensions of form's result from its inputs', or None if any input is
+    untyped. Raises FastPathUnavailable when the inputs make the form inconsistent.
+    """
+    if any(dimensions is None for dimensions in inputs):
+        return None
+    return check_dimensions(form, inputs)
+
+
+def build_plan(equations, known: dict, target: str) -> tuple:
+    """
+    Searches the equation/variable graph for the shortest chain of steps that
+    reaches target. known maps each known variable to its dimension vector (or
+    None when untyped). Nodes are (variable, dimensions), so a homonym such as v
+    (velocity in v = a * t, voltage in p = v * i) is two nodes, links whose
+    dimensions do not add up are dropped, and target must come out in the
+    dimension of its preferred unit. Each round applies every equation whose
+    other variables are all reachable, so the target is found at the smallest
+    possible depth; only the steps it actually depends on are kept.
+    """
+    compiled = [compile_equation(equation) for equation in equations]
+    found_as = {var: [dimensions] for var, dimensions in known.items()}  # variable -> dimensions, in order found
+    derived_by = {}  # (variable, dimensions) -> (equation key, variable, input nodes)
+    preferred = output_units.preferred(target)
+
+    def acceptable(dimensions):
+        return dimensions is None or preferred is None or dimensions == preferred[0]
+
+    for _ in range(len(compiled) + 1):
+        reached = [dimensions for dimensions in found_as.get(target, ()) if acceptable(dimensions)]
+        if reached:
+            break
+        found = {}
+        for equation in compiled:
+            variables = _variables(equation)
+            for var in sorted(variables - set(known)):
+                if not all(other in found_as for other in variables - {var}):
+                    continue
+                form = _isolated(equation, var)
+                if form is None:
+                    continue
+                for inputs in itertools.product(*(found_as[name] for name in form.parameters)):
+                    try:
+                        node = (var, _derived_dimensions(form, inputs))
+                    except FastPathUnavailable:
+                        continue
+                    if node not in derived_by and node not in found:
+                        found[node] = (equation.key, var, tuple(zip(form.parameters, inputs)))
+        if not found:
+            break
+        for node in found:
+            found_as.setdefault(node[0], []).append(node[1])
+        derived_by.update(found)
+    else:
+        reached = [dimensions for dimensions in found_as.get(target, ()) if acceptable(dimensions)]
+
+    if not reached:
+        if target in found_as:
+            raise ValueError(f"No chain of equations gives '{target}' in {preferred[1]} from {sorted(known)}.")
+        raise ValueError(f"No chain of equations reaches '{target}' from {sorted(known)}.")
+
+    steps = []
+    chosen = {}  # variable -> the node the plan uses for it
+
+    def visit(node):
+        var = node[0]
+        if chosen.get(var) == node:
+            return
+        if var in chosen:
+            raise ValueError(f"The chain to '{target}' needs '{var}' with two different dimensions.")
+        chosen[var] = node
+        if node in derived_by:
+            key, unknown, inputs = derived_by[node]
+            for dependency in sorted(inputs, key=lambda input_node: input_node[0]):
+                visit(dependency)
+            steps.append(PlanStep(key, unknown))
+
+    visit((target, reached[0]))
+    return tuple(steps)
+
+
+def find_plan(equations, known_vars, target: str) -> tuple:
+    """
+    Returns the solve plan for this problem shape, searching only the first time
+    a given (equation set, known variables, target) is seen. known_vars maps each
+    known to its dimension vector; a plain collection of names is searched untyped.
+    """
+    equations = tuple(equations)
+    if not isinstance(known_vars, dict):
+        known_vars = dict.fromkeys(known_vars)
+    known = {var.lower(): dimensions for var, dimensions in known_vars.items()}
+    target = target.lower()
+    key = (tuple(normalize_equation(equation) for equation in equations), frozenset(known.items()),
+           target, output_units.revision)
+    plan = plan_cache.get(key)
+    if plan is None:
+        try:
+            plan = build_plan(equations, known, target)
+        except ValueError as e:
+            plan = e
+        plan_cache.put(key, plan)
+    if isinstance(plan, ValueError):
+        raise ValueError(*plan.args)
+    return plan
+
+
+def solve_chain(equations, knowns: dict, target: str):
+    """
+    Solves for target through as many equations as needed, e.g. p from v and r
+    via v = i * r then p = v * i. Returns (result quantity, plan).
+    """
+    target = target.lower()
+    store = UnitAwareVariableStore(knowns)
+    ureg = get_registry()
+    values = {var.lower(): ureg.Quantity(value, unit) for var, (value, unit) in store.converted.items()}
+    if target in values:
+        raise ValueError(f"'{target}' is already known.")
+
+    known = {var.lower(): _dimensions(unit) for var, (_, unit) in store.converted.items()}
+    plan = find_plan(equations, known, target)
+    for step in plan:
+        form = compile_equation(step.equation).solve_for(step.unknown)
+        try:
+            values[step.unknown] = form.evaluate(values)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error evaluating {step.unknown} = {form.text} → {str(e)}")
+    return to_preferred_units(target, values[target]), plan
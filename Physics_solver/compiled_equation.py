@@ -0,0 +1,261 @@
+import ast
+import copy
+import re
+from Physics_solver.cache import LRUCache
+from Physics_solver.equation_parser import EquationParser
+from Physics_solver.fast_engine import FastPathUnavailable, base_unit_for, expression_dimensions
+from Physics_solver.physical_constants import CONSTANT_PREFIX, PHYSICAL_CONSTANTS, is_constant_name
+from Physics_solver.rearrange import isolate
+
+# Functions an equation may call, and the NumPy function each one runs.
+# EquationParser already skips these names when it extracts variables.
+# The inverse functions are needed by rearranged forms.
+FUNCTIONS = {
+    "sin": "sin",
+    "cos": "cos",
+    "tan": "tan",
+    "asin": "arcsin",
+    "acos": "arccos",
+    "atan": "arctan",
+    "log": "log10",
+    "ln": "log",
+    "exp": "exp",
+    "sqrt": "sqrt",
+}
+
+_numpy_functions = None
+
+_BINARY_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+
+
+def normalize_equation(equation: str) -> str:
+    """
+    Canonical cache key for an equation: '^' becomes '**' and whitespace is dropped,
+    so "F = m * a" and "F=m*a" share one compiled entry.
+    """
+    return re.sub(r"\s+", "", equation.strip().replace("^", "**"))
+
+
+class _LowercaseNames(ast.NodeTransformer):
+    """
+    Variables and function names are case-insensitive everywhere else in the solver,
+    so match that here: "SQRT(x)" is sqrt(x). Physical constants are matched
+    case-sensitively first and renamed out of the way.
+    """
+
+    def visit_Name(self, node):
+        if node.id in PHYSICAL_CONSTANTS:
+            return ast.copy_location(ast.Name(id=CONSTANT_PREFIX + node.id, ctx=ast.Load()), node)
+        if is_constant_name(node.id):
+            raise ValueError(f"Unsupported name in equation: {node.id}")
+        return ast.copy_location(ast.Name(id=node.id.lower(), ctx=ast.Load()), node)
+
+
+def _check_node(node):
+    """Only arithmetic, numbers, variables and the whitelisted functions are allowed."""
+    if isinstance(node, ast.Expression):
+        _check_node(node.body)
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, _BINARY_OPS):
+        _check_node(node.left)
+        _check_node(node.right)
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, _UNARY_OPS):
+        _check_node(node.operand)
+    elif isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        pass
+    elif isinstance(node, ast.Name):
+        pass
+    elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+          and node.func.id in FUNCTIONS and len(node.args) == 1 and not node.keywords):
+        _check_node(node.args[0])
+    else:
+        raise ValueError(f"Unsupported syntax in equation: {ast.unparse(node)}")
+
+
+def parse_side(text: str) -> ast.Expression:
+    """Parses one side of an equation into a validated expression tree."""
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Could not parse expression: {text}")
+    tree = _LowercaseNames().visit(tree)
+    _check_node(tree)
+    return tree
+
+
+def expression_variables(tree) -> list[str]:
+    """Variable names used in an expression tree, in order of first appearance."""
+    names = []
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in names
+                and not is_constant_name(node.id)):
+            names.append(node.id)
+    return names
+
+
+def numpy_functions() -> dict:
+    """FUNCTIONS resolved to NumPy, which is only imported once an equation is compiled."""
+    global _numpy_functions
+    if _numpy_functions is None:
+        import numpy as np
+        _numpy_functions = {name: getattr(np, attribute) for name, attribute in FUNCTIONS.items()}
+    return _numpy_functions
+
+
+def build_function(body, parameters: list[str], functions: dict = None, constants: dict = None):
+    """
+    Turns an expression tree into a real Python function taking the variables
+    as positional parameters. This is done once per equation. functions can
+    swap in other implementations of sin, sqrt... (e.g. ones that differentiate);
+    constants gives the values of the folded physical constants.
+    """
+    arguments = ast.arguments(
+        posonlyargs=[],
+        args=[ast.arg(arg=name) for name in parameters],
+        kwonlyargs=[],
+        kw_defaults=[],
+        defaults=[],
+    )
+    tree = ast.Expression(body=ast.Lambda(args=arguments, body=body))
+    ast.fix_missing_locations(tree)
+    code = compile(tree, "<equation>", "eval")
+    return eval(code, {"__builtins__": {}, **(functions or numpy_functions()), **(constants or {})})
+
+
+def _has_constant(node) -> bool:
+    return any(isinstance(child, ast.Name) and child.id.startswith(CONSTANT_PREFIX) for child in ast.walk(node))
+
+
+def _only_constants(node) -> bool:
+    """True for sub-expressions made of physical constants, numbers and functions of them."""
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and child.id not in FUNCTIONS and not child.id.startswith(CONSTANT_PREFIX):
+            return False
+    return True
+
+
+class CompiledExpression:
+    """
+    One expression compiled into a function of its variables.
+
+    Sub-expressions made only of physical constants and numbers, such as c_0 ** 2,
+    are folded into a single SI value when the expression is compiled. The
+    function takes SI floats (or arrays) for them; evaluate() works on pint
+    Quantities and gets the constants as Quantities in SI base units.
+    """
+
+    def __init__(self, tree, functions: dict = None):
+        # key names constants apart from variables for the caches; text is what users see.
+        self.key = ast.unparse(tree)
+        self.text = self.key.replace(CONSTANT_PREFIX, "")
+        self.constants = {}  # folded name -> SI value
+        self.constant_dimensions = {}  # folded name -> dimension vector
+        if _has_constant(tree):
+            tree = self._fold(copy.deepcopy(tree))
+        self.tree = tree
+        self.parameters = expression_variables(tree)
+        self.function = build_function(tree, self.parameters, functions, self.constants)
+        self._quantity_function = None
+
+    def _fold(self, node):
+        """Replaces the largest constant-only sub-expressions with one precomputed name each."""
+        if _only_constants(node) and _has_constant(node):
+            try:
+                return self._fold_constant(node)
+            except (FastPathUnavailable, ArithmeticError, ValueError):
+                pass  # e.g. asin() of a constant: fold its parts instead
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, ast.AST):
+                setattr(node, field, self._fold(value))
+            elif isinstance(value, list):
+                setattr(node, field, [self._fold(item) if isinstance(item, ast.AST) else item for item in value])
+        return node
+
+    def _fold_constant(self, node) -> ast.Name:
+        table = {
+            child.id: PHYSICAL_CONSTANTS[child.id[len(CONSTANT_PREFIX):]]
+            for child in ast.walk(node) if isinstance(child, ast.Name) and child.id.startswith(CONSTANT_PREFIX)
+        }
+        dimensions = expression_dimensions(node, {name: constant.dimensions for name, constant in table.items()})
+        value = float(build_function(node, [], constants={name: constant.value for name, constant in table.items()})())
+        name = f"__k{len(self.constants)}"
+        self.constants[name] = value
+        self.constant_dimensions[name] = dimensions
+        return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
+
+    @property
+    def quantity_function(self):
+        """The function for pint Quantity arguments, with each constant as a Quantity."""
+        if not self.constants:
+            return self.function
+        if self._quantity_function is None:
+            from Physics_solver.units import get_registry
+            ureg = get_registry()
+            constants = {
+                name: ureg.Quantity(value, base_unit_for(self.constant_dimensions[name]))
+                for name, value in self.constants.items()
+            }
+            self._quantity_function = build_function(self.tree, self.parameters, constants=constants)
+        return self._quantity_function
+
+    def evaluate(self, values: dict):
+        """
+        values maps each parameter to a number, a pint Quantity or a NumPy array.
+        Equations with physical constants give pint Quantities.
+        """
+        try:
+            args = [values[name] for name in self.parameters]
+        except KeyError as e:
+            raise ValueError(f"Missing value for variable {e} in '{self.text}'")
+        return self.quantity_function(*args)
+
+
+class CompiledEquation:
+    """
+    An equation parsed and compiled once. The right-hand side becomes a callable
+    with the variables as parameters, so solving does no string substitution or
+    re-parsing. Forms rearranged for other unknowns are derived on demand and kept.
+    """
+
+    def __init__(self, equation: str):
+        self.parser = EquationParser(equation)
+        self.parser.validate_format()
+        self.key = normalize_equation(equation)
+        self.lhs_tree = parse_side(self.parser.lhs)
+        self.rhs_tree = parse_side(self.parser.rhs)
+        self.rhs = CompiledExpression(self.rhs_tree.body)
+        self.parameters = self.rhs.parameters
+        self.function = self.rhs.function
+        self._solutions = {}
+
+    def evaluate(self, values: dict):
+        """
+        Evaluates the right-hand side as written.
+        """
+        return self.rhs.evaluate(values)
+
+    def solve_for(self, unknown: str) -> CompiledExpression:
+        """
+        Returns the equation rearranged as an expression for unknown.
+        Each (equation, unknown) pair is rearranged and compiled only once;
+        failures are remembered too, so they stay cheap.
+        """
+        unknown = unknown.lower()
+        form = self._solutions.get(unknown)
+        if form is None:
+            try:
+                form = CompiledExpression(isolate(self.lhs_tree.body, self.rhs_tree.body, unknown))
+            except ValueError as e:
+                form = e
+            self._solutions[unknown] = form
+        if isinstance(form, ValueError):
+            raise type(form)(*form.args)
+        return form
+
+
+equation_cache = LRUCache(maxsize=256)
+
+
+def compile_equation(equation: str) -> CompiledEquation:
+    """Returns the compiled form of an equation, compiling it on first use."""
+    return equation_cache.get_or_create(normalize_equation(equation), lambda: CompiledEquation(equation))
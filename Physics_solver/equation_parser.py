@@ -1,4 +1,5 @@
 import re
+from Physics_solver.physical_constants import PHYSICAL_CONSTANTS
 
 class EquationParser:
     def __init__(self, equation: str):
@@ -10,6 +11,7 @@ class EquationParser:
         self.lhs = ""
         self.rhs = ""
         self.variables = []
+        self.constants = []  # physical constants used, matched case-sensitively: "G" but not "g"
         self.parse_equation()
 
     def validate_format(self):
@@ -36,5 +38,7 @@ class EquationParser:
         pattern = r'(?<![\d\.])[a-zA-Z_][a-zA-Z0-9_]*\b'
         matches = re.findall(pattern, self.original_equation)
         # Blacklisted common function names.
-        blacklist = {"sin", "cos", "tan", "log", "ln", "sqrt"}
-        self.variables = [var.lower() for var in matches if var.lower() not in blacklist]
+        blacklist = {"sin", "cos", "tan", "asin", "acos", "atan", "log", "ln", "exp", "sqrt"}
+        self.constants = list(dict.fromkeys(var for var in matches if var in PHYSICAL_CONSTANTS))
+        self.variables = [var.lower() for var in matches
+                          if var.lower() not in blacklist and var not in PHYSICAL_CONSTANTS]
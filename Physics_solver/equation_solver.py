@@ -1,45 +1,65 @@
 import logging
+from time import perf_counter
 from Physics_solver.unit_store import UnitAwareVariableStore
-from pint import UnitRegistry
-from pint.errors import DimensionalityError
+from Physics_solver.compiled_equation import compile_equation
+from Physics_solver.units import get_registry
+from Physics_solver.fast_engine import FastPathUnavailable, output_unit, solve_fast, to_dimension_vector
+from Physics_solver.metrics import metrics
+from Physics_solver.physical_constants import check_shadowing
+from Physics_solver.rearrange import NotIsolableError
 import re
 
-# Initialize UnitRegistry
-ureg = UnitRegistry()
-
-# Define the voltage dimension and unit using Pint.
-ureg.define("[voltage] = [mass] * [length]**2 / [time]**3 / [current]")
-ureg.define("volt = 1.0 * [voltage]")
-# unit_store.py (after `ureg = UnitRegistry()`):
-ureg.define("A = ampere")  # so "2A" parses as "2 * ampere"
-ureg.define("amps = ampere")
-ureg.define("ohm = ohm")   # if needed as an alias
-ureg.define("ohms = ohm")
-ureg.define("Ω = ohm")
-ureg.define("kg = kilogram")
-ureg.define("J = joule")
-ureg.define("N = newton")
-ureg.define("W = watt")
-ureg.define("C = coulomb")
-# Optional: print definition to verify
-print(ureg["volt"])  # Should print something like "volt = [voltage]"
+
+class MultipleUnknownsError(ValueError):
+    """Raised when more than one variable of an equation has no value."""
+
+
+def to_preferred_units(var: str, result):
+    """
+    Expresses a result in the preferred unit for its variable or dimension,
+    falling back to compact base units. The unit comes from one table lookup.
+    """
+    base = result.to_base_units()
+    try:
+        choice = output_unit(var.lower(), to_dimension_vector(base.dimensionality))
+    except FastPathUnavailable:
+        choice = None  # dimensions outside the SI base set
+    if choice is None:
+        return base.to_compact()
+    unit, factor = choice
+    return get_registry().Quantity(base.magnitude * factor, unit)
+
 
 class EquationSolver:
-    def __init__(self, parser, variable_store: UnitAwareVariableStore):
+    def __init__(self, parser, variable_store: UnitAwareVariableStore, compiled=None, engine: str = "pint"):
+        if engine not in ("pint", "fast"):
+            raise ValueError(f"Unknown engine '{engine}'. Use 'pint' or 'fast'.")
         self.parser = parser
+        self.engine = engine
+        self.compiled = compiled if compiled is not None else self._compile(parser)
         self.store = variable_store
         self.knowns = variable_store.as_dict()  # Known variable magnitudes in SI units.
         self.unknown = None
         self.unknowns = []
         self.unknown_unit = None
+        self.solution = None  # unrounded (magnitude, unit) of the last successful solve_equation()
+
+    @staticmethod
+    def _compile(parser):
+        # Equations the compiler cannot handle still work through string substitution.
+        try:
+            return compile_equation(parser.original_equation)
+        except ValueError:
+            return None
 
     def get_known_variables(self) -> list[str]:
-        return [var for var in self.parser.variables if var in self.knowns]
+        return [var for var in dict.fromkeys(self.parser.variables) if var in self.knowns]
 
     def get_missing_variables(self) -> list[str]:
-        return [var for var in self.parser.variables if var not in self.knowns]
+        return [var for var in dict.fromkeys(self.parser.variables) if var not in self.knowns]
 
     def find_unknown_variable(self) -> str:
+        check_shadowing(self.parser.constants, self.knowns)
         missing = self.get_missing_variables()
         if len(missing) == 0:
             raise ValueError("No unknown variable found. All variables have known values.")
@@ -49,7 +69,7 @@ class EquationSolver:
             return self.unknown
         else:
             self.unknowns = missing
-            raise ValueError(f"Multiple unknown variables found: {missing}. Cannot solve yet.")
+            raise MultipleUnknownsError(f"Multiple unknown variables found: {missing}. Cannot solve yet.")
 
     def substitute_values(self, expression: str) -> str:
         """
@@ -66,75 +86,101 @@ class EquationSolver:
         Evaluates a unit expression and simplifies it.
         """
         try:
-            result = ureg.parse_expression(expression).to_base_units()
+            result = get_registry().parse_expression(expression).to_base_units()
             simplified = result.to_compact()  # Use compact notation when possible.
             return simplified
         except Exception as e:
             raise ValueError(f"Error evaluating expression with units: {expression} → {str(e)}")
 
-    def solve_equation(self) -> str:
+    def evaluate_compiled(self):
+        """
+        Evaluates the equation rearranged for the unknown directly on the known quantities.
+        """
+        ureg = get_registry()
+        quantities = {
+            var.lower(): ureg.Quantity(value, unit)
+            for var, (value, unit) in self.store.converted.items()
+        }
+        form = self.compiled.solve_for(self.unknown)
         try:
-            # Identify the unknown variable if not already found.
-            if not self.unknown:
-                self.find_unknown_variable()
+            result = form.evaluate(quantities)
+            if not hasattr(result, "units"):
+                # A number raised to a dimensionless power (2 ** x) comes back as a plain
+                # number, an int for int operands; made a float like every other result.
+                result = ureg.Quantity(result * 1.0, "dimensionless")
+            magnitude = result.magnitude
+            if isinstance(magnitude, complex) or getattr(magnitude, "imag", 0) or magnitude != magnitude:
+                # An even root of a negative (y = x ** 2 with y < 0), or a sqrt inverse given y < 0.
+                raise ValueError(f"No real solution for {self.unknown}")
+            return result.to_base_units().to_compact()
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error evaluating expression with units: {form.text} → {str(e)}")
 
+    def solve(self) -> tuple:
+        """
+        Solves for the unknown and returns (magnitude, unit string) before any
+        rounding; raises on failure. solve_equation() formats and logs around it.
+        """
+        # Identify the unknown variable if not already found.
+        if not self.unknown:
+            self.find_unknown_variable()
+
+        timed = metrics.enabled
+        start = perf_counter() if timed else 0.0
+        if self.compiled is not None:
+            try:
+                self.compiled.solve_for(self.unknown)
+            except NotIsolableError:
+                from Physics_solver.numeric_solver import solve_numeric
+                # Implicit in the unknown (x = cos(x), t in s = u*t + 0.5*a*t**2): find the root instead.
+                value, unit = solve_numeric(self.compiled, self.unknown, self.store.converted)
+                if timed:
+                    metrics.observe("numeric_solve", perf_counter() - start)
+                return value, unit
+
+        if self.engine == "fast" and self.compiled is not None:
+            try:
+                value, unit = solve_fast(self.compiled, self.unknown, self.store.converted)
+                if timed:
+                    metrics.observe("fast_evaluate", perf_counter() - start)
+                return value, unit
+            except FastPathUnavailable:
+                metrics.increment("fast_path_fallbacks")
+                # Offset units, variable exponents etc. go through pint below.
+                start = perf_counter() if timed else 0.0
+
+        if self.compiled is not None:
+            result = self.evaluate_compiled()
+        else:
             # Substitute known values into the right-hand side of the equation.
             rhs = self.parser.rhs
             substituted = self.substitute_values(rhs)
             result = self.evaluate_expression(substituted)
+        if timed:
+            evaluated = perf_counter()
+            metrics.observe("evaluate", evaluated - start)
 
-            # Simplify the result to base units and then compact them.
-            simplified = result.to_base_units().to_compact()
-
-            # Force preferred units based on the unknown variable
-            preferred_units = {
-                "f": "newton",
-                "e": "joule",
-                "p": "watt",
-                "v": "volt",       # For voltage, now defined via [voltage]
-                "q": "coulomb",
-                "t": "second",
-                "m": "kilogram",
-                "a": "meter / second ** 2",
-                "s": "meter",      # displacement
-                "i": "ampere",
-                "r": "ohm"
-            }
-
-            var = self.unknown.lower()
-            forced_unit = preferred_units.get(var)
-            if forced_unit:
-                try:
-                    simplified = result.to(forced_unit)
-                except Exception:
-                    try:
-                        simplified = result.to_reduced_units().to(forced_unit)
-                    except Exception:
-                        simplified = result  # Fallback if conversion fails
-
-            # Optional backup: check dimension fallback if needed.
-            dimensional_fallbacks = {
-                "[force]": "newton",
-                "[energy]": "joule",
-                "[power]": "watt",
-                "[voltage]": "volt",
-                "[current]": "ampere",
-                "[resistance]": "ohm",
-                "[mass]": "kilogram"
-            }
-
-            try:
-                for dim, unit in dimensional_fallbacks.items():
-                    if simplified.check(dim):
-                        simplified = simplified.to(unit)
-                        break
-            except DimensionalityError:
-                pass
-
-            value = round(simplified.magnitude, 2)
-            unit = str(simplified.units)
-            return f"{self.unknown} = {value} {unit}"
+        simplified = to_preferred_units(self.unknown, result)
+        if timed:
+            metrics.observe("preferred_units", perf_counter() - evaluated)
+        return simplified.magnitude, str(simplified.units)
 
+    def solve_equation(self) -> str:
+        """
+        "f = 20.0 newton" rounded to 2 decimals, or "Error: ...". The unrounded
+        (magnitude, unit) stays in self.solution, e.g. for the oracle.
+        """
+        self.solution = None
+        try:
+            value, unit = self.solve()
+            text = f"{self.unknown} = {round(value, 2)} {unit}"
+            self.solution = (value, unit)
+            return text
         except Exception as e:
-            logging.error(f"PhysicsAI Error: {e}")
+            metrics.record_error(e)
+            logging.error(f"PhysicsAI Error: {e}", extra={
+                "equation": self.parser.original_equation, "variable": self.unknown, "stage": "solve",
+            })
             return f"Error: {str(e)}"
@@ -0,0 +1,333 @@
+import ast
+import threading
+from fractions import Fraction
+from Physics_solver.cache import LRUCache
+from Physics_solver.units import get_registry, preferred_units, dimensional_fallbacks
+
+# Order of the exponents in a dimension vector, and the SI unit of each.
+BASE_DIMENSIONS = ("[length]", "[mass]", "[time]", "[current]", "[temperature]", "[substance]", "[luminosity]")
+SI_BASE_UNITS = ("meter", "kilogram", "second", "ampere", "kelvin", "mole", "candela")
+DIMENSIONLESS = (0,) * len(BASE_DIMENSIONS)
+
+# Functions whose result pint reports in radians rather than as a plain number.
+_ANGLE_FUNCTIONS = {"asin", "acos", "atan"}
+
+
+class FastPathUnavailable(Exception):
+    """Raised when a solve needs the full pint pipeline (offset units, variable exponents...)."""
+
+
+# unit -> (factor to SI, dimension vector)
+_unit_signatures = LRUCache(maxsize=1024)
+# (expression key, input dimension vectors) -> result dimension vector
+_dimension_checks = LRUCache(maxsize=4096)
+# (expression key, input units) -> base unit of the result
+_base_units = LRUCache(maxsize=1024)
+
+
+def to_dimension_vector(dimensionality) -> tuple:
+    """Turns a pint dimensionality into a tuple of exponents over BASE_DIMENSIONS."""
+    vector = [0] * len(BASE_DIMENSIONS)
+    for name, exponent in dimensionality.items():
+        if name not in BASE_DIMENSIONS:
+            raise FastPathUnavailable(f"Unsupported dimension {name}")
+        vector[BASE_DIMENSIONS.index(name)] = Fraction(exponent).limit_denominator(1000)
+    return tuple(vector)
+
+
+def unit_signature(unit) -> tuple:
+    """
+    Returns (factor, dimensions) for a pint unit: multiplying a magnitude by
+    factor gives its SI value. Units with an offset (degC...) have no factor.
+    """
+    signature = _unit_signatures.get(unit)
+    if signature is None:
+        ureg = get_registry()
+        if ureg.Quantity(0.0, unit).to_base_units().magnitude != 0:
+            raise FastPathUnavailable(f"Offset unit {unit}")
+        base = ureg.Quantity(1.0, unit).to_base_units()
+        signature = (float(base.magnitude), to_dimension_vector(base.dimensionality))
+        _unit_signatures.put(unit, signature)
+    return signature
+
+
+def constant_value(node):
+    """Value of a sub-expression made only of number literals, or None."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp):
+        value = constant_value(node.operand)
+        if value is None:
+            return None
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp):
+        left, right = constant_value(node.left), constant_value(node.right)
+        if left is None or right is None:
+            return None
+        try:
+            if isinstance(node.op, ast.Add):
+                return left + right
+            if isinstance(node.op, ast.Sub):
+                return left - right
+            if isinstance(node.op, ast.Mult):
+                return left * right
+            if isinstance(node.op, ast.Div):
+                return left / right
+            return left ** right
+        except (ZeroDivisionError, OverflowError):
+            return None
+    return None
+
+
+def expression_dimensions(node, env: dict) -> tuple:
+    """Propagates dimension vectors through an expression tree."""
+    if isinstance(node, ast.Constant):
+        return DIMENSIONLESS
+    if isinstance(node, ast.Name):
+        return env[node.id]
+    if isinstance(node, ast.UnaryOp):
+        return expression_dimensions(node.operand, env)
+    if isinstance(node, ast.Call):
+        name = node.func.id
+        if name in _ANGLE_FUNCTIONS:
+            raise FastPathUnavailable("Angle results are formatted by pint")
+        argument = expression_dimensions(node.args[0], env)
+        if name == "sqrt":
+            return tuple(Fraction(exponent) / 2 for exponent in argument)
+        if argument != DIMENSIONLESS:
+            raise FastPathUnavailable(f"{name}() of a dimensioned quantity")
+        return DIMENSIONLESS
+
+    left = expression_dimensions(node.left, env)
+    right = expression_dimensions(node.right, env)
+    if isinstance(node.op, (ast.Add, ast.Sub)):
+        if left != right:
+            raise FastPathUnavailable("Adding quantities of different dimensions")
+        return left
+    if isinstance(node.op, ast.Mult):
+        return tuple(a + b for a, b in zip(left, right))
+    if isinstance(node.op, ast.Div):
+        return tuple(a - b for a, b in zip(left, right))
+
+    # Power: the exponent must be a plain number, and a known one unless the base is dimensionless.
+    if right != DIMENSIONLESS:
+        raise FastPathUnavailable("Exponent with dimensions")
+    if left == DIMENSIONLESS:
+        return DIMENSIONLESS
+    exponent = constant_value(node.right)
+    if exponent is None:
+        raise FastPathUnavailable("Variable exponent on a dimensioned base")
+    exponent = Fraction(exponent).limit_denominator(1000)
+    return tuple(a * exponent for a in left)
+
+
+def check_dimensions(form, input_dimensions: tuple) -> tuple:
+    """
+    Returns the result dimensions of a compiled expression for one input-unit
+    signature. Each signature is checked once; inconsistent ones are remembered too.
+    """
+    key = (form.key, input_dimensions)
+    result = _dimension_checks.get(key)
+    if result is None:
+        try:
+            env = dict(zip(form.parameters, input_dimensions), **form.constant_dimensions)
+            result = expression_dimensions(form.tree, env)
+        except FastPathUnavailable as e:
+            result = e
+        _dimension_checks.put(key, result)
+    if isinstance(result, FastPathUnavailable):
+        raise FastPathUnavailable(*result.args)
+    return result
+
+
+def _result_base_unit(form, input_units: tuple, input_magnitudes: tuple = None):
+    """
+    The base unit pint would give the result, in pint's own term order, so the
+    compact output reads the same as on the pint path. Worked out once per signature,
+    on ones, or on the actual magnitudes where ones hit a singularity (y - x with y = x = 1).
+    """
+    key = (form.key, input_units)
+    unit = _base_units.get(key)
+    if unit is None:
+        ureg = get_registry()
+        try:
+            probe = form.quantity_function(*(ureg.Quantity(1.0, u) for u in input_units))
+        except (ArithmeticError, ValueError):
+            if input_magnitudes is None:
+                raise
+            probe = form.quantity_function(*(ureg.Quantity(m, u) for m, u in zip(input_magnitudes, input_units)))
+        # A number raised to a dimensionless power (10 ** x) comes back as a plain number.
+        unit = probe.to_base_units().units if hasattr(probe, "units") else ureg.dimensionless
+        _base_units.put(key, unit)
+    return unit
+
+
+def base_unit_for(dimensions: tuple):
+    """The product of SI base units with the given exponents."""
+    ureg = get_registry()
+    unit = ureg.Unit("dimensionless")
+    for name, exponent in zip(SI_BASE_UNITS, dimensions):
+        if exponent:
+            unit = unit * ureg.Unit(name) ** float(exponent)
+    return unit
+
+
+class OutputUnitTable:
+    """
+    Where results are expressed: dimension vector -> (unit, factor from SI), plus
+    each variable's own preferred unit. Built from preferred_units and
+    dimensional_fallbacks the first time it is used, so picking the output unit
+    is a dictionary lookup and a multiply.
+    """
+
+    def __init__(self):
+        self.by_dimension = {}
+        self.by_variable = {}  # variable -> (dimensions, unit, factor)
+        self.revision = 0  # bumped on every register, so result caches can tell the table changed
+        self._built = False
+        self._lock = threading.Lock()
+
+    def _entry(self, unit: str) -> tuple:
+        ureg = get_registry()
+        factor, dimensions = unit_signature(ureg.Unit(unit))
+        return dimensions, str(ureg.Unit(unit)), 1.0 / factor
+
+    def _build(self):
+        with self._lock:
+            if self._built:
+                return
+            # Earlier fallbacks win when two share a dimension, as in the old check() loop.
+            for unit in reversed(list(dimensional_fallbacks.values())):
+                dimensions, name, factor = self._entry(unit)
+                self.by_dimension[dimensions] = (name, factor)
+            for var, unit in preferred_units.items():
+                self.by_variable[var] = self._entry(unit)
+            self._built = True
+
+    def lookup(self, variable: str, dimensions: tuple):
+        """(unit, factor from SI) for a result, or None to use compact base units."""
+        if not self._built:
+            self._build()
+        entry = self.by_variable.get(variable)
+        if entry is not None and entry[0] == dimensions:
+            return entry[1], entry[2]
+        return self.by_dimension.get(dimensions)
+
+    def preferred(self, variable: str):
+        """(dimensions, unit) of variable's own preferred unit, or None if it has none."""
+        if not self._built:
+            self._build()
+        entry = self.by_variable.get(variable)
+        return None if entry is None else entry[:2]
+
+    def entries(self) -> tuple:
+        """Every dimension and variable entry, sorted, e.g. to fingerprint the table."""
+        if not self._built:
+            self._build()
+        with self._lock:
+            return sorted(self.by_dimension.items()), sorted(self.by_variable.items())
+
+    def clear(self):
+        """
+        Forgets the built table; the next lookup rebuilds it from preferred_units
+        and dimensional_fallbacks. Registered units are dropped.
+        """
+        with self._lock:
+            self.by_dimension.clear()
+            self.by_variable.clear()
+            self._built = False
+            self.revision += 1
+
+    def register(self, unit: str, variable: str = None):
+        """
+        Makes unit the output for one variable, or with no variable, for every
+        result of the unit's dimension. Offset units such as degC are rejected.
+        Only this table changes; preferred_units keeps the shipped defaults.
+        """
+        if not self._built:
+            self._build()
+        try:
+            dimensions, name, factor = self._entry(unit)
+        except FastPathUnavailable as e:
+            raise ValueError(f"Cannot use '{unit}' as a preferred unit: {e}")
+        with self._lock:
+            if variable:
+                self.by_variable[variable.lower()] = (dimensions, name, factor)
+            else:
+                self.by_dimension[dimensions] = (name, factor)
+            self.revision += 1
+
+
+output_units = OutputUnitTable()
+
+
+def output_unit(unknown: str, dimensions: tuple):
+    """Returns (unit, factor from SI) for a result, or None for compact base units."""
+    return output_units.lookup(unknown, dimensions)
+
+
+def register_preferred_unit(unit: str, variable: str = None):
+    """Adds a preferred output unit for a variable, or for the unit's whole dimension."""
+    output_units.register(unit, variable)
+
+
+def real_value(value) -> float:
+    """
+    value as a float; complex values raise instead of losing their imaginary
+    part, and so does NaN, so pint reports both as having no real solution.
+    """
+    if isinstance(value, complex) or getattr(value, "imag", 0):
+        raise FastPathUnavailable(f"Complex result {value}")
+    value = float(value)
+    if value != value:
+        raise FastPathUnavailable("NaN result")
+    return value
+
+
+def solve_fast(compiled, unknown: str, converted: dict) -> tuple:
+    """
+    Solves for unknown with plain floats: knowns become SI magnitudes plus
+    dimension vectors, the rearranged form runs on floats and the output unit
+    is attached at the end. Returns (magnitude, unit string).
+    """
+    form = compiled.solve_for(unknown)
+    values = {}
+    dimensions = {}
+    units = {}
+    converted_magnitudes = {}
+    for var, (magnitude, unit) in converted.items():
+        factor, unit_dimensions = unit_signature(unit)
+        values[var.lower()] = float(magnitude) * factor
+        converted_magnitudes[var.lower()] = magnitude
+        dimensions[var.lower()] = unit_dimensions
+        units[var.lower()] = unit
+    try:
+        input_dimensions = tuple(dimensions[name] for name in form.parameters)
+    except KeyError as e:
+        raise ValueError(f"Missing value for variable {e} in '{form.text}'")
+
+    result_dimensions = check_dimensions(form, input_dimensions)
+    try:
+        value = real_value(form.function(*(values[name] for name in form.parameters)))
+    except Exception as e:
+        # Division by zero, complex roots...: let pint report it the usual way.
+        raise FastPathUnavailable(str(e))
+
+    return express_result(form, unknown, value, result_dimensions, tuple(units[name] for name in form.parameters),
+                          tuple(converted_magnitudes[name] for name in form.parameters))
+
+
+def express_result(form, unknown: str, value: float, result_dimensions: tuple, input_units: tuple,
+                   input_magnitudes: tuple = None) -> tuple:
+    """
+    Attaches the output unit to an SI result of form: the preferred unit for
+    unknown or its dimension, else compact base units. Returns (magnitude, unit string).
+    """
+    choice = output_unit(unknown.lower(), result_dimensions)
+    if choice is None:
+        # No preferred unit: let pint pick a compact prefix, once, at the very end.
+        base_unit = _result_base_unit(form, input_units, input_magnitudes)
+        quantity = get_registry().Quantity(value, base_unit).to_compact()
+        return quantity.magnitude, str(quantity.units)
+    unit, factor = choice
+    return value * factor, unit
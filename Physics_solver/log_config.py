@@ -0,0 +1,134 @@
+import atexit
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Extra fields the solver attaches to its records (logging.error(..., extra={...})).
+CONTEXT_FIELDS = ("equation", "variable", "stage", "suppressed")
+
+_listener = None
+_queue = None
+_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any solver context."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most per_window records from the same logging call (and
+    stage) every window seconds, so a batch of distinct bad values formatted
+    into one f-string message still counts as repeats. The first record after
+    a quiet spell says how many were dropped.
+    """
+
+    def __init__(self, per_window: int = 5, window: float = 60.0):
+        super().__init__()
+        self.per_window = per_window
+        self.window = window
+        self._seen = {}  # (logger, level, file, line, stage) -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, record.pathname, record.lineno, getattr(record, "stage", None))
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                if len(self._seen) > 10000:
+                    self._seen.clear()
+                self._seen[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.per_window:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+def _queue_handler(log_queue, per_window: int, window: float) -> QueueHandler:
+    handler = QueueHandler(log_queue)
+    # Filters run on the thread that logs, before the record is enqueued, so
+    # repeats are dropped there and error storms never reach the queue.
+    handler.addFilter(RateLimitFilter(per_window, window))
+    return handler
+
+
+def configure_logging(filename: str = "backend.log", level: int = logging.INFO,
+                      max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3,
+                      per_window: int = 5, window: float = 60.0, multiprocess: bool = False):
+    """
+    Sends log records through a queue to a background thread that writes JSON
+    lines to a size-rotated file, so the solve path never waits on disk I/O.
+    With multiprocess=True the queue can be shared with worker processes
+    (see attach_worker). Calling it again replaces the previous setup.
+    """
+    global _listener, _queue, _handler
+    stop_logging()
+
+    file_handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    _queue = multiprocessing.Queue(-1) if multiprocess else queue.Queue(-1)
+    _listener = QueueListener(_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    _handler = _queue_handler(_queue, per_window, window)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    return _listener
+
+
+def log_queue():
+    """The queue worker processes should log to, or None unless configured with multiprocess=True."""
+    return None if isinstance(_queue, queue.Queue) else _queue
+
+
+def attach_worker(log_queue, level: int = logging.INFO, per_window: int = 5, window: float = 60.0):
+    """Points a worker process's logging at the parent's queue."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler(log_queue, per_window, window))
+    root.setLevel(level)
+
+
+def stop_logging():
+    """Flushes queued records to disk and stops the background writer."""
+    global _listener, _queue, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue = None
+
+
+atexit.register(stop_logging)
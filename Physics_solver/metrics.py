@@ -0,0 +1,129 @@
+import threading
+from bisect import bisect_left
+
+# Upper bounds of the latency buckets in seconds, 1 µs to 10 s.
+BUCKETS = tuple(float(f"{m}e{e}") for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+
+class Histogram:
+    """Counts of observations per latency bucket, plus their sum."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative, running = [], 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+
+def error_category(error: BaseException) -> str:
+    """
+    Sorts a solve failure into unknown_unit, dimensionality, multiple_unknowns,
+    not_isolable or other, looking through the exceptions it was raised from.
+    """
+    from pint.errors import DimensionalityError, UndefinedUnitError
+    from Physics_solver.equation_solver import MultipleUnknownsError
+    from Physics_solver.rearrange import NotIsolableError
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, UndefinedUnitError):
+            return "unknown_unit"
+        if isinstance(error, DimensionalityError):
+            return "dimensionality"
+        if isinstance(error, MultipleUnknownsError):
+            return "multiple_unknowns"
+        if isinstance(error, NotIsolableError):
+            return "not_isolable"
+        error = error.__cause__ or error.__context__
+    return "other"
+
+
+class Metrics:
+    """
+    Latency histograms per pipeline stage and counters, cheap enough to stay on:
+    recording is a bisect and a short lock. Nothing is formatted until read.
+    With enabled False the solve path does not read the clock either.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, Histogram())
+        histogram.observe(seconds)
+
+    def increment(self, name: str, label: str = "", amount: int = 1):
+        if not self.enabled:
+            return
+        key = (name, label)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def record_error(self, error: BaseException):
+        self.increment("errors", error_category(error))
+
+    def snapshot(self) -> dict:
+        """Plain-dict copy of everything recorded so far."""
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+        result = {"stages": {stage: h.snapshot() for stage, h in histograms.items()}, "counters": {}}
+        for (name, label), value in counters.items():
+            result["counters"].setdefault(name, {})[label] = value
+        return result
+
+    def to_prometheus(self, prefix: str = "physics_solver") -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each stage of a solve.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, histogram in sorted(snapshot["stages"].items()):
+            for bound, count in histogram["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+        for name, values in sorted(snapshot["counters"].items()):
+            label = "category" if name == "errors" else "label"
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for value_label, value in sorted(values.items()):
+                labels = f'{{{label}="{value_label}"}}' if value_label else ""
+                lines.append(f"{prefix}_{name}_total{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+# Shared by the whole process.
+metrics = Metrics()
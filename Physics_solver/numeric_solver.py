@@ -0,0 +1,315 @@
+import ast
+from fractions import Fraction
+import numpy as np
+from Physics_solver.cache import LRUCache
+from Physics_solver.compiled_equation import CompiledExpression
+from Physics_solver.fast_engine import (
+    DIMENSIONLESS, FastPathUnavailable, base_unit_for, check_dimensions, constant_value, output_unit, output_units,
+    unit_signature,
+)
+from Physics_solver.unit_store import default_units
+from Physics_solver.units import get_registry
+
+
+class Dual:
+    """
+    Forward-mode automatic differentiation: a value and its derivative with
+    respect to the unknown. Works on floats and NumPy arrays alike.
+    """
+
+    __slots__ = ("value", "derivative")
+    # Makes array <op> Dual call Dual's reflected operator instead of looping elementwise.
+    __array_ufunc__ = None
+
+    def __init__(self, value, derivative=0.0):
+        self.value = value
+        self.derivative = derivative
+
+    @staticmethod
+    def lift(other):
+        return other if isinstance(other, Dual) else Dual(other, 0.0)
+
+    def __add__(self, other):
+        other = Dual.lift(other)
+        return Dual(self.value + other.value, self.derivative + other.derivative)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = Dual.lift(other)
+        return Dual(self.value - other.value, self.derivative - other.derivative)
+
+    def __rsub__(self, other):
+        return Dual.lift(other) - self
+
+    def __mul__(self, other):
+        other = Dual.lift(other)
+        return Dual(self.value * other.value, self.derivative * other.value + self.value * other.derivative)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = Dual.lift(other)
+        return Dual(
+            self.value / other.value,
+            (self.derivative * other.value - self.value * other.derivative) / other.value ** 2,
+        )
+
+    def __rtruediv__(self, other):
+        return Dual.lift(other) / self
+
+    def __pow__(self, other):
+        if isinstance(other, Dual):
+            value = self.value ** other.value
+            return Dual(value, value * (other.derivative * np.log(self.value) + other.value * self.derivative / self.value))
+        return Dual(self.value ** other, other * self.value ** (other - 1) * self.derivative)
+
+    def __rpow__(self, other):
+        value = other ** self.value
+        return Dual(value, value * np.log(other) * self.derivative)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.derivative)
+
+    def __pos__(self):
+        return self
+
+
+def _differentiable(function, derivative):
+    def apply(x):
+        if isinstance(x, Dual):
+            return Dual(function(x.value), derivative(x.value) * x.derivative)
+        return function(x)
+    return apply
+
+
+# Same names as compiled_equation.FUNCTIONS, but they carry derivatives along.
+DUAL_FUNCTIONS = {
+    "sin": _differentiable(np.sin, np.cos),
+    "cos": _differentiable(np.cos, lambda x: -np.sin(x)),
+    "tan": _differentiable(np.tan, lambda x: 1 / np.cos(x) ** 2),
+    "asin": _differentiable(np.arcsin, lambda x: 1 / np.sqrt(1 - x ** 2)),
+    "acos": _differentiable(np.arccos, lambda x: -1 / np.sqrt(1 - x ** 2)),
+    "atan": _differentiable(np.arctan, lambda x: 1 / (1 + x ** 2)),
+    "log": _differentiable(np.log10, lambda x: 1 / (x * np.log(10))),
+    "ln": _differentiable(np.log, lambda x: 1 / x),
+    "exp": _differentiable(np.exp, np.exp),
+    "sqrt": _differentiable(np.sqrt, lambda x: 0.5 / np.sqrt(x)),
+}
+
+# Equation key -> residual lhs - rhs compiled with DUAL_FUNCTIONS
+_residuals = LRUCache(maxsize=256)
+
+# Bracket scan: the guess times ±10^k for k in -12..12, plus zero, in increasing order.
+_SCALES = 10.0 ** np.arange(-12, 13)
+_SCAN = np.concatenate([-_SCALES[::-1], [0.0], _SCALES])
+_GUESS_INDEX = len(_SCALES) + 1 + 12  # position of +1 x guess in _SCAN
+
+
+def residual_form(compiled) -> CompiledExpression:
+    """lhs - rhs as one expression, compiled once per equation."""
+    form = _residuals.get(compiled.key)
+    if form is None:
+        tree = ast.BinOp(compiled.lhs_tree.body, ast.Sub(), compiled.rhs_tree.body)
+        form = CompiledExpression(ast.fix_missing_locations(tree), DUAL_FUNCTIONS)
+        _residuals.put(compiled.key, form)
+    return form
+
+
+def _affine_dimensions(node, env: dict, unknown: str, constraints: list):
+    """
+    Dimensions as a + k * D, where D is the (not yet known) dimension vector of
+    the unknown. Sums and function arguments add constraints on D.
+    """
+    zero = (DIMENSIONLESS, Fraction(0))
+    if isinstance(node, ast.Constant):
+        return zero
+    if isinstance(node, ast.Name):
+        return (DIMENSIONLESS, Fraction(1)) if node.id == unknown else (env[node.id], Fraction(0))
+    if isinstance(node, ast.UnaryOp):
+        return _affine_dimensions(node.operand, env, unknown, constraints)
+    if isinstance(node, ast.Call):
+        argument = _affine_dimensions(node.args[0], env, unknown, constraints)
+        if node.func.id == "sqrt":
+            return tuple(Fraction(a) / 2 for a in argument[0]), argument[1] / 2
+        constraints.append((argument, zero))
+        return zero
+
+    left = _affine_dimensions(node.left, env, unknown, constraints)
+    right = _affine_dimensions(node.right, env, unknown, constraints)
+    if isinstance(node.op, (ast.Add, ast.Sub)):
+        constraints.append((left, right))
+        return left
+    if isinstance(node.op, ast.Mult):
+        return tuple(a + b for a, b in zip(left[0], right[0])), left[1] + right[1]
+    if isinstance(node.op, ast.Div):
+        return tuple(a - b for a, b in zip(left[0], right[0])), left[1] - right[1]
+    constraints.append((right, zero))
+    exponent = constant_value(node.right)
+    if exponent is None:
+        return left
+    exponent = Fraction(exponent).limit_denominator(1000)
+    return tuple(a * exponent for a in left[0]), left[1] * exponent
+
+
+def infer_unknown_dimensions(tree, env: dict, unknown: str):
+    """
+    Works out the unknown's dimensions from the equation itself, e.g. t must be
+    a time in s = u * t + 0.5 * a * t ** 2. Returns None if nothing pins it down.
+    """
+    constraints = []
+    _affine_dimensions(tree, env, unknown, constraints)
+    for (a1, k1), (a2, k2) in constraints:
+        if k1 != k2:
+            return tuple((Fraction(y) - Fraction(x)) / (k1 - k2) for x, y in zip(a1, a2))
+    return None
+
+
+def _unknown_signature(compiled, unknown: str, known_dimensions: dict, unit: str = None):
+    """
+    Returns (SI factor of the guess unit, dimensions) for the unknown: an explicit
+    unit first, then what the equation implies, then the variable's usual unit.
+    """
+    ureg = get_registry()
+    if unit:
+        return unit_signature(ureg.Unit(unit))
+    form = residual_form(compiled)
+    inferred = infer_unknown_dimensions(form.tree, dict(known_dimensions, **form.constant_dimensions), unknown)
+    preferred = output_units.preferred(unknown)
+    for candidate in (preferred and preferred[1], default_units.get(unknown)):
+        if candidate:
+            factor, dimensions = unit_signature(ureg.Unit(candidate))
+            if inferred is None or dimensions == inferred:
+                return factor, dimensions
+    return 1.0, inferred if inferred is not None else DIMENSIONLESS
+
+
+def find_roots(residual, guess, tolerance: float = 1e-12, max_iterations: int = 100):
+    """
+    Vectorized bracketed Newton solve of residual(x) = 0, one root per element.
+    residual takes a Dual and returns a Dual. The scan brackets a sign change
+    near each guess; Newton steps that leave the bracket become bisections.
+    Elements with no root come back as NaN.
+    """
+    guess = np.asarray(guess, dtype=float)
+    scale = np.where(guess == 0, 1.0, np.abs(guess))
+
+    with np.errstate(all="ignore"):
+        candidates = _SCAN[:, None] * scale[None, :]
+        values = np.broadcast_to(residual(Dual(candidates, 1.0)).value, candidates.shape)
+
+        finite = np.isfinite(values)
+        signs = np.sign(values)
+        changes = finite[:-1] & finite[1:] & (signs[:-1] * signs[1:] <= 0)
+        has_root = changes.any(axis=0)
+        # Prefer the bracket closest to the guess itself.
+        distance = np.where(changes, np.abs(np.arange(len(_SCAN) - 1)[:, None] - _GUESS_INDEX), len(_SCAN))
+        chosen = np.argmin(distance, axis=0)
+        columns = np.arange(guess.size)
+        lo, hi = candidates[chosen, columns], candidates[chosen + 1, columns]
+        f_lo = values[chosen, columns]
+        # Orient the bracket so that residual(lo) <= 0 <= residual(hi).
+        flip = f_lo > 0
+        lo, hi = np.where(flip, hi, lo), np.where(flip, lo, hi)
+
+        x = np.where((guess - lo) * (guess - hi) <= 0, guess, (lo + hi) / 2)
+        done = ~has_root
+        for _ in range(max_iterations):
+            result = residual(Dual(x, 1.0))
+            fx = np.broadcast_to(result.value, x.shape)
+            dfx = np.broadcast_to(result.derivative, x.shape)
+            done = done | (fx == 0)
+            lo = np.where(fx < 0, x, lo)
+            hi = np.where(fx > 0, x, hi)
+
+            newton = x - fx / dfx
+            outside = ~np.isfinite(newton) | ((newton - lo) * (newton - hi) > 0)
+            step = np.where(outside, (lo + hi) / 2, newton)
+            converged = np.abs(step - x) <= tolerance * np.maximum(np.abs(step), 1e-300)
+            x = np.where(done, x, step)
+            done = done | converged
+            if done.all():
+                break
+    return np.where(has_root, x, np.nan)
+
+
+def _prepare(compiled, unknown: str, si_values: dict, known_dimensions: dict, unit: str = None):
+    form = residual_form(compiled)
+    missing = [name for name in form.parameters if name != unknown and name not in si_values]
+    if missing:
+        raise ValueError(f"Missing values for {missing} in '{compiled.parser.equation}'")
+
+    factor, dimensions = _unknown_signature(compiled, unknown, known_dimensions, unit)
+    env = dict(known_dimensions)
+    env[unknown] = dimensions
+    try:
+        check_dimensions(form, tuple(env[name] for name in form.parameters))
+    except FastPathUnavailable as e:
+        raise ValueError(f"Cannot solve '{compiled.parser.equation}' numerically: {e}")
+
+    position = form.parameters.index(unknown)
+
+    def residual(x):
+        args = [si_values.get(name) for name in form.parameters]
+        args[position] = x
+        return form.function(*args)
+
+    return residual, factor, dimensions
+
+
+def _to_output(unknown: str, values, dimensions: tuple, unit: str = None):
+    """Converts SI results to the requested, preferred or base unit."""
+    ureg = get_registry()
+    if unit:
+        factor, _ = unit_signature(ureg.Unit(unit))
+        return values / factor, str(ureg.Unit(unit))
+    choice = output_unit(unknown, dimensions)
+    if choice is None:
+        return values, str(base_unit_for(dimensions))
+    name, factor = choice
+    return values * factor, name
+
+
+def solve_numeric(compiled, unknown: str, converted: dict, unit: str = None) -> tuple:
+    """
+    Solves an equation the rearranger cannot, such as x = cos(x) or
+    s = u * t + 0.5 * a * t ** 2 for t, by root finding in SI floats.
+    Returns (magnitude, unit string).
+    """
+    unknown = unknown.lower()
+    si_values, known_dimensions = {}, {}
+    for var, (magnitude, known_unit) in converted.items():
+        factor, dimensions = unit_signature(known_unit)
+        si_values[var.lower()] = float(magnitude) * factor
+        known_dimensions[var.lower()] = dimensions
+
+    residual, factor, dimensions = _prepare(compiled, unknown, si_values, known_dimensions, unit)
+    root = find_roots(residual, np.array([factor]))[0]
+    if not np.isfinite(root):
+        raise ValueError(f"No solution found for '{unknown}' in '{compiled.parser.equation}'")
+
+    if not unit and output_unit(unknown, dimensions) is None:
+        # No preferred unit: let pint pick a compact prefix, as the other paths do.
+        quantity = get_registry().Quantity(root, base_unit_for(dimensions)).to_compact()
+        return float(quantity.magnitude), str(quantity.units)
+    value, name = _to_output(unknown, root, dimensions, unit)
+    return float(value), name
+
+
+def solve_numeric_batch(compiled, unknown: str, quantities: dict, unit: str = None) -> tuple:
+    """
+    Vectorized numeric solve over columns of knowns (pint Quantities wrapping
+    arrays). All rows are solved together. Returns (values, unit string);
+    rows without a solution are NaN.
+    """
+    unknown = unknown.lower()
+    si_values, known_dimensions = {}, {}
+    for var, quantity in quantities.items():
+        factor, dimensions = unit_signature(quantity.units)
+        si_values[var] = np.asarray(quantity.magnitude, dtype=float) * factor
+        known_dimensions[var] = dimensions
+
+    residual, factor, dimensions = _prepare(compiled, unknown, si_values, known_dimensions, unit)
+    size = max((np.size(values) for values in si_values.values()), default=1)
+    roots = find_roots(residual, np.full(size, factor))
+    return _to_output(unknown, roots, dimensions, unit)
@@ -0,0 +1,395 @@
+import ast
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from Physics_solver.metrics import metrics
+from Physics_solver.physical_constants import PHYSICAL_CONSTANTS
+from Physics_solver.unit_store import default_units, parse_value
+from Physics_solver.units import get_registry
+
+# Results are printed rounded to 2 decimals, so when only the printed string is
+# known (a result-cache hit) a difference of this much in its own unit is never a divergence.
+ROUNDING = 0.005
+
+
+def _rate_from_environment() -> float:
+    try:
+        return float(os.environ.get("PHYSICS_SOLVER_ORACLE", "0") or 0)
+    except ValueError:
+        return 0.0
+
+
+# Function names of the equation language, evaluated on pint quantities with
+# NumPy. Spelled out here rather than taken from the compiler, like everything
+# else the reference uses.
+_REFERENCE_FUNCTIONS = {
+    "sin": "sin", "cos": "cos", "tan": "tan", "asin": "arcsin", "acos": "arccos", "atan": "arctan",
+    "log": "log10", "ln": "log", "exp": "exp", "sqrt": "sqrt",
+}
+_SI_BASE_UNITS = ("meter", "kilogram", "second", "ampere", "kelvin", "mole", "candela")
+
+
+def _evaluate(node, values: dict):
+    """Evaluates a parsed side of the equation on pint quantities, straight from the tree."""
+    import numpy as np
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, values)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id in PHYSICAL_CONSTANTS:
+            constant = PHYSICAL_CONSTANTS[node.id]
+            unit = " * ".join(f"{base} ** {power}" for base, power in zip(_SI_BASE_UNITS, constant.dimensions) if power)
+            return get_registry().Quantity(constant.value, unit or "dimensionless")
+        return values[node.id.lower()]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _evaluate(node.operand, values)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)):
+        left, right = _evaluate(node.left, values), _evaluate(node.right, values)
+        if isinstance(node.op, ast.Add):
+            return left + right
+        if isinstance(node.op, ast.Sub):
+            return left - right
+        if isinstance(node.op, ast.Mult):
+            return left * right
+        if isinstance(node.op, ast.Div):
+            return left / right
+        return left ** right
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and len(node.args) == 1:
+        name = _REFERENCE_FUNCTIONS.get(node.func.id.lower())
+        if name is not None:
+            return getattr(np, name)(_evaluate(node.args[0], values))
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+def _variables(tree) -> list:
+    """The equation's variables, lowercased, in order of appearance."""
+    called = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    names = [node.id.lower() for node in ast.walk(tree)
+             if isinstance(node, ast.Name) and id(node) not in called and node.id not in PHYSICAL_CONSTANTS]
+    return list(dict.fromkeys(names))
+
+
+def _residual(lhs, rhs, values: dict, unknown: str, unit, x: float) -> float:
+    """(lhs - rhs) / max(|lhs|, |rhs|) with the unknown set to x unit; NaN where it has no real value."""
+    ureg = get_registry()
+    values[unknown] = ureg.Quantity(x, unit)
+    left = ureg.Quantity(_evaluate(lhs, values)).to_base_units()
+    left, right = left.magnitude, ureg.Quantity(_evaluate(rhs, values)).to(left.units).magnitude
+    if any(isinstance(side, complex) or getattr(side, "imag", 0) for side in (left, right)):
+        return math.nan
+    scale = max(abs(left), abs(right))
+    return float(left - right) / scale if scale else 0.0
+
+
+def _find_root(lhs, rhs, values: dict, unknown: str, guess) -> float:
+    """
+    A root of lhs - rhs near guess (a Quantity, which also fixes the unit).
+    Steps out from guess both ways, doubling the step, and bisects the first
+    step over which the residual changes sign (skipping poles). Raises
+    ValueError when no root turns up.
+    """
+    unit, center = guess.units, float(guess.magnitude)
+
+    def residual(x):
+        try:
+            return _residual(lhs, rhs, values, unknown, unit, x)
+        except ZeroDivisionError:
+            return math.nan
+
+    def bisect(low, high, low_residual):
+        for _ in range(200):
+            middle = (low + high) / 2
+            if middle in (low, high):
+                break
+            middle_residual = residual(middle)
+            if middle_residual == 0:
+                return middle
+            if (middle_residual < 0) == (low_residual < 0):
+                low, low_residual = middle, middle_residual
+            else:
+                high = middle
+        # Across a pole the sign flips too, but one side dwarfs the other there, so
+        # the scaled residual stays near 1; at a root it is rounding noise. A root
+        # closer to a pole than floats resolve (1 / (a - x) with a huge) looks like
+        # the pole, and is taken when it is where guess says.
+        if abs(residual(middle)) < 1e-3 or abs(middle - center) <= 1e-12 * abs(center):
+            return middle
+        return None
+
+    start = residual(center)
+    if start == 0:
+        return center
+    step = 1e-12 * (abs(center) or 1.0)
+    last = {1: (center, start), -1: (center, start)}
+    for power in range(80):
+        for direction in (1, -1):
+            x = center + direction * step * 2 ** power
+            value = residual(x)
+            if value != value:
+                continue
+            if value == 0:
+                return x
+            previous, previous_value = last[direction]
+            last[direction] = (x, value)
+            if previous_value == previous_value and (value < 0) != (previous_value < 0):
+                root = bisect(previous, x, previous_value)
+                if root is not None:
+                    return root
+    raise ValueError(f"No real solution for {unknown} near {guess}")
+
+
+def reference_solve(equation: str, knowns: dict, guess=None):
+    """
+    Solves equation for its one unknown independently of the production solve
+    path: no compiler, rearranger, fast engine, caches or output unit table.
+    The original equation is evaluated straight from its syntax tree on pint
+    quantities (knowns parsed by pint without the unit memo). An unknown
+    standing alone on the left is the right-hand side's value; any other is a
+    root of lhs - rhs, looked for around guess (a Quantity, by default 1 in
+    the unknown's default unit). Returns (unknown, Quantity) without rounding;
+    raises on failure.
+
+    Roots floats cannot get near (underflowing to 0, overflowing to inf, or
+    closer to a pole than a unit in the last place) are not found.
+    """
+    lhs_text, _, rhs_text = equation.replace("^", "**").partition("=")
+    lhs, rhs = ast.parse(lhs_text.strip(), mode="eval"), ast.parse(rhs_text.strip(), mode="eval")
+    ureg = get_registry()
+    values = {}
+    for var, value in knowns.items():
+        magnitude, unit = parse_value(var.lower(), value)
+        values[var.lower()] = ureg.Quantity(magnitude, unit)
+    missing = [var for var in _variables(ast.Module([lhs.body, rhs.body], [])) if var not in values]
+    if len(missing) != 1:
+        raise ValueError(f"Expected one unknown, found {missing}")
+    unknown = missing[0]
+
+    if isinstance(lhs.body, ast.Name) and lhs.body.id.lower() == unknown and unknown not in _variables(rhs):
+        result = _evaluate(rhs, values)
+        if not hasattr(result, "units"):
+            result = ureg.Quantity(result, "dimensionless")
+    else:
+        if guess is None:
+            guess = ureg.Quantity(1.0, default_units.get(unknown, "dimensionless"))
+        result = ureg.Quantity(_find_root(lhs, rhs, values, unknown, guess), guess.units)
+    value = result.magnitude
+    if isinstance(value, complex) or getattr(value, "imag", 0) or value != value:
+        raise ValueError(f"No real solution: {value} {result.units}")
+    return unknown, result
+
+
+def convert_magnitude(quantity, units) -> float:
+    """
+    quantity's magnitude in units. Exponents that are float noise (the printed
+    result rounds meter ** 6.66e-16 differently from the reference) still
+    compare, through base units, when they agree to 1e-9.
+    """
+    try:
+        return quantity.to(units).magnitude
+    except Exception:
+        base, target = quantity.to_base_units(), (1 * units).to_base_units()
+        have, want = dict(base.dimensionality), dict(target.dimensionality)
+        if any(abs(have.get(key, 0) - want.get(key, 0)) > 1e-9 for key in set(have) | set(want)):
+            raise
+        return base.magnitude / target.magnitude
+
+
+def parse_result(result: str) -> tuple:
+    """Splits "f = 20.0 newton" into ("f", 20.0, "newton")."""
+    variable, _, rest = result.partition(" = ")
+    magnitude, _, unit = rest.partition(" ")
+    return variable, float(magnitude), unit or "dimensionless"
+
+
+class Oracle:
+    """
+    Re-solves a sampled fraction of production solves through reference_solve,
+    seeded with production's answer, and compares the answers after converting them to one unit. A divergence
+    (different magnitude, unknown or unit dimension, or only one side failing)
+    is appended as one JSON line to path, with the full input.
+
+    Production passes its unrounded (magnitude, unit), which must match within
+    rel_tol; only a bare result string (a result-cache hit) gets the ROUNDING slack.
+
+    rate=None reads PHYSICS_SOLVER_ORACLE (a fraction such as 0.01, default 0);
+    path defaults to PHYSICS_SOLVER_ORACLE_LOG ("oracle_divergences.jsonl").
+    Sampled solves take two to three times as long, since the check runs in
+    line; a root search for a right-hand unknown costs the most.
+    """
+
+    def __init__(self, rate: float = None, path: str = None, rel_tol: float = 1e-9):
+        self.rate = _rate_from_environment() if rate is None else rate
+        self.path = path or os.environ.get("PHYSICS_SOLVER_ORACLE_LOG", "oracle_divergences.jsonl")
+        self.rel_tol = rel_tol
+        self.counts = Counter()  # (engine, "agree" or "diverge") -> checks
+        self._lock = threading.Lock()
+
+    def sampled(self) -> bool:
+        return self.rate > 0 and random.random() < self.rate
+
+    def compare(self, equation: str, knowns: dict, result: str, solution: tuple = None):
+        """
+        Returns None when result agrees with the reference, else the reason it
+        does not. solution is the unrounded (magnitude, unit) behind result, if known.
+        """
+        ureg = get_registry()
+        guess = None
+        try:
+            # The answer under test seeds the reference's root search, if it has to search.
+            magnitude, unit = solution if solution is not None else parse_result(result)[1:]
+            guess = ureg.Quantity(float(magnitude), unit).to_base_units()
+            # Drop exponents that are float noise (meter ** 1.1e-16), which the equation cannot match.
+            unit = ureg.Quantity(1.0, "dimensionless")
+            for name, power in guess.unit_items():
+                if abs(power - round(power, 9)) < 1e-9 and round(power, 9):
+                    unit = unit * ureg.Quantity(1.0, name) ** round(power, 9)
+            guess = ureg.Quantity(guess.magnitude, unit.units)
+        except Exception:
+            pass
+        try:
+            unknown, reference = reference_solve(equation, knowns, guess)
+        except Exception as e:
+            return None if result.startswith("Error") else f"reference failed: {e}"
+        if result.startswith("Error"):
+            return f"reference gave {unknown} = {reference}"
+
+        try:
+            variable, magnitude, unit = parse_result(result)
+            if solution is not None:
+                magnitude, unit = solution
+                slack = 0.0
+            else:
+                slack = ROUNDING + convert_magnitude(ureg.Quantity(ROUNDING, unit), reference.units)
+            converted = float(convert_magnitude(ureg.Quantity(magnitude, unit), reference.units))
+        except Exception as e:
+            return f"cannot compare with {reference}: {e}"
+        if variable != unknown:
+            return f"solved for {variable}, reference solved for {unknown}"
+        expected = float(reference.magnitude)
+        if math.isnan(expected) or math.isnan(converted):
+            return None if math.isnan(expected) and math.isnan(converted) else f"reference gave {reference}"
+        if not math.isclose(converted, expected, rel_tol=self.rel_tol, abs_tol=slack):
+            return f"reference gave {reference}"
+        return None
+
+    def check(self, equation: str, knowns: dict, result: str, engine: str = "pint", solution: tuple = None) -> bool:
+        """Compares one solve and records it if it diverges. Returns True when it agrees."""
+        metrics.increment("oracle_checks")
+        reason = self.compare(equation, knowns, result, solution)
+        with self._lock:
+            self.counts[engine, "diverge" if reason else "agree"] += 1
+        if reason is None:
+            return True
+        metrics.increment("oracle_divergences")
+        logging.warning(f"Oracle Divergence: {reason}", extra={"equation": equation, "stage": "oracle"})
+        entry = {"time": time.time(), "equation": equation, "knowns": knowns, "engine": engine,
+                 "result": result, "solution": solution, "reason": reason}
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, default=repr) + "\n")
+        return False
+
+
+# Shared by PhysicsAI instances that are not given their own.
+oracle = Oracle()
+
+
+# Units the problem generator draws knowns from, by kind of quantity.
+UNIT_FAMILIES = {
+    "length": ("meter", "kilometer", "centimeter", "millimeter", "foot"),
+    "time": ("second", "millisecond", "minute", "hour"),
+    "mass": ("kilogram", "gram", "milligram"),
+    "current": ("ampere", "milliampere"),
+    "force": ("newton", "kilonewton"),
+    "energy": ("joule", "kilojoule", "calorie"),
+    "power": ("watt", "kilowatt", "horsepower"),
+    "voltage": ("volt", "millivolt", "kilovolt"),
+    "resistance": ("ohm", "kiloohm"),
+    "speed": ("meter / second", "kilometer / hour"),
+}
+
+
+class ProblemGenerator:
+    """
+    Random, dimensionally consistent equations with knowns in mixed units, for
+    stress-testing solve paths against the reference. Problems come out as
+    {"equation": ..., "knowns": {...}}, the same shape batch_runner reads.
+    Sums only add like to like, functions other than sqrt get dimensionless
+    ratios, and now and then a physical constant appears.
+    """
+
+    def __init__(self, seed: int = None, max_depth: int = 3):
+        self.random = random.Random(seed)
+        self.max_depth = max_depth
+        self._dimensions = {}
+
+    def _family_dimensions(self, unit: str) -> tuple:
+        if unit not in self._dimensions:
+            from Physics_solver.fast_engine import unit_signature
+            self._dimensions[unit] = unit_signature(get_registry().Unit(unit))[1]
+        return self._dimensions[unit]
+
+    def _value(self, unit: str) -> str:
+        return f"{self.random.uniform(0.5, 50):.4g} {unit}"
+
+    def _leaf(self, knowns: dict, unit: str = None) -> tuple:
+        if unit is None and self.random.random() < 0.1:
+            symbol = self.random.choice(("c_0", "g_n", "G"))
+            return symbol, PHYSICAL_CONSTANTS[symbol].dimensions
+        if unit is None:
+            unit = self.random.choice(UNIT_FAMILIES[self.random.choice(list(UNIT_FAMILIES))])
+        name = f"x{len(knowns)}"
+        knowns[name] = self._value(unit)
+        return name, self._family_dimensions(unit)
+
+    def _expression(self, knowns: dict, depth: int) -> tuple:
+        """Returns (text, dimension vector) of a random sub-expression."""
+        if depth == 0 or (depth < self.max_depth and self.random.random() < 0.25):
+            return self._leaf(knowns)
+        kind = self.random.choice(("mul", "div", "pow", "function", "add"))
+        if kind in ("mul", "div"):
+            left, left_dims = self._expression(knowns, depth - 1)
+            right, right_dims = self._expression(knowns, depth - 1)
+            sign = 1 if kind == "mul" else -1
+            return f"{left} {'*' if kind == 'mul' else '/'} ({right})", tuple(
+                a + sign * b for a, b in zip(left_dims, right_dims))
+        if kind == "pow":
+            base, dims = self._expression(knowns, depth - 1)
+            exponent = self.random.choice((2, 3, 0.5))
+            return f"({base}) ** {exponent}", tuple(a * exponent for a in dims)
+        if kind == "function":
+            name = self.random.choice(("sqrt", "exp", "ln", "sin", "cos"))
+            if name == "sqrt":
+                inner, dims = self._expression(knowns, depth - 1)
+                return f"sqrt({inner})", tuple(a / 2 for a in dims)
+            unit = self.random.choice(UNIT_FAMILIES[self.random.choice(list(UNIT_FAMILIES))])
+            top, _ = self._leaf(knowns, unit)
+            bottom, _ = self._leaf(knowns, unit)
+            return f"{name}({top} / {bottom})", (0,) * 7
+        left, dims = self._expression(knowns, depth - 1)
+        right, _ = self._leaf(knowns, self._base_unit(dims))
+        return f"({left} + {right})", dims
+
+    def _base_unit(self, dims: tuple) -> str:
+        from Physics_solver.fast_engine import base_unit_for
+        return str(base_unit_for(dims))
+
+    def problem(self) -> dict:
+        knowns = {}
+        rhs, dims = self._expression(knowns, self.max_depth)
+        equation = f"y = {rhs}"
+        if knowns and self.random.random() < 0.5:
+            # Solve for one of the right-hand variables instead, given y.
+            del knowns[self.random.choice(list(knowns))]
+            knowns["y"] = self._value(self._base_unit(dims))
+        return {"equation": equation, "knowns": knowns}
+
+    def problems(self, count: int):
+        for _ in range(count):
+            yield self.problem()
@@ -0,0 +1,44 @@
+from collections import namedtuple
+
+# A named constant: its SI value and its exponents over (length, mass, time,
+# current, temperature, substance, luminosity), as in fast_engine.BASE_DIMENSIONS.
+PhysicalConstant = namedtuple("PhysicalConstant", ["name", "value", "dimensions"])
+
+# Symbols are case-sensitive, so "G" is the gravitational constant and "g" an
+# ordinary variable. Single letters that are common variables (c for specific
+# heat, g for gravity, h for height, e for energy...) take a subscript, as in
+# c_0 and h_P, so equations such as e = m * g * h keep their own variables.
+PHYSICAL_CONSTANTS = {
+    "c_0": PhysicalConstant("speed of light", 299792458.0, (1, 0, -1, 0, 0, 0, 0)),
+    "g_n": PhysicalConstant("standard gravity", 9.80665, (1, 0, -2, 0, 0, 0, 0)),
+    "G": PhysicalConstant("gravitational constant", 6.67430e-11, (3, -1, -2, 0, 0, 0, 0)),
+    "h_P": PhysicalConstant("Planck constant", 6.62607015e-34, (2, 1, -1, 0, 0, 0, 0)),
+    "hbar": PhysicalConstant("reduced Planck constant", 1.054571817e-34, (2, 1, -1, 0, 0, 0, 0)),
+    "e0": PhysicalConstant("vacuum permittivity", 8.8541878128e-12, (-3, -1, 4, 2, 0, 0, 0)),
+    "mu0": PhysicalConstant("vacuum permeability", 1.25663706212e-6, (1, 1, -2, -2, 0, 0, 0)),
+    "k_e": PhysicalConstant("Coulomb constant", 8.9875517923e9, (3, 1, -4, -2, 0, 0, 0)),
+    "k_B": PhysicalConstant("Boltzmann constant", 1.380649e-23, (2, 1, -2, 0, -1, 0, 0)),
+    "N_A": PhysicalConstant("Avogadro constant", 6.02214076e23, (0, 0, 0, 0, 0, -1, 0)),
+    "q_e": PhysicalConstant("elementary charge", 1.602176634e-19, (0, 0, 1, 1, 0, 0, 0)),
+    "m_e": PhysicalConstant("electron mass", 9.1093837015e-31, (0, 1, 0, 0, 0, 0, 0)),
+    "m_p": PhysicalConstant("proton mass", 1.67262192369e-27, (0, 1, 0, 0, 0, 0, 0)),
+}
+
+# Constants appear in compiled expression trees under this prefix, which no
+# equation variable can have: the compiler rejects names starting with "__".
+CONSTANT_PREFIX = "__constant_"
+
+
+def is_constant_name(name: str) -> bool:
+    """True for names the compiler put in place of a constant or a folded group of them."""
+    return name.startswith("__")
+
+
+def check_shadowing(constants, knowns):
+    """Raises ValueError when a known uses the name of one of the equation's constants."""
+    knowns = {var.lower() for var in knowns}
+    shadowed = [symbol for symbol in constants if symbol.lower() in knowns]
+    if shadowed:
+        names = ", ".join(f"'{symbol}' ({PHYSICAL_CONSTANTS[symbol].name})" for symbol in shadowed)
+        raise ValueError(f"{names} stands for a physical constant in this equation; "
+                         f"use another name for the variable.")
@@ -0,0 +1,147 @@
+import functools
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from Physics_solver.metrics import metrics
+
+# Longest input kept in a capture's tags, in characters of JSON.
+MAX_INPUT = 100000
+# Allocation sites kept per capture.
+MAX_SITES = 50
+
+# Calls are profiled one at a time: cProfile and tracemalloc are process-wide.
+_active = threading.Lock()
+_sequence = itertools.count(1)
+
+
+def _rate_from_environment() -> float:
+    try:
+        return float(os.environ.get("PHYSICS_SOLVER_PROFILE", "0") or 0)
+    except ValueError:
+        return 0.0
+
+
+def describe_input(arguments: dict):
+    """The call's arguments as JSON-able data, cut short if it is huge."""
+    text = json.dumps(arguments, default=repr)
+    if len(text) > MAX_INPUT:
+        return {"truncated": text[:MAX_INPUT]}
+    return json.loads(text)
+
+
+class Profiler:
+    """
+    Profiles a sampled fraction of PhysicsAI calls with cProfile and, unless
+    memory=False, tracemalloc. Each capture is written to directory as
+    <time>-<pid>-<n>-<stage>.prof (pstats) plus a .json file with the input,
+    stage, duration, peak traced memory and the top allocation sites still
+    holding memory when the call returned. profile_report.py merges them.
+
+    rate=None reads PHYSICS_SOLVER_PROFILE (a fraction such as 0.01, default 0);
+    the directory and memory tracing default to PHYSICS_SOLVER_PROFILE_DIR
+    ("profiles") and PHYSICS_SOLVER_PROFILE_MEMORY ("1").
+
+    While one call is being profiled, calls on other threads run unprofiled.
+    """
+
+    def __init__(self, rate: float = None, directory: str = None, memory: bool = None):
+        self.rate = _rate_from_environment() if rate is None else rate
+        self.directory = directory or os.environ.get("PHYSICS_SOLVER_PROFILE_DIR", "profiles")
+        if memory is None:
+            memory = os.environ.get("PHYSICS_SOLVER_PROFILE_MEMORY", "1") != "0"
+        self.memory = memory
+        self._local = threading.local()
+
+    def sampled(self) -> bool:
+        return self.rate > 0 and random.random() < self.rate
+
+    def run(self, stage: str, arguments: dict, function, *args, **kwargs):
+        """
+        Calls function(*args, **kwargs) under the profilers and dumps the capture.
+        Calls made from inside a profiled call are part of its capture.
+        """
+        if getattr(self._local, "busy", False) or not _active.acquire(blocking=False):
+            return function(*args, **kwargs)
+        import cProfile
+        import tracemalloc
+        self._local.busy = True
+        started_tracing = self.memory and not tracemalloc.is_tracing()
+        try:
+            if started_tracing:
+                tracemalloc.start()
+            if self.memory:
+                tracemalloc.reset_peak()
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                profile.disable()
+                seconds = time.perf_counter() - start
+                snapshot = tracemalloc.take_snapshot() if self.memory else None
+                peak = tracemalloc.get_traced_memory()[1] if self.memory else None
+                try:
+                    self._dump(stage, arguments, profile, seconds, snapshot, peak)
+                except OSError as e:
+                    logging.error(f"Profile Error: {e}", extra={"stage": "profile"})
+            return result
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._local.busy = False
+            _active.release()
+
+    def _dump(self, stage: str, arguments: dict, profile, seconds: float, snapshot, peak):
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sequence)}-{stage}"
+        path = os.path.join(self.directory, name)
+        profile.dump_stats(path + ".prof")
+
+        sites = []
+        if snapshot is not None:
+            import tracemalloc
+            snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            for statistic in snapshot.statistics("lineno")[:MAX_SITES]:
+                frame = statistic.traceback[0]
+                sites.append({"file": frame.filename, "line": frame.lineno,
+                              "size": statistic.size, "count": statistic.count})
+        capture = {
+            "stage": stage,
+            "input": describe_input(arguments),
+            "seconds": seconds,
+            "peak_memory": peak,
+            "allocations": sites,
+            "pid": os.getpid(),
+            "time": time.time(),
+        }
+        with open(path + ".json", "w", encoding="utf-8") as handle:
+            json.dump(capture, handle)
+        metrics.increment("profiles_captured", stage)
+
+
+# Shared by PhysicsAI instances that are not given their own.
+profiler = Profiler()
+
+
+def profiled(method):
+    """
+    Marks a PhysicsAI method for sampled profiling. The stage is the method's
+    name and the input is its arguments.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        active = self.profiler
+        if not active.sampled():
+            return method(self, *args, **kwargs)
+        import inspect
+        arguments = inspect.signature(method).bind(self, *args, **kwargs).arguments
+        arguments.pop("self")
+        return active.run(method.__name__, arguments, method, self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,96 @@
+import ast
+import copy
+
+
+class NotIsolableError(ValueError):
+    """Raised when a variable cannot be isolated in closed form."""
+
+
+# Inverse of each single-argument function: f(x) = y  →  x = inverse(y)
+_INVERSE_CALLS = {
+    "sin": lambda y: _call("asin", y),
+    "cos": lambda y: _call("acos", y),
+    "tan": lambda y: _call("atan", y),
+    "asin": lambda y: _call("sin", y),
+    "acos": lambda y: _call("cos", y),
+    "atan": lambda y: _call("tan", y),
+    "ln": lambda y: _call("exp", y),
+    "exp": lambda y: _call("ln", y),
+    "log": lambda y: ast.BinOp(ast.Constant(10), ast.Pow(), y),
+    # sqrt(y) ** 4 is y ** 2 for y >= 0 and NaN below, which has no real root.
+    "sqrt": lambda y: ast.BinOp(_call("sqrt", y), ast.Pow(), ast.Constant(4)),
+}
+
+
+def _call(name, argument):
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=[argument], keywords=[])
+
+
+def count_occurrences(tree, name: str) -> int:
+    return sum(1 for node in ast.walk(tree) if isinstance(node, ast.Name) and node.id == name)
+
+
+def _contains(tree, name: str) -> bool:
+    return count_occurrences(tree, name) > 0
+
+
+def _invert_step(side, other, unknown):
+    """
+    Peels one operation off the side holding the unknown and applies its
+    inverse to the other side. Returns the new (side, other) pair.
+    """
+    if isinstance(side, ast.UnaryOp):
+        if isinstance(side.op, ast.USub):
+            return side.operand, ast.UnaryOp(ast.USub(), other)
+        return side.operand, other
+
+    if isinstance(side, ast.Call):
+        inverse = _INVERSE_CALLS.get(side.func.id)
+        if inverse is None:
+            raise NotIsolableError(f"Cannot invert function '{side.func.id}'")
+        return side.args[0], inverse(other)
+
+    if isinstance(side, ast.BinOp):
+        left, right, op = side.left, side.right, side.op
+        in_left = _contains(left, unknown)
+        if isinstance(op, ast.Add):
+            # l + r = o
+            return (left, ast.BinOp(other, ast.Sub(), right)) if in_left else (right, ast.BinOp(other, ast.Sub(), left))
+        if isinstance(op, ast.Sub):
+            # l - r = o
+            return (left, ast.BinOp(other, ast.Add(), right)) if in_left else (right, ast.BinOp(left, ast.Sub(), other))
+        if isinstance(op, ast.Mult):
+            # l * r = o
+            return (left, ast.BinOp(other, ast.Div(), right)) if in_left else (right, ast.BinOp(other, ast.Div(), left))
+        if isinstance(op, ast.Div):
+            # l / r = o
+            return (left, ast.BinOp(other, ast.Mult(), right)) if in_left else (right, ast.BinOp(left, ast.Div(), other))
+        if isinstance(op, ast.Pow):
+            # l ** r = o
+            if in_left:
+                if isinstance(right, ast.Constant) and not float(right.value).is_integer():
+                    # l ** 0.5 is never negative: sqrt(o) ** 2 is o, or NaN for o < 0,
+                    # where o ** 2 would make up a root.
+                    other = ast.BinOp(_call("sqrt", other), ast.Pow(), ast.Constant(2))
+                return left, ast.BinOp(other, ast.Pow(), ast.BinOp(ast.Constant(1), ast.Div(), right))
+            return right, ast.BinOp(_call("ln", other), ast.Div(), _call("ln", left))
+
+    raise NotIsolableError(f"Cannot isolate '{unknown}' in {ast.unparse(side)}")
+
+
+def isolate(lhs, rhs, unknown: str):
+    """
+    Rearranges lhs = rhs into an expression for unknown. The unknown must appear
+    exactly once; otherwise a NotIsolableError is raised.
+    """
+    occurrences = count_occurrences(lhs, unknown) + count_occurrences(rhs, unknown)
+    if occurrences == 0:
+        raise ValueError(f"Variable '{unknown}' does not appear in the equation.")
+    if occurrences > 1:
+        raise NotIsolableError(f"Variable '{unknown}' appears more than once and cannot be isolated.")
+
+    side, other = (lhs, rhs) if _contains(lhs, unknown) else (rhs, lhs)
+    side, other = copy.deepcopy(side), copy.deepcopy(other)
+    while not (isinstance(side, ast.Name) and side.id == unknown):
+        side, other = _invert_step(side, other, unknown)
+    return ast.fix_missing_locations(other)
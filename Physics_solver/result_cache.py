@@ -0,0 +1,132 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from Physics_solver.cache import LRUCache
+from Physics_solver.fast_engine import FastPathUnavailable, output_units, unit_signature
+from Physics_solver.physical_constants import PHYSICAL_CONSTANTS
+from Physics_solver.units import CUSTOM_DEFINITIONS, dimensional_fallbacks
+
+# Bump when the result format or solve semantics change, to drop every stored entry.
+RESULT_FORMAT = 1
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT NOT NULL, result TEXT NOT NULL)"
+
+
+def canonical_knowns(converted: dict) -> tuple:
+    """
+    Knowns as sorted (variable, SI magnitude, dimensions) so "10kg" and
+    "10 kilogram" (or "10000 g") give the same key. Offset units keep their own unit.
+    """
+    items = []
+    for var, (magnitude, unit) in converted.items():
+        try:
+            factor, dimensions = unit_signature(unit)
+            items.append((var.lower(), f"{float(magnitude) * factor:.12g}", str(dimensions)))
+        except FastPathUnavailable:
+            items.append((var.lower(), f"{float(magnitude):.12g}", str(unit)))
+    return tuple(sorted(items))
+
+
+def cache_version() -> str:
+    """
+    Fingerprint of everything that shapes a result: unit definitions, physical
+    constants, the pint version and the output-unit table. Entries from another
+    version are ignored.
+    """
+    import pint
+
+    parts = [
+        str(RESULT_FORMAT),
+        pint.__version__,
+        repr(CUSTOM_DEFINITIONS),
+        repr(sorted(dimensional_fallbacks.items())),
+        repr(sorted(PHYSICAL_CONSTANTS.items())),
+        repr(output_units.entries()),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Finished solve results keyed on (engine, equation, knowns in SI). An in-memory
+    LRU sits in front of an optional SQLite file that any number of processes can
+    share: it runs in WAL mode, every write is its own short transaction, and a
+    busy or broken database only costs a cache miss.
+    """
+
+    def __init__(self, path: str = None, maxsize: int = 4096):
+        self.path = path
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self._local = threading.local()
+        self._version = None
+        self._revision = None
+
+    def version(self) -> str:
+        if self._revision != output_units.revision:
+            self._version = cache_version()
+            self._revision = output_units.revision
+        return self._version
+
+    def key(self, engine: str, equation_key: str, converted: dict) -> str:
+        text = repr((self.version(), engine, equation_key, canonical_knowns(converted)))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _connection(self):
+        # One connection per thread and per process: sqlite3 connections must not cross either.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str):
+        result = self.memory.get(key)
+        if result is not None or self.path is None:
+            return result
+        try:
+            row = self._connection().execute(
+                "SELECT result FROM results WHERE key = ? AND version = ?", (key, self.version())
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.disk_misses += 1
+            return None
+        self.disk_hits += 1
+        self.memory.put(key, row[0])
+        return row[0]
+
+    def put(self, key: str, result: str):
+        self.memory.put(key, result)
+        if self.path is None:
+            return
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO results (key, version, result) VALUES (?, ?, ?)",
+                (key, self.version(), result),
+            )
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        """Empties both tiers."""
+        self.memory.clear()
+        if self.path is not None:
+            self._connection().execute("DELETE FROM results")
+
+    def prune(self):
+        """Deletes stored entries written under another cache version."""
+        if self.path is not None:
+            self._connection().execute("DELETE FROM results WHERE version != ?", (self.version(),))
+
+    def stats(self) -> dict:
+        stats = self.memory.stats()
+        stats.update(disk_hits=self.disk_hits, disk_misses=self.disk_misses)
+        return stats
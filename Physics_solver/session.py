@@ -0,0 +1,222 @@
+import ast
+import logging
+import operator
+from time import perf_counter
+from Physics_solver.compiled_equation import compile_equation, numpy_functions
+from Physics_solver.equation_solver import EquationSolver, MultipleUnknownsError, to_preferred_units
+from Physics_solver.fast_engine import FastPathUnavailable, check_dimensions, express_result, real_value, unit_signature
+from Physics_solver.metrics import metrics
+from Physics_solver.physical_constants import check_shadowing
+from Physics_solver.rearrange import NotIsolableError
+from Physics_solver.unit_store import UnitAwareVariableStore, convert_value, split_uncertainty
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+class IncrementalExpression:
+    """
+    A rearranged form flattened into its sub-expressions, each holding its last
+    SI value. Changing a known re-evaluates only the sub-expressions that use it;
+    parts made only of numbers are worked out once, when the form is built.
+    """
+
+    def __init__(self, form, unknown: str):
+        self.form = form
+        self.unknown = unknown
+        self.operations = []  # (function, child indices) in evaluation order
+        self.leaves = {}  # index -> variable
+        self.values = []
+        self.dependents = {}  # variable -> indices of the sub-expressions that use it, in order
+        self.root, _ = self._add(form.tree)
+        self.evaluated = False
+
+    def _add(self, node) -> tuple:
+        """Appends node after its operands; returns (index, variables it depends on)."""
+        if isinstance(node, ast.Constant):
+            return self._append(None, (), frozenset(), node.value)
+        if isinstance(node, ast.Name) and node.id in self.form.constants:
+            return self._append(None, (), frozenset(), self.form.constants[node.id])
+        if isinstance(node, ast.Name):
+            index, depends = self._append(None, (), frozenset([node.id]), 0.0)
+            self.leaves[index] = node.id
+            return index, depends
+
+        if isinstance(node, ast.BinOp):
+            operands, function = (node.left, node.right), _OPERATORS[type(node.op)]
+        elif isinstance(node, ast.UnaryOp):
+            operands, function = (node.operand,), _OPERATORS[type(node.op)]
+        else:
+            operands, function = (node.args[0],), numpy_functions()[node.func.id]
+        children = [self._add(operand) for operand in operands]
+        depends = frozenset().union(*(child_depends for _, child_depends in children))
+        value = function(*(self.values[index] for index, _ in children)) if not depends else 0.0
+        return self._append(function, tuple(index for index, _ in children), depends, value)
+
+    def _append(self, function, children: tuple, depends: frozenset, value) -> tuple:
+        index = len(self.operations)
+        self.operations.append((function, children))
+        self.values.append(value)
+        for var in depends:
+            self.dependents.setdefault(var, []).append(index)
+        return index, depends
+
+    def evaluate(self, values: dict, changed=()) -> float:
+        """
+        Brings the result up to date after the variables in changed got new SI
+        values. The first call evaluates everything.
+        """
+        if not self.evaluated:
+            indices = sorted({index for indices in self.dependents.values() for index in indices})
+        elif len(changed) == 1:
+            indices = self.dependents.get(next(iter(changed)), ())
+        else:
+            indices = sorted({index for var in changed for index in self.dependents.get(var, ())})
+
+        results = self.values
+        self.evaluated = False  # stays False if an operation below raises halfway
+        for index in indices:
+            var = self.leaves.get(index)
+            if var is not None:
+                results[index] = values[var]
+            else:
+                function, children = self.operations[index]
+                results[index] = function(*[results[child] for child in children])
+        self.evaluated = True
+        return real_value(results[self.root])
+
+
+class SolveSession:
+    """
+    A mutable solve for live editing and what-if loops. The equation is
+    compiled once and every known is converted once; set() re-converts just the
+    known that changed and solve() only re-evaluates what depends on it.
+
+        session = SolveSession("f = m * a", {"m": "10kg", "a": "2 m/s**2"})
+        session.solve()          # "f = 20.0 newton"
+        session.set("m", "12kg")
+        session.solve()          # "f = 24.0 newton"
+
+    Work runs on SI floats; offset units, dimension mismatches and equations
+    that need a numeric root fall back to the full pint pipeline.
+    """
+
+    def __init__(self, equation: str, knowns: dict = None):
+        self.compiled = compile_equation(equation)
+        self.equation = self.compiled.key
+        self.variables = list(dict.fromkeys(self.compiled.parser.variables))
+        self.raw = {}
+        self.converted = {}  # variable -> (magnitude, unit), as in UnitAwareVariableStore
+        self.unknown = None
+        self.solution = None  # unrounded (magnitude, unit) of the last successful solve()
+        self._si = {}  # variable -> SI magnitude, for knowns in units without an offset
+        self._dimensions = {}
+        self._changed = set()
+        self._expression = None
+        self.update(knowns or {})
+
+    def set(self, var: str, value):
+        """Sets or replaces one known, e.g. set("m", "12kg"). Unchanged values cost nothing."""
+        var = var.lower()
+        if var in self.raw and self.raw[var] == value:
+            return
+        magnitude, unit = convert_value(var, split_uncertainty(value)[0])
+        self.raw[var] = value
+        self.converted[var] = (magnitude, unit)
+        try:
+            factor, dimensions = unit_signature(unit)
+            self._si[var] = float(magnitude) * factor
+            self._dimensions[var] = dimensions
+        except FastPathUnavailable:
+            self._si.pop(var, None)
+            self._dimensions.pop(var, None)
+        self._changed.add(var)
+
+    def remove(self, var: str):
+        """Forgets a known, e.g. to solve for it next."""
+        var = var.lower()
+        for values in (self.raw, self.converted, self._si, self._dimensions):
+            values.pop(var, None)
+        self._changed.add(var)
+
+    def update(self, knowns: dict):
+        """Makes the knowns match the given dict, touching only the ones that differ."""
+        knowns = {var.lower(): value for var, value in knowns.items()}
+        for var in [var for var in self.raw if var not in knowns]:
+            self.remove(var)
+        for var, value in knowns.items():
+            self.set(var, value)
+
+    def find_unknown_variable(self) -> str:
+        check_shadowing(self.compiled.parser.constants, self.converted)
+        missing = [var for var in self.variables if var not in self.converted]
+        if len(missing) == 0:
+            raise ValueError("No unknown variable found. All variables have known values.")
+        if len(missing) > 1:
+            raise MultipleUnknownsError(f"Multiple unknown variables found: {missing}. Cannot solve yet.")
+        self.unknown = missing[0]
+        return self.unknown
+
+    def evaluate(self) -> tuple:
+        """Solves for the one variable without a value. Returns (magnitude, unit string)."""
+        unknown = self.find_unknown_variable()
+        try:
+            form = self.compiled.solve_for(unknown)
+        except NotIsolableError:
+            return self._evaluate_pint(unknown)
+        if any(name not in self._si for name in form.parameters):
+            return self._evaluate_pint(unknown)  # a known in an offset unit such as degC
+
+        try:
+            result_dimensions = check_dimensions(form, tuple(self._dimensions[name] for name in form.parameters))
+            if self._expression is None or self._expression.unknown != unknown:
+                self._expression = IncrementalExpression(form, unknown)
+            value = self._expression.evaluate(self._si, self._changed)
+        except Exception:
+            # Dimension mismatches, division by zero, complex roots...: let pint report it the usual way.
+            return self._evaluate_pint(unknown)
+        self._changed.clear()
+        input_units = tuple(self.converted[name][1] for name in form.parameters)
+        input_magnitudes = tuple(self.converted[name][0] for name in form.parameters)
+        return express_result(form, unknown, value, result_dimensions, input_units, input_magnitudes)
+
+    def _evaluate_pint(self, unknown: str) -> tuple:
+        store = UnitAwareVariableStore(self.raw)
+        try:
+            self.compiled.solve_for(unknown)
+        except NotIsolableError:
+            from Physics_solver.numeric_solver import solve_numeric
+            return solve_numeric(self.compiled, unknown, store.converted)
+        solver = EquationSolver(self.compiled.parser, store, self.compiled)
+        solver.unknown = unknown
+        result = to_preferred_units(unknown, solver.evaluate_compiled())
+        return result.magnitude, str(result.units)
+
+    def solve(self) -> str:
+        """
+        Like PhysicsAI.solve_equation: "f = 24.0 newton" or "Error: ...". The
+        unrounded (magnitude, unit) stays in self.solution.
+        """
+        self.solution = None
+        try:
+            timed = metrics.enabled
+            start = perf_counter() if timed else 0.0
+            value, unit = self.evaluate()
+            if timed:
+                metrics.observe("session_solve", perf_counter() - start)
+            text = f"{self.unknown} = {round(value, 2)} {unit}"
+            self.solution = (value, unit)
+            return text
+        except Exception as e:
+            metrics.record_error(e)
+            logging.error(f"PhysicsAI Error: {e}", extra={
+                "equation": self.compiled.parser.original_equation, "variable": self.unknown, "stage": "session",
+            })
+            return f"Error: {str(e)}"
@@ -0,0 +1,87 @@
+from collections import namedtuple
+import numpy as np
+from Physics_solver.batch_solver import column_to_quantity, solve_batch
+from Physics_solver.unit_store import convert_value
+
+# One block of sweep results: rows start..start+len(values) of the flattened sweep.
+SweepChunk = namedtuple("SweepChunk", ["start", "inputs", "values", "unit"])
+
+
+def _is_axis(value) -> bool:
+    return isinstance(value, (list, tuple, np.ndarray))
+
+
+def _axes(knowns: dict):
+    """
+    Splits knowns into swept axes, each converted once to (magnitudes, unit),
+    and fixed values as (magnitude, unit).
+    """
+    axes, fixed = {}, {}
+    for var, value in knowns.items():
+        var = var.lower()
+        if _is_axis(value):
+            quantity = column_to_quantity(var, value)
+            axes[var] = (np.asarray(quantity.magnitude, dtype=float).ravel(), str(quantity.units))
+        else:
+            fixed[var] = convert_value(var, value)
+    if not axes:
+        raise ValueError("A sweep needs at least one known given as a range of values.")
+    return axes, fixed
+
+
+def _shape(axes: dict, grid: bool) -> tuple:
+    """Shape of the result: one axis per swept known on a grid, else one shared axis."""
+    lengths = tuple(len(magnitudes) for magnitudes, _ in axes.values())
+    if grid:
+        return lengths
+    if len(set(lengths)) > 1:
+        raise ValueError(f"Swept knowns must have the same length unless grid=True. Got {list(lengths)}")
+    return lengths[:1]
+
+
+def _chunks(compiled, axes: dict, fixed: dict, shape: tuple, grid: bool, chunk_size: int, unit: str = None):
+    names = list(axes)
+    total = int(np.prod(shape))
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        rows = np.arange(start, stop)
+        indices = np.unravel_index(rows, shape) if grid else [rows] * len(names)
+        inputs = {var: axes[var][0][index] for var, index in zip(names, indices)}
+        columns = {var: (inputs[var], axes[var][1]) for var in names}
+        for var, (magnitude, known_unit) in fixed.items():
+            columns[var] = (np.full(stop - start, float(magnitude)), str(known_unit))
+        values, result_unit = solve_batch(compiled, columns, unit)
+        unit = unit or result_unit  # keep every chunk in the first chunk's unit
+        yield SweepChunk(start, inputs, values, result_unit)
+
+
+def sweep(compiled, knowns: dict, chunk_size: int = 65536, grid: bool = True, unit: str = None):
+    """
+    Solves compiled over ranges of knowns and yields SweepChunks of at most
+    chunk_size rows, so memory stays flat however large the sweep is.
+
+    Knowns given as arrays, lists or (values, unit) pairs are swept; strings and
+    numbers stay fixed. With grid=True every combination of the swept knowns is
+    solved (first known varying slowest, as in np.meshgrid(..., indexing="ij"));
+    each chunk's grid points come from np.unravel_index, so the full cartesian
+    product is never built. With grid=False the swept knowns are zipped together.
+    """
+    axes, fixed = _axes(knowns)
+    return _chunks(compiled, axes, fixed, _shape(axes, grid), grid, chunk_size, unit)
+
+
+def sweep_to_npy(compiled, knowns: dict, path: str, chunk_size: int = 65536, grid: bool = True, unit: str = None):
+    """
+    Writes a sweep straight into a memory-mapped .npy file shaped like the sweep
+    (one axis per swept known on a grid). Returns (memmap, unit).
+    """
+    axes, fixed = _axes(knowns)
+    shape = _shape(axes, grid)
+    output = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+    flat = output.reshape(-1)
+    result_unit = unit
+    for chunk in _chunks(compiled, axes, fixed, shape, grid, chunk_size, unit):
+        flat[chunk.start:chunk.start + len(chunk.values)] = chunk.values
+        result_unit = chunk.unit
+    output.flush()
+    return output, result_unit
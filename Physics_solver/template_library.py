@@ -0,0 +1,115 @@
+import heapq
+import json
+import os
+from collections import namedtuple
+
+DEFAULT_TEMPLATE_FILE = os.path.join(os.path.dirname(__file__), "data", "templates.json")
+
+# One equation template: the keywords that must appear in a sentence for it to apply.
+EquationTemplate = namedtuple("EquationTemplate", ["name", "display", "equation", "keywords", "category"])
+
+
+class TemplateMatch(namedtuple("TemplateMatch", ["template", "matched", "missing"])):
+    """A template together with the keywords a sentence did and did not mention."""
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    @property
+    def label(self) -> str:
+        return f"{self.template.name}: {self.template.display}"
+
+
+class TemplateLibrary:
+    """
+    Equation templates with an inverted index from keyword to template, so a
+    lookup only visits templates that share a keyword with the sentence.
+    """
+
+    def __init__(self, keyword_to_var: dict = None, templates=()):
+        self.keyword_to_var = dict(keyword_to_var or {})
+        self.templates = []
+        self.index = {}
+        for template in templates:
+            self.add(template)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_TEMPLATE_FILE):
+        """
+        Loads a JSON file with a "keywords" map (keyword -> variable) and a
+        "templates" list of {name, display, equation, keywords, category}.
+        """
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        library = cls(data.get("keywords", {}))
+        for entry in data.get("templates", []):
+            library.add(EquationTemplate(
+                name=entry["name"],
+                display=entry.get("display", entry["equation"]),
+                equation=entry["equation"],
+                keywords=frozenset(entry["keywords"]),
+                category=entry.get("category", ""),
+            ))
+        return library
+
+    def add(self, template: EquationTemplate):
+        unknown = [keyword for keyword in template.keywords if keyword not in self.keyword_to_var]
+        if unknown:
+            raise ValueError(f"Template '{template.name}' uses keywords with no variable: {unknown}")
+        position = len(self.templates)
+        self.templates.append(template)
+        for keyword in template.keywords:
+            self.index.setdefault(keyword, []).append(position)
+
+    def match(self, keywords, limit: int = 3) -> list:
+        """
+        Ranks the templates sharing a keyword with the given set: complete matches
+        first, then by number of keywords matched, then by library order.
+        """
+        keywords = set(keywords)
+        hits = {}
+        for keyword in keywords:
+            for position in self.index.get(keyword, ()):
+                hits[position] = hits.get(position, 0) + 1
+
+        def rank(position):
+            size = len(self.templates[position].keywords)
+            return (hits[position] < size, -hits[position], size - hits[position], position)
+
+        best = heapq.nsmallest(limit, hits, key=rank)
+        matches = []
+        for position in best:
+            template = self.templates[position]
+            matches.append(TemplateMatch(template, template.keywords & keywords, template.keywords - keywords))
+        return matches
+
+    def best(self, keywords, variables=()):
+        """
+        The top complete match for the keywords whose equation uses every one of
+        variables (those the sentence gave values for), or None. Leaving a given
+        value out would answer a different question, as E = mc^2 would for a
+        mass and a speed.
+        """
+        variables = set(variables)
+        limit = 1 if not variables else len(self.templates)
+        for match in self.match(keywords, limit):
+            if not match.complete:
+                break
+            if variables <= {self.keyword_to_var[keyword] for keyword in match.template.keywords}:
+                return match
+        return None
+
+    def __len__(self):
+        return len(self.templates)
+
+
+_default_library = None
+
+
+def default_library() -> TemplateLibrary:
+    """The library shipped in data/templates.json, loaded on first use."""
+    global _default_library
+    if _default_library is None:
+        _default_library = TemplateLibrary.from_file()
+    return _default_library
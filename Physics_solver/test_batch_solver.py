@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from Physics_solver.batch_solver import solve_batch
+from Physics_solver.compiled_equation import compile_equation
+
+
+def test_arrays_use_default_units():
+    values, unit = solve_batch(compile_equation("f = m * a"), {"m": np.array([1.0, 2.0]), "a": np.array([3.0, 3.0])})
+    assert unit == "newton"
+    assert values.tolist() == [3.0, 6.0]
+
+
+def test_string_columns_are_converted_to_one_unit():
+    values, unit = solve_batch(compile_equation("f = m * a"), {"m": ["10kg", "500 g"], "a": (np.array([2.0, 4.0]), "m/s**2")})
+    assert unit == "newton"
+    assert values == pytest.approx([20.0, 2.0])
+
+
+def test_requested_output_unit():
+    values, unit = solve_batch(compile_equation("e = m * v ** 2"), {"m": [2.0], "v": ["3e8m/s"]}, unit="megajoule")
+    assert unit == "megajoule"
+    assert values[0] == pytest.approx(1.8e11)
+
+
+def test_more_than_one_unknown_is_rejected():
+    with pytest.raises(ValueError):
+        solve_batch(compile_equation("f = m * a"), {"m": np.array([1.0])})
@@ -0,0 +1,51 @@
+import pytest
+from backend import PhysicsAI
+from Physics_solver.chain_solver import PlanStep, find_plan, plan_cache, solve_chain
+
+CIRCUITS = ["v = i * r", "p = v * i", "q = i * t"]
+
+
+def test_two_step_chain():
+    result, plan = solve_chain(CIRCUITS, {"v": "10 volt", "r": "5 ohm"}, "p")
+    assert plan == (PlanStep("v=i*r", "i"), PlanStep("p=v*i", "p"))
+    assert str(result.units) == "watt"
+    assert result.magnitude == pytest.approx(20)
+
+
+def test_plans_are_cached_per_problem_shape():
+    plan_cache.clear()
+    first = find_plan(CIRCUITS, {"v", "r"}, "p")
+    second = find_plan(CIRCUITS, {"r", "v"}, "p")
+    assert first is second
+    assert plan_cache.stats()["hits"] == 1
+
+
+def test_only_needed_steps_are_kept():
+    plan = find_plan(CIRCUITS + ["s = u * t"], {"v", "r", "t", "u"}, "q")
+    assert [step.unknown for step in plan] == ["i", "q"]
+
+
+def test_unreachable_target():
+    with pytest.raises(ValueError):
+        find_plan(CIRCUITS, {"r"}, "p")
+
+
+def test_plan_cache_is_keyed_on_normalized_text():
+    plan_cache.clear()
+    first = find_plan(CIRCUITS, {"v", "r"}, "p")
+    assert find_plan(["v=i*r", "p = v*i", "q=i * t"], {"v", "r"}, "p") is first
+
+
+def test_homonyms_do_not_chain_across_dimensions():
+    # v is a velocity in v = a * t but a voltage in p = v * i: no power comes out of that.
+    equations = ["v = a * t", "p = v * i"]
+    with pytest.raises(ValueError, match="in watt"):
+        solve_chain(equations, {"a": "1 m/s**2", "t": "2s", "i": "3A"}, "p")
+    result = PhysicsAI().solve_chain("p", {"a": "1 m/s**2", "t": "2s", "i": "3A"})
+    assert result.startswith("Error: No chain of equations gives 'p' in watt")
+
+
+def test_inconsistent_links_are_skipped():
+    # s = v * t + x only balances when v * t is a length; with v a voltage the link is dropped.
+    with pytest.raises(ValueError):
+        solve_chain(["v = i * r", "s = v * t + x"], {"i": "2A", "r": "5 ohm", "t": "1s", "x": "1 m"}, "s")
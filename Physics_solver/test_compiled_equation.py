@@ -0,0 +1,92 @@
+import pytest
+from Physics_solver.cache import LRUCache
+from Physics_solver.compiled_equation import CompiledEquation, compile_equation, equation_cache, normalize_equation
+from Physics_solver.units import get_registry
+
+
+def test_compiled_rhs_is_a_callable():
+    compiled = CompiledEquation("F = m * a")
+    assert compiled.parameters == ["m", "a"]
+    assert compiled.evaluate({"m": 10, "a": 2}) == 20
+
+
+def test_functions_and_powers():
+    compiled = CompiledEquation("y = sqrt(x) + k^2")
+    assert compiled.parameters == ["x", "k"]
+    assert compiled.evaluate({"x": 16, "k": 3}) == pytest.approx(13)
+
+
+def test_function_names_are_case_insensitive():
+    compiled = CompiledEquation("y = SQRT(x) + Sin(k)")
+    assert compiled.parameters == ["x", "k"]
+    assert compiled.evaluate({"x": 16, "k": 0}) == pytest.approx(4)
+    assert compiled.solve_for("x").text == "sqrt(y - sin(k)) ** 4"
+
+
+def test_unsupported_syntax_is_rejected():
+    with pytest.raises(ValueError):
+        CompiledEquation("y = x.real")
+
+
+def test_cache_is_keyed_on_normalized_text():
+    equation_cache.clear()
+    first = compile_equation("f = m * a")
+    second = compile_equation("f=m*a")
+    assert first is second
+    assert normalize_equation("e = m * v^2") == "e=m*v**2"
+    stats = equation_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "b" not in cache and "a" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_constants_are_case_sensitive():
+    compiled = CompiledEquation("f = G * m * M / r ** 2")
+    assert compiled.parser.constants == ["G"]
+    assert compiled.parameters == ["m", "r"]  # M is the same variable as m
+
+
+def test_constant_sub_expressions_are_folded():
+    form = CompiledEquation("e = m * c_0 ** 2").solve_for("m")
+    assert list(form.constants.values()) == [299792458.0 ** 2]
+    assert form.parameters == ["e"]
+    assert form.function(299792458.0 ** 2) == pytest.approx(1.0)
+
+
+def test_constants_carry_units():
+    result = CompiledEquation("w = m * g_n").evaluate({"m": get_registry().Quantity(2, "kg")})
+    assert str(result.to("newton")) == "19.6133 newton"
+
+
+def test_constant_names_cannot_be_knowns():
+    from backend import PhysicsAI
+    result = PhysicsAI().solve_equation("w = m * g_n", {"m": "1kg", "g_n": "9.8"})
+    assert result.startswith("Error: 'g_n' (standard gravity)")
+
+
+def test_single_letters_stay_variables():
+    from backend import PhysicsAI
+    result = PhysicsAI().solve_equation("e = m * g * h", {"m": "2kg", "g": "9.8 m/s**2", "h": "10m"})
+    assert result == "e = 196.0 joule"
+    assert PhysicsAI().solve_equation("s = c * t", {"s": "10 m", "t": "5 s"}) == "c = 2.0 meter / second"
+
+
+def test_messages_show_constants_as_written():
+    form = CompiledEquation("x = c_0 ** y").solve_for("y")
+    assert form.text == "ln(x) / ln(c_0)"
+    from backend import PhysicsAI
+    result = PhysicsAI().solve_equation("x = c_0 ** y", {"x": "3"})
+    assert result.startswith("Error") and "ln(x) / ln(c_0)" in result and "__" not in result
+
+
+def test_number_to_a_dimensionless_power():
+    from backend import PhysicsAI
+    assert PhysicsAI().solve_equation("y = 2 ** x", {"x": "3"}) == "y = 8.0 dimensionless"
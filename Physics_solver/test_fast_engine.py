@@ -0,0 +1,57 @@
+import pytest
+from Physics_solver.compiled_equation import compile_equation
+from Physics_solver.equation_solver import EquationSolver
+from Physics_solver.fast_engine import FastPathUnavailable, check_dimensions, solve_fast
+from Physics_solver.unit_store import UnitAwareVariableStore
+from Physics_solver.units import get_registry
+
+CASES = [
+    ("f = m * a", {"m": "10kg", "a": "2 m/s**2"}),
+    ("f = m * a", {"f": "20 newton", "a": "2 m/s**2"}),
+    ("v = i * r", {"i": "2A", "r": "5ohm"}),
+    ("e = m * v ** 2", {"m": "2kg", "v": "3e8m/s"}),
+    ("e = m * v ** 2", {"e": "1.8e17 joule", "m": "2kg"}),
+    ("p = e / t", {"e": "100J", "t": "5s"}),
+    ("x = m * v", {"m": "2kg", "v": "3 m/s"}),
+    ("t = s / v", {"s": "100 km", "v": "50 km/hour"}),
+    ("a = f / m", {"f": "20 newton", "m": "500 g"}),
+    ("y = 10 ** x", {"x": "3"}),
+    ("y = log(x)", {"y": "2"}),
+]
+
+
+def _solve(equation, knowns, engine):
+    compiled = compile_equation(equation)
+    return EquationSolver(compiled.parser, UnitAwareVariableStore(knowns), compiled, engine=engine).solve_equation()
+
+
+@pytest.mark.parametrize("equation, knowns", CASES)
+def test_fast_engine_matches_pint(equation, knowns):
+    assert _solve(equation, knowns, "fast") == _solve(equation, knowns, "pint")
+
+
+def test_inconsistent_dimensions_fall_back_to_pint():
+    form = compile_equation("x = a + b").solve_for("x")
+    length, time = (1, 0, 0, 0, 0, 0, 0), (0, 0, 1, 0, 0, 0, 0)
+    with pytest.raises(FastPathUnavailable):
+        check_dimensions(form, (length, time))
+    assert _solve("x = a + b", {"a": "1 m", "b": "1 s"}, "fast").startswith("Error")
+
+
+def test_offset_units_are_not_fast():
+    converted = {"t": (20, get_registry().Unit("degC"))}
+    with pytest.raises(FastPathUnavailable):
+        solve_fast(compile_equation("x = 2 * t"), "x", converted)
+
+
+def test_complex_results_are_not_fast():
+    converted = UnitAwareVariableStore({"y": "1", "b": "9"}).converted
+    with pytest.raises(FastPathUnavailable):
+        solve_fast(compile_equation("y = x ** 3 + b"), "x", converted)
+
+
+def test_result_unit_when_ones_are_singular():
+    # Working out the unit on y = x3 = 1 would divide by zero.
+    knowns = {"x0": "48.19 cm", "x2": "34.01 cm", "x3": "28.84 m**3/s**2", "y": "25.57 m**3/s**2"}
+    equation = "y = x0 / x1 * x2 * c_0 + x3"
+    assert _solve(equation, knowns, "fast") == _solve(equation, knowns, "pint")
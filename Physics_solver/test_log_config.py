@@ -0,0 +1,64 @@
+import json
+import logging
+import pytest
+from backend import PhysicsAI
+from Physics_solver.log_config import RateLimitFilter, configure_logging, stop_logging
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "solver.log"
+    configure_logging(str(path), per_window=2, window=60.0)
+    yield path
+    stop_logging()
+
+
+def _records(path):
+    stop_logging()  # flushes the queue
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_json_with_solver_context(log_file):
+    PhysicsAI().solve_equation("x = a + b", {"a": "1 m", "b": "1 s"})
+    (record,) = _records(log_file)
+    assert record["level"] == "ERROR"
+    assert record["equation"] == "x = a + b"
+    assert record["variable"] == "x"
+    assert record["stage"] == "solve"
+
+
+def test_each_failure_is_logged_once(log_file):
+    PhysicsAI().solve_equation("f = m * a", {"m": "10 furlongz", "a": "2 m/s**2"})
+    records = _records(log_file)
+    assert len(records) == 1
+    assert records[0]["stage"] == "knowns"
+
+
+def test_repeated_errors_are_rate_limited(log_file):
+    for _ in range(10):
+        logging.error("Same failure")
+    logging.error("Different failure")
+    assert [record["message"] for record in _records(log_file)] == ["Same failure"] * 2 + ["Different failure"]
+
+
+def test_distinct_values_from_one_call_are_rate_limited(log_file):
+    for number in range(10):
+        PhysicsAI().solve_equation("f = m * a", {"m": f"{number} furlongz", "a": "2 m/s**2"})
+    assert len(_records(log_file)) == 2
+
+
+def test_rate_limit_reports_dropped_count():
+    limiter = RateLimitFilter(per_window=1, window=0.0)
+    record = logging.LogRecord("x", logging.ERROR, __file__, 1, "boom", None, None)
+    assert limiter.filter(record)
+    limiter.window = 60.0
+    assert not limiter.filter(record)
+    limiter.window = 0.0
+    fresh = logging.LogRecord("x", logging.ERROR, __file__, 1, "boom", None, None)
+    assert limiter.filter(fresh)
+    assert fresh.suppressed == 1
+
+
+def test_importing_backend_configures_nothing():
+    import backend  # noqa: F401
+    assert not any(isinstance(h, logging.FileHandler) for h in logging.getLogger().handlers)
@@ -0,0 +1,71 @@
+import pytest
+from backend import PhysicsAI
+from Physics_solver.metrics import Histogram, Metrics, metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.001, 0.01))
+    for seconds in (0.0005, 0.005, 0.005, 1.0):
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert [count for _, count in snapshot["buckets"]] == [1, 3, 4]
+
+
+def test_stages_are_timed():
+    ai = PhysicsAI()
+    ai.solve_from_natural_language("Find the force when mass is 10kg and acceleration is 2m/s^2")
+    stages = ai.stage_metrics()["stages"]
+    for stage in ("nlp_parse", "compile", "knowns", "evaluate", "preferred_units", "solve_equation"):
+        assert stages[stage]["count"] >= 1
+
+
+def test_errors_are_counted_by_category():
+    ai = PhysicsAI()
+    ai.solve_equation("f = m * a", {"m": "10 furlongz", "a": "2 m/s**2"})
+    ai.solve_equation("x = a + b", {"a": "1 m", "b": "1 s"})
+    ai.solve_equation("f = m * a * b", {"m": "10kg"})
+    ai.solve_from_natural_language("Find the mass when object is flying")
+    assert ai.stage_metrics()["counters"]["errors"] == {
+        "unknown_unit": 1, "dimensionality": 1, "multiple_unknowns": 1, "no_template": 1,
+    }
+
+
+def test_prometheus_export():
+    registry = Metrics()
+    registry.observe("evaluate", 0.0002)
+    registry.increment("errors", "dimensionality")
+    text = registry.to_prometheus()
+    assert 'physics_solver_stage_seconds_bucket{stage="evaluate",le="0.00025"} 1' in text
+    assert 'physics_solver_stage_seconds_count{stage="evaluate"} 1' in text
+    assert 'physics_solver_errors_total{category="dimensionality"} 1' in text
+
+
+def test_disabled_metrics_record_nothing():
+    registry = Metrics()
+    registry.enabled = False
+    registry.observe("evaluate", 0.1)
+    registry.increment("errors", "other")
+    assert registry.snapshot() == {"stages": {}, "counters": {}}
+
+
+def test_disabled_metrics_skip_the_clock(monkeypatch):
+    import backend
+    from Physics_solver import equation_solver, unit_store
+
+    def clock():
+        raise AssertionError("perf_counter read with metrics disabled")
+
+    for module in (backend, equation_solver, unit_store):
+        monkeypatch.setattr(module, "perf_counter", clock)
+    monkeypatch.setattr(metrics, "enabled", False)
+    unit_store.unit_cache.clear()
+    assert PhysicsAI().solve_equation("f = m * a", {"m": "17kg", "a": "2 m/s**2"}) == "f = 34.0 newton"
+    assert PhysicsAI(engine="fast").solve_equation("f = m * a", {"m": "17kg", "a": "3 m/s**2"}) == "f = 51.0 newton"
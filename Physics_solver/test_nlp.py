@@ -1,4 +1,4 @@
-from NLP_processing import NLPProcessor
+from Physics_solver.NLP_processing import NLPProcessor
 
 nlp = NLPProcessor()
 
@@ -0,0 +1,31 @@
+from Physics_solver.NLP_processing import NLPProcessor, Token, build_lexer
+
+nlp = NLPProcessor()
+
+
+def test_tokens_carry_number_unit_and_span():
+    tokens = list(nlp.tokenize("mass is 10kg and speed = 3e8m/s, time"))
+    assert tokens[0] == Token("mass", "10", "kg", (0, 12))
+    assert tokens[1].keyword == "speed" and tokens[1].number == "3e8" and tokens[1].unit == "m/s"
+    assert tokens[2] == Token("time", None, None, (33, 37))
+
+
+def test_keywords_match_whole_words_only():
+    assert [token.keyword for token in nlp.tokenize("masses of timetable")] == []
+
+
+def test_parse_contract_is_unchanged():
+    equation, values = nlp.parse("Find the force when mass is 10kg and acceleration is 2m/s^2")
+    assert equation == "f = m * a"
+    assert values == {"m": "10kg", "a": "2m/s^2"}
+
+
+def test_first_value_per_keyword_wins():
+    _, values = nlp.parse("mass is 2kg, later the mass is 3kg")
+    assert values == {"m": "2kg"}
+
+
+def test_large_vocabulary_and_empty_vocabulary():
+    lexer = build_lexer([f"word{index}x" for index in range(5000)] + ["mass"])
+    assert lexer.search("the mass is 4kg").group("number") == "4"
+    assert build_lexer([]).search("mass is 4kg") is None
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from backend import PhysicsAI
+from Physics_solver.compiled_equation import compile_equation
+from Physics_solver.numeric_solver import Dual, find_roots, infer_unknown_dimensions, residual_form, solve_numeric
+from Physics_solver.unit_store import UnitAwareVariableStore
+
+
+def test_dual_numbers_carry_derivatives():
+    x = Dual(2.0, 1.0)
+    result = 3 * x ** 2 + 1 / x
+    assert result.value == pytest.approx(12.5)
+    assert result.derivative == pytest.approx(12 - 0.25)
+
+
+def test_find_roots_is_vectorized():
+    k = np.array([1.0, 4.0, 9.0])
+    roots = find_roots(lambda x: x * x - k, np.ones(3))
+    assert roots == pytest.approx([1.0, 2.0, 3.0])
+
+
+def test_find_roots_reports_no_root_as_nan():
+    assert np.isnan(find_roots(lambda x: x * x + 1, np.ones(1))[0])
+
+
+def test_unknown_dimensions_come_from_the_equation():
+    form = residual_form(compile_equation("s = u * t + 0.5 * a * t ** 2"))
+    length, speed = (1, 0, 0, 0, 0, 0, 0), (1, 0, -1, 0, 0, 0, 0)
+    acceleration = (1, 0, -2, 0, 0, 0, 0)
+    env = {"s": length, "u": speed, "a": acceleration}
+    assert infer_unknown_dimensions(form.tree, env, "t") == (0, 0, 1, 0, 0, 0, 0)
+
+
+def test_solve_numeric_quadratic_in_time():
+    compiled = compile_equation("s = u * t + 0.5 * a * t ** 2")
+    store = UnitAwareVariableStore({"s": "10 m", "u": "1 m/s", "a": "2 m/s**2"})
+    value, unit = solve_numeric(compiled, "t", store.converted)
+    assert value == pytest.approx((-1 + 41 ** 0.5) / 2)
+    assert unit == "second"
+
+
+def test_physics_ai_falls_back_to_numeric_solve():
+    ai = PhysicsAI()
+    assert ai.solve_equation("x = cos(x)", {}) == "x = 0.74 dimensionless"
+    assert ai.solve_equation("x = x + 1", {}).startswith("Error")
+
+
+def test_batch_solve_of_implicit_equation():
+    ai = PhysicsAI()
+    values, unit = ai.solve_batch("s = u*t + 0.5*a*t**2", {
+        "s": (np.array([10.0, 20.0]), "m"),
+        "u": (np.array([1.0, 1.0]), "m/s"),
+        "a": (np.array([2.0, 2.0]), "m/s**2"),
+    })
+    assert values == pytest.approx([(-1 + 41 ** 0.5) / 2, 4.0])
+    assert unit == "second"
@@ -0,0 +1,109 @@
+import json
+import pytest
+from backend import PhysicsAI
+from Physics_solver.metrics import metrics
+from Physics_solver.oracle import Oracle, ProblemGenerator, reference_solve
+
+
+def test_agreeing_results_are_not_recorded(tmp_path):
+    oracle = Oracle(rate=1.0, path=str(tmp_path / "divergences.jsonl"))
+    knowns = {"m": "10kg", "a": "2 m/s**2"}
+    assert oracle.check("f = m * a", knowns, "f = 20.0 newton")
+    # The same answer in another unit, and rounded to 2 decimals, still agrees.
+    assert oracle.check("f = m * a", knowns, "f = 0.02 kilonewton")
+    assert oracle.check("t = s / v", {"s": "10 m", "v": "3 m/s"}, "t = 3.33 second")
+    assert oracle.check("f = m * a", {"m": "10kg"}, "Error: Multiple unknown variables")
+    assert not (tmp_path / "divergences.jsonl").exists()
+
+
+@pytest.mark.parametrize("result", [
+    "f = 21.0 newton",
+    "f = 20.0 joule",
+    "m = 20.0 newton",
+    "Error: Something broke",
+])
+def test_divergences_are_recorded_with_the_full_input(tmp_path, result):
+    path = tmp_path / "divergences.jsonl"
+    knowns = {"m": "10kg", "a": "2 m/s**2"}
+    assert not Oracle(rate=1.0, path=str(path)).check("f = m * a", knowns, result, engine="fast")
+    with open(path, encoding="utf-8") as handle:
+        entry = json.loads(handle.readline())
+    assert entry["equation"] == "f = m * a" and entry["knowns"] == knowns
+    assert entry["engine"] == "fast" and entry["result"] == result and entry["reason"]
+
+
+def test_unrounded_solutions_are_held_to_rel_tol(tmp_path):
+    oracle = Oracle(rate=1.0, path=str(tmp_path / "divergences.jsonl"))
+    knowns = {"q": "0.001 coulomb", "t": "1 hour"}  # i = 2.78e-7 A prints as 0.0
+    assert oracle.compare("q = i * t", knowns, "i = 0.0 ampere", (0.001 / 3600, "ampere")) is None
+    assert oracle.compare("q = i * t", knowns, "i = 0.0 ampere", (0.004, "ampere"))
+    assert oracle.compare("q = i * t", knowns, "i = 0.0 kiloampere", (0.0, "kiloampere"))
+    assert oracle.compare("q = i * t", knowns, "i = 0.0 ampere", (0.001 / 3600 * (1 + 1e-6), "ampere"))
+
+
+def test_physics_ai_passes_its_unrounded_solution(tmp_path):
+    path = tmp_path / "divergences.jsonl"
+    oracle = Oracle(rate=1.0, path=str(path))
+    for engine in ("pint", "fast"):
+        ai = PhysicsAI(engine=engine, oracle=oracle)
+        assert ai.solve_equation("q = i * t", {"q": "0.001 coulomb", "t": "1 hour"}).startswith("i = 0.0")
+    assert oracle.counts == {("pint", "agree"): 1, ("fast", "agree"): 1}
+    assert not path.exists()
+
+
+def test_reference_failing_alone_is_a_divergence(tmp_path):
+    oracle = Oracle(rate=1.0, path=str(tmp_path / "divergences.jsonl"))
+    assert oracle.compare("x = a + b", {"a": "1 m", "b": "1 s"}, "x = 2.0 meter").startswith("reference failed")
+
+
+def test_reference_solve():
+    unknown, current = reference_solve("v = i * r", {"v": "10V", "r": "5ohm"})
+    assert unknown == "i" and current.to("ampere").magnitude == pytest.approx(2)
+    unknown, power = reference_solve("p = e / t", {"e": "100J", "t": "5s"})
+    assert unknown == "p" and power.to("watt").magnitude == pytest.approx(20)
+    # The real cube root, which the solvers' principal (complex) root misses.
+    assert reference_solve("y = x ** 3 + b", {"y": "1", "b": "9"})[1].magnitude == pytest.approx(-2)
+    with pytest.raises(ValueError, match="No real solution"):
+        reference_solve("y = x ** 2 + b", {"y": "1", "b": "9"})
+
+
+def test_catches_a_planted_rearrange_bug(tmp_path, monkeypatch):
+    from Physics_solver import rearrange
+    from Physics_solver.compiled_equation import equation_cache
+    oracle = Oracle(rate=1.0, path=str(tmp_path / "divergences.jsonl"))
+    ai = PhysicsAI(oracle=oracle)
+    monkeypatch.setitem(rearrange._INVERSE_CALLS, "sqrt", lambda y: y)  # x = y instead of y ** 2
+    equation_cache.clear()
+    try:
+        assert ai.solve_equation("y = sqrt(x)", {"y": "3"}).startswith("x = 3 ")
+    finally:
+        equation_cache.clear()
+    assert oracle.counts == {("pint", "diverge"): 1}
+    with open(tmp_path / "divergences.jsonl", encoding="utf-8") as handle:
+        assert "reference gave 9" in json.loads(handle.readline())["reason"]
+
+
+def test_generated_problems_are_repeatable():
+    first = list(ProblemGenerator(seed=3).problems(20))
+    assert first == list(ProblemGenerator(seed=3).problems(20))
+    assert all(problem["equation"].startswith("y = ") and problem["knowns"] for problem in first)
+
+
+def test_engines_agree_with_the_reference_on_generated_problems(tmp_path):
+    oracle = Oracle(rate=1.0, path=str(tmp_path / "divergences.jsonl"))
+    fast = PhysicsAI(engine="fast", oracle=Oracle(rate=0))
+    solved = 0
+    for problem in ProblemGenerator(seed=1).problems(50):
+        result = fast.solve_equation(problem["equation"], problem["knowns"])
+        solved += not result.startswith("Error")
+        assert oracle.check(problem["equation"], problem["knowns"], result, "fast"), result
+    assert solved > 25
+
+
+def test_physics_ai_checks_sampled_solves(tmp_path):
+    path = tmp_path / "divergences.jsonl"
+    ai = PhysicsAI(oracle=Oracle(rate=1.0, path=str(path)))
+    before = metrics.snapshot()["counters"].get("oracle_checks", {}).get("", 0)
+    assert ai.solve_equation("v = i * r", {"i": "2A", "r": "5ohm"}) == "v = 10.0 volt"
+    assert metrics.snapshot()["counters"]["oracle_checks"][""] == before + 1
+    assert not path.exists()
@@ -0,0 +1,56 @@
+import pytest
+from backend import PhysicsAI
+from Physics_solver.batch_solver import solve_batch
+from Physics_solver.compiled_equation import compile_equation
+from Physics_solver.equation_solver import to_preferred_units
+from Physics_solver.fast_engine import OutputUnitTable, output_units
+from Physics_solver.units import get_registry, preferred_units
+
+
+@pytest.fixture
+def restore_table():
+    saved = dict(output_units.by_dimension), dict(output_units.by_variable)
+    yield
+    output_units.by_dimension, output_units.by_variable = saved
+
+
+def test_lookup_matches_the_old_fallbacks():
+    table = OutputUnitTable()
+    ureg = get_registry()
+    force = to_preferred_units("x", ureg.Quantity(10, "kilogram * meter / second ** 2"))
+    assert (force.magnitude, str(force.units)) == (10, "newton")
+    voltage = to_preferred_units("v", ureg.Quantity(2, "ampere") * ureg.Quantity(5, "ohm"))
+    assert str(voltage.units) == "volt"
+    assert table.lookup("t", (0, 0, 1, 0, 0, 0, 0)) == ("second", 1.0)
+    assert table.lookup("x", (1, 0, 0, 0, 0, 0, 0)) is None
+
+
+def test_no_preference_gives_compact_base_units():
+    result = to_preferred_units("x", get_registry().Quantity(2500, "meter"))
+    assert (result.magnitude, str(result.units)) == (2.5, "kilometer")
+
+
+def test_register_variable_unit(restore_table):
+    ai = PhysicsAI()
+    ai.register_preferred_unit("km", "s")
+    assert ai.solve_equation("s = v * t", {"v": "10 m/s", "t": "50s"}) == "s = 0.5 kilometer"
+    assert PhysicsAI(engine="fast").solve_equation("s = v * t", {"v": "10 m/s", "t": "50s"}) == "s = 0.5 kilometer"
+
+
+def test_registrations_stay_in_the_table(restore_table):
+    shipped = dict(preferred_units)
+    output_units.register("km", "s")
+    assert preferred_units == shipped
+    values, unit = solve_batch(compile_equation("s = v * t"), {"v": ([10, 20], "m/s"), "t": ([50, 50], "s")})
+    assert (list(values), unit) == ([0.5, 1.0], "kilometer")
+
+
+def test_register_dimension_unit(restore_table):
+    ai = PhysicsAI()
+    ai.register_preferred_unit("kilowatt_hour")
+    assert ai.solve_equation("x = p * t", {"p": "1000 watt", "t": "7200s"}) == "x = 2.0 kilowatt_hour"
+
+
+def test_offset_units_cannot_be_preferred():
+    with pytest.raises(ValueError):
+        OutputUnitTable().register("degC", "t")
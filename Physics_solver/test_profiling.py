@@ -0,0 +1,31 @@
+import json
+import os
+from backend import PhysicsAI
+from Physics_solver.profiling import Profiler
+
+
+def test_sampled_calls_are_captured(tmp_path):
+    ai = PhysicsAI(profiler=Profiler(rate=1.0, directory=str(tmp_path)))
+    assert ai.solve_from_natural_language("Power when energy is 100J and time is 5s") == "p = 20.0 watt"
+    files = sorted(os.listdir(tmp_path))
+    # The nested solve_equation call is part of the sentence's capture, not a capture of its own.
+    assert len(files) == 2 and files[0].endswith("solve_from_natural_language.json")
+    with open(tmp_path / files[0], encoding="utf-8") as handle:
+        capture = json.load(handle)
+    assert capture["stage"] == "solve_from_natural_language"
+    assert capture["input"] == {"sentence": "Power when energy is 100J and time is 5s"}
+    assert capture["seconds"] > 0 and capture["peak_memory"] > 0
+    assert capture["allocations"]
+
+
+def test_unsampled_calls_write_nothing(tmp_path):
+    ai = PhysicsAI(profiler=Profiler(rate=0.0, directory=str(tmp_path / "profiles")))
+    assert ai.solve_equation("f = m * a", {"m": "10kg", "a": "2 m/s**2"}) == "f = 20.0 newton"
+    assert not os.path.exists(tmp_path / "profiles")
+
+
+def test_rate_from_environment(monkeypatch):
+    monkeypatch.setenv("PHYSICS_SOLVER_PROFILE", "0.25")
+    monkeypatch.setenv("PHYSICS_SOLVER_PROFILE_MEMORY", "0")
+    profiler = Profiler()
+    assert profiler.rate == 0.25 and not profiler.memory
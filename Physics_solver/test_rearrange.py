@@ -0,0 +1,43 @@
+import pytest
+from backend import PhysicsAI
+from Physics_solver.compiled_equation import CompiledEquation
+from Physics_solver.rearrange import NotIsolableError
+
+
+@pytest.mark.parametrize("equation, unknown, values, expected", [
+    ("f = m * a", "m", {"f": 20, "a": 2}, 10),
+    ("f = m * a", "a", {"f": 20, "m": 10}, 2),
+    ("p = e / t", "t", {"p": 20, "e": 100}, 5),
+    ("e = m * v ** 2", "v", {"e": 18, "m": 2}, 3),
+    ("s = u * t - x", "x", {"s": 4, "u": 2, "t": 3}, 2),
+    ("y = sqrt(x)", "x", {"y": 3}, 9),
+    ("x = 2 ** k", "k", {"x": 8}, 3),
+])
+def test_isolates_the_unknown(equation, unknown, values, expected):
+    form = CompiledEquation(equation).solve_for(unknown)
+    assert form.evaluate(values) == pytest.approx(expected)
+
+
+def test_rearranged_forms_are_cached():
+    compiled = CompiledEquation("v = i * r")
+    assert compiled.solve_for("r") is compiled.solve_for("R")
+
+
+def test_repeated_unknown_is_not_isolable():
+    compiled = CompiledEquation("s = u * t + 0.5 * a * t ** 2")
+    with pytest.raises(NotIsolableError):
+        compiled.solve_for("t")
+
+
+def test_log_inverts_to_a_power_of_ten():
+    assert PhysicsAI().solve_equation("y = log(x)", {"y": "2"}) == "x = 100.0 dimensionless"
+
+
+@pytest.mark.parametrize("engine", ["pint", "fast"])
+@pytest.mark.parametrize("equation, knowns", [
+    ("y = sqrt(x)", {"y": "-3"}),
+    ("y = x ** 2", {"y": "-4 m**2"}),
+    ("y = x ** 0.5 + b", {"y": "1", "b": "3"}),
+])
+def test_no_real_solution_is_reported(engine, equation, knowns):
+    assert PhysicsAI(engine=engine).solve_equation(equation, knowns) == "Error: No real solution for x"
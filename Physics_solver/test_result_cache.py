@@ -0,0 +1,52 @@
+import sqlite3
+from backend import PhysicsAI
+from Physics_solver.fast_engine import output_units
+from Physics_solver.result_cache import ResultCache
+
+
+def test_equivalent_knowns_share_an_entry():
+    cache = ResultCache()
+    ai = PhysicsAI(result_cache=cache)
+    assert ai.solve_equation("f = m * a", {"m": "10kg", "a": "2 m/s**2"}) == "f = 20.0 newton"
+    assert ai.solve_equation("f = m*a", {"m": "10000 gram", "a": "2 m/s**2"}) == "f = 20.0 newton"
+    assert ai.solve_equation("f = m * a", {"m": "10 kilogram", "a": "200 cm/s**2"}) == "f = 20.0 newton"
+    assert cache.stats()["hits"] == 2
+    assert len(cache.memory) == 1
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache()
+    ai = PhysicsAI(result_cache=cache)
+    assert ai.solve_equation("x = a + b", {"a": "1 m", "b": "1 s"}).startswith("Error")
+    assert len(cache.memory) == 0
+
+
+def test_disk_tier_is_shared(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    PhysicsAI(result_cache=ResultCache(path)).solve_equation("p = e / t", {"e": "100J", "t": "5s"})
+    other = ResultCache(path)
+    assert PhysicsAI(result_cache=other).solve_equation("p = e / t", {"e": "0.1 kilojoule", "t": "5s"}) == "p = 20.0 watt"
+    assert other.stats()["disk_hits"] == 1
+
+
+def test_shared_by_worker_processes(tmp_path):
+    import io
+    import json
+    from batch_runner import run
+    path = str(tmp_path / "results.sqlite")
+    lines = "\n".join(json.dumps({"equation": "v = i * r", "knowns": {"i": f"{n}A", "r": "5ohm"}}) for n in range(1, 9))
+    run(io.StringIO(lines), io.StringIO(), workers=2, chunk_size=2, cache_path=path)
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 8
+
+
+def test_changing_preferred_units_changes_the_version():
+    saved = dict(output_units.by_dimension), dict(output_units.by_variable)
+    cache = ResultCache()
+    before = cache.version()
+    try:
+        output_units.register("km", "s")
+        assert cache.version() != before
+    finally:
+        output_units.by_dimension, output_units.by_variable = saved
+        output_units.revision += 1
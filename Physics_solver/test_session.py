@@ -0,0 +1,52 @@
+import pytest
+from backend import PhysicsAI
+from Physics_solver.session import IncrementalExpression, SolveSession
+from Physics_solver.compiled_equation import compile_equation
+
+
+def test_set_re_solves():
+    session = SolveSession("f = m * a", {"m": "10kg", "a": "2 m/s**2"})
+    assert session.solve() == "f = 20.0 newton"
+    session.set("m", "12kg")
+    assert session.solve() == "f = 24.0 newton"
+    session.set("a", "300 cm/s**2")
+    assert session.solve() == "f = 36.0 newton"
+
+
+@pytest.mark.parametrize("equation, knowns", [
+    ("e = m * v ** 2", {"m": "2kg", "v": "3e8m/s"}),
+    ("t = 2 * 3.14159 * sqrt(l / g)", {"l": "1 m"}),
+    ("t = s / v", {"s": "100 km", "v": "50 km/hour"}),
+    ("x = cos(x) * y", {"y": "1"}),
+    ("x = a + b", {"a": "1 m", "b": "1 s"}),
+])
+def test_matches_full_solve(equation, knowns):
+    assert SolveSession(equation, knowns).solve() == PhysicsAI().solve_equation(equation, knowns)
+
+
+def test_only_dependent_sub_expressions_are_re_evaluated():
+    expression = IncrementalExpression(compile_equation("y = (a + b) * sqrt(d * 2)").rhs, "y")
+    values = {"a": 1.0, "b": 2.0, "d": 8.0}
+    assert expression.evaluate(values) == 12.0
+    calls = []
+    for index, (function, children) in enumerate(expression.operations):
+        if function is not None:
+            expression.operations[index] = (lambda *args, f=function, i=index: calls.append(i) or f(*args), children)
+    values["a"] = 3.0
+    assert expression.evaluate(values, {"a"}) == 20.0
+    assert len(calls) == 2  # a + b and the product; sqrt(d * 2) is reused
+
+
+def test_changing_the_unknown():
+    session = SolveSession("v = i * r", {"i": "2A", "r": "5ohm"})
+    assert session.solve() == "v = 10.0 volt"
+    session.update({"v": "10V", "r": "5ohm"})
+    assert session.solve() == "i = 2.0 ampere"
+
+
+def test_errors_are_reported():
+    session = SolveSession("f = m * a", {"m": "10kg"})
+    assert session.solve().startswith("Error: Multiple unknown variables")
+    with pytest.raises(ValueError):
+        session.set("a", "2 furlongs/blorp")
+    assert "a" not in session.raw
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from backend import PhysicsAI
+
+
+def test_sweep_yields_fixed_size_chunks():
+    velocities = np.linspace(0, 10, 1001)
+    chunks = list(PhysicsAI().sweep("e = m * v ** 2", {"m": "2kg", "v": (velocities, "m/s")}, chunk_size=300))
+    assert [len(chunk.values) for chunk in chunks] == [300, 300, 300, 101]
+    values = np.concatenate([chunk.values for chunk in chunks])
+    assert values == pytest.approx(2 * velocities ** 2)
+    assert chunks[0].unit == "joule"
+    assert chunks[1].inputs["v"] == pytest.approx(velocities[300:600])
+
+
+def test_grid_sweep_matches_meshgrid():
+    masses, accelerations = np.array([1.0, 2.0, 3.0]), np.array([0.5, 1.0])
+    chunks = list(PhysicsAI().sweep("f = m * a", {"m": masses, "a": accelerations}, chunk_size=4))
+    values = np.concatenate([chunk.values for chunk in chunks]).reshape(3, 2)
+    m, a = np.meshgrid(masses, accelerations, indexing="ij")
+    assert values == pytest.approx(m * a)
+
+
+def test_zipped_sweep_needs_equal_lengths():
+    ai = PhysicsAI()
+    (chunk,) = ai.sweep("f = m * a", {"m": [1.0, 2.0], "a": [3.0, 4.0]}, grid=False)
+    assert chunk.values == pytest.approx([3.0, 8.0])
+    with pytest.raises(ValueError):
+        list(ai.sweep("f = m * a", {"m": [1.0, 2.0], "a": [3.0]}, grid=False))
+
+
+def test_sweep_to_memory_mapped_file(tmp_path):
+    path = tmp_path / "power.npy"
+    output, unit = PhysicsAI().sweep_to_npy(
+        "p = i ** 2 * r", {"i": np.arange(1.0, 5.0), "r": np.array([1.0, 10.0, 100.0])}, str(path), chunk_size=5,
+    )
+    assert unit == "watt"
+    stored = np.load(path)
+    assert stored.shape == (4, 3)
+    assert stored == pytest.approx(np.arange(1.0, 5.0)[:, None] ** 2 * np.array([1.0, 10.0, 100.0]))
@@ -0,0 +1,52 @@
+import json
+import pytest
+from Physics_solver.NLP_processing import NLPProcessor
+from Physics_solver.template_library import EquationTemplate, TemplateLibrary, default_library
+
+
+def test_default_library_loads_from_data_file():
+    library = default_library()
+    assert len(library) >= 4
+    assert library.best({"force", "mass", "acceleration"}).template.equation == "f = m * a"
+
+
+def test_ranking_prefers_complete_then_more_keywords():
+    matches = default_library().match({"power", "voltage", "current", "resistance"}, limit=3)
+    assert all(match.complete for match in matches)
+    assert matches[0].template.equation == "v = i * r"
+
+
+def test_partial_matches_report_missing_keywords():
+    library = default_library()
+    assert library.best({"mass"}) is None
+    matches = library.match({"mass", "force"})
+    assert matches[0].template.name == "Newton's Second Law"
+    assert matches[0].missing == {"acceleration"}
+
+
+def test_lookup_only_visits_indexed_templates(tmp_path):
+    keywords = {f"k{index}": f"x{index}" for index in range(3000)}
+    templates = [{"name": f"t{index}", "equation": f"x{index} = x{index + 1} * x{index + 2}",
+                  "keywords": [f"k{index}", f"k{index + 1}", f"k{index + 2}"]} for index in range(2990)]
+    path = tmp_path / "templates.json"
+    path.write_text(json.dumps({"keywords": keywords, "templates": templates}))
+    library = TemplateLibrary.from_file(str(path))
+    assert library.best({"k100", "k101", "k102"}).template.name == "t100"
+    assert len(library.index["k100"]) == 3
+
+
+def test_nlp_uses_a_custom_library():
+    library = TemplateLibrary({"weight": "w", "mass": "m", "gravity": "g"})
+    library.add(EquationTemplate("Weight", "W = mg", "w = m * g", frozenset(["weight", "mass", "gravity"]), "mechanics"))
+    equation, values = NLPProcessor(library).parse("weight when mass is 2kg and gravity is 9.8")
+    assert equation == "w = m * g"
+    assert values == {"m": "2kg", "g": "9.8"}
+
+
+def test_templates_must_use_every_given_value():
+    nlp = NLPProcessor()
+    assert nlp.parse("Calculate energy when mass is 2kg and speed is 3m/s") == (None, {"m": "2kg", "v": "3m/s"})
+    assert nlp.parse("Calculate energy when mass is 2kg")[0] == "e = m * c_0 ** 2"
+    from backend import PhysicsAI, NoTemplateError
+    with pytest.raises(NoTemplateError, match=r"E = mc\^2 \(leaves a given value unused\)"):
+        PhysicsAI().solve_sentence("Calculate energy when mass is 2kg and speed is 3m/s")
@@ -0,0 +1,56 @@
+import pytest
+from backend import PhysicsAI
+from Physics_solver.uncertainty import parse_uncertain
+from Physics_solver.unit_store import UnitAwareVariableStore
+
+KNOWNS = {"m": "10kg ± 0.1", "a": "2 +/- 0.05 m/s**2"}
+EXPECTED_STD = ((2 * 0.1) ** 2 + (10 * 0.05) ** 2) ** 0.5
+
+
+def test_parse_uncertain_forms():
+    assert parse_uncertain("m", "10kg ± 0.1")[:2] == (10.0, 0.1)
+    assert parse_uncertain("m", "10 +/- 0.1 kilogram") == (10.0, 0.1, "kilogram", "normal")
+    assert parse_uncertain("m", "10kg ± 100 gram").width == pytest.approx(0.1)
+    assert parse_uncertain("m", "10kg ± 2%").width == pytest.approx(0.2)
+    assert parse_uncertain("v", {"value": "3 m/s", "uncertainty": 0.3, "distribution": "uniform"}).distribution == "uniform"
+    assert parse_uncertain("m", "10kg") is None
+    with pytest.raises(ValueError):
+        parse_uncertain("m", {"value": "10kg", "uncertainty": 1, "distribution": "cauchy"})
+
+
+def test_variable_store_keeps_the_nominal_value():
+    store = UnitAwareVariableStore({"m": "10kg ± 0.1"})
+    assert store.converted["m"][0] == 10
+    assert store.uncertainties == {"m": "0.1"}
+
+
+def test_monte_carlo_matches_first_order_for_linear_problem():
+    ai = PhysicsAI()
+    sampled = ai.propagate_uncertainty("f = m * a", KNOWNS, samples=200000, seed=7, chunk_size=30000)
+    assert sampled.unit == "newton"
+    assert sampled.samples == 200000
+    assert sampled.mean == pytest.approx(20, rel=1e-3)
+    assert sampled.std == pytest.approx(EXPECTED_STD, rel=0.02)
+    assert sampled.percentiles[50] == pytest.approx(20, rel=1e-3)
+    assert sampled.percentiles[97.5] == pytest.approx(20 + 1.96 * EXPECTED_STD, rel=0.01)
+
+
+def test_monte_carlo_is_reproducible_with_a_seed():
+    ai = PhysicsAI()
+    first = ai.propagate_uncertainty("f = m * a", KNOWNS, samples=1000, seed=3)
+    assert ai.propagate_uncertainty("f = m * a", KNOWNS, samples=1000, seed=3) == first
+
+
+def test_linearized_mode():
+    result = PhysicsAI().propagate_uncertainty("f = m * a", KNOWNS, method="linear")
+    assert (result.mean, result.unit) == (pytest.approx(20), "newton")
+    assert result.std == pytest.approx(EXPECTED_STD, rel=1e-6)
+
+
+def test_implicit_equations_propagate_too():
+    result = PhysicsAI().propagate_uncertainty(
+        "s = u*t + 0.5*a*t**2", {"s": "10 m ± 0.5", "u": "1 m/s", "a": "2 m/s**2"}, method="linear",
+    )
+    assert result.unit == "second"
+    assert result.mean == pytest.approx((-1 + 41 ** 0.5) / 2)
+    assert result.std > 0
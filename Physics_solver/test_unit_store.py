@@ -0,0 +1,28 @@
+import pytest
+from Physics_solver.unit_store import UnitAwareVariableStore, convert_value, normalize_units, unit_cache
+
+
+def test_compact_units_are_normalized():
+    assert normalize_units("2A") == "2 ampere"
+    assert normalize_units("3 amps") == "3 ampere"
+    assert normalize_units("5ohm") == "5 ohm"
+
+
+def test_repeated_knowns_hit_the_memo():
+    unit_cache.clear()
+    first = convert_value("m", "10kg")
+    second = convert_value("m", "10kg")
+    assert first == second
+    stats = unit_cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+
+
+def test_default_unit_is_part_of_the_key():
+    unit_cache.clear()
+    assert str(convert_value("m", "5")[1]) == "kilogram"
+    assert str(convert_value("t", "5")[1]) == "second"
+
+
+def test_store_reports_bad_units():
+    with pytest.raises(ValueError):
+        UnitAwareVariableStore({"m": "10 blargs"})
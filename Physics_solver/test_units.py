@@ -0,0 +1,20 @@
+import pytest
+from Physics_solver.units import get_registry, set_cache_folder
+
+
+def test_registry_is_shared():
+    assert get_registry() is get_registry()
+
+
+def test_custom_aliases_and_voltage_dimension():
+    ureg = get_registry()
+    voltage = (ureg("2 A") * ureg("5 Ω")).to("volt")
+    assert voltage.magnitude == pytest.approx(10)
+    assert voltage.check("[voltage]")
+    assert ureg("3 kg").to("gram").magnitude == pytest.approx(3000)
+
+
+def test_cache_folder_is_fixed_once_built():
+    get_registry()
+    with pytest.raises(RuntimeError):
+        set_cache_folder(None)
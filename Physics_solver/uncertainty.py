@@ -0,0 +1,178 @@
+import re
+from collections import namedtuple
+from statistics import NormalDist
+import numpy as np
+from Physics_solver.batch_solver import solve_batch
+from Physics_solver.unit_store import convert_value, split_uncertainty
+from Physics_solver.units import get_registry
+
+# A known with an uncertainty, in the known's own unit. width is the standard
+# deviation for "normal" and the half-width for "uniform".
+UncertainValue = namedtuple("UncertainValue", ["value", "width", "unit", "distribution"])
+
+UncertaintyResult = namedtuple("UncertaintyResult", ["mean", "std", "percentiles", "unit", "samples", "method"])
+
+DISTRIBUTIONS = ("normal", "uniform")
+
+# Histogram resolution for Monte Carlo percentiles.
+_BINS = 8192
+
+
+def _bare_number(text: str) -> bool:
+    return re.fullmatch(r"\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*", text) is not None
+
+
+def parse_uncertain(var: str, raw):
+    """
+    Reads one known as an UncertainValue, or returns None for a plain value.
+    Accepts "10kg ± 0.1", "10 +/- 0.1 kg", "10kg ± 100g", "10kg ± 1%", and
+    {"value": "10kg", "uncertainty": "0.1", "distribution": "uniform"}.
+    """
+    distribution = "normal"
+    if isinstance(raw, dict):
+        value_text, error_text = str(raw["value"]), raw.get("uncertainty")
+        distribution = raw.get("distribution", "normal")
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{distribution}' for '{var}'. Use one of {DISTRIBUTIONS}.")
+        if error_text is None:
+            return None
+        error_text = str(error_text)
+    else:
+        value_text, error_text = split_uncertainty(raw)
+        if error_text is None:
+            return None
+
+    ureg = get_registry()
+    if error_text.strip().endswith("%"):
+        magnitude, unit = convert_value(var, value_text)
+        return UncertainValue(float(magnitude), abs(float(magnitude)) * float(error_text.strip()[:-1]) / 100,
+                              str(unit), distribution)
+
+    if _bare_number(value_text) and not _bare_number(error_text):
+        # "10 ± 0.1 kg": the unit after the uncertainty belongs to both.
+        error = ureg(error_text)
+        return UncertainValue(float(value_text), float(error.magnitude), str(error.units), distribution)
+
+    magnitude, unit = convert_value(var, value_text)
+    if _bare_number(error_text):
+        width = float(error_text)
+    else:
+        width = ureg(error_text).to(unit).magnitude
+    return UncertainValue(float(magnitude), float(width), str(unit), distribution)
+
+
+def _std(known: UncertainValue) -> float:
+    return known.width / np.sqrt(3) if known.distribution == "uniform" else known.width
+
+
+def _draw(rng, known: UncertainValue, size: int):
+    if known.distribution == "uniform":
+        return rng.uniform(known.value - known.width, known.value + known.width, size)
+    return rng.normal(known.value, known.width, size)
+
+
+def _split(knowns: dict):
+    uncertain, fixed = {}, {}
+    for var, raw in knowns.items():
+        var = var.lower()
+        known = parse_uncertain(var, raw)
+        if known is None:
+            magnitude, unit = convert_value(var, raw)
+            fixed[var] = (float(magnitude), str(unit))
+        else:
+            uncertain[var] = known
+    if not uncertain:
+        raise ValueError("No known has an uncertainty to propagate.")
+    return uncertain, fixed
+
+
+def _sample_chunks(compiled, uncertain: dict, fixed: dict, samples: int, chunk_size: int, seed: int, unit: str):
+    """
+    Yields the solved values chunk by chunk. The same seed gives the same
+    sequence, so a second pass can revisit the samples without storing them.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, samples, chunk_size):
+        size = min(chunk_size, samples - start)
+        columns = {var: (_draw(rng, known, size), known.unit) for var, known in uncertain.items()}
+        for var, (magnitude, known_unit) in fixed.items():
+            columns[var] = (np.full(size, magnitude), known_unit)
+        values, unit = solve_batch(compiled, columns, unit)
+        yield values, unit
+
+
+def monte_carlo(compiled, knowns: dict, samples: int = 100000, percentiles=(2.5, 50, 97.5),
+                chunk_size: int = 65536, seed: int = None, unit: str = None) -> UncertaintyResult:
+    """
+    Propagates uncertainties by sampling every uncertain known and solving all
+    samples of a chunk in one vectorized call. Memory is bounded by chunk_size.
+    Mean and standard deviation are accumulated chunk by chunk; percentiles come
+    from a second pass over the same seeded samples into a fine histogram.
+    Samples with no solution (NaN) are left out.
+    """
+    uncertain, fixed = _split(knowns)
+    seed = np.random.SeedSequence(seed).entropy if seed is None else seed
+
+    count, mean, m2 = 0, 0.0, 0.0
+    low, high = np.inf, -np.inf
+    for values, unit in _sample_chunks(compiled, uncertain, fixed, samples, chunk_size, seed, unit):
+        values = values[np.isfinite(values)]
+        if not values.size:
+            continue
+        # Chan et al. parallel update of the running mean and sum of squares.
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = count + values.size
+        delta = chunk_mean - mean
+        mean += delta * values.size / total
+        m2 += chunk_m2 + delta ** 2 * count * values.size / total
+        count = total
+        low, high = min(low, values.min()), max(high, values.max())
+    if count == 0:
+        raise ValueError("No sample had a solution.")
+
+    counts = np.zeros(_BINS, dtype=np.int64)
+    edges = np.linspace(low, high, _BINS + 1) if high > low else np.array([low, low + 1.0])
+    if high > low:
+        for values, _ in _sample_chunks(compiled, uncertain, fixed, samples, chunk_size, seed, unit):
+            counts += np.histogram(values[np.isfinite(values)], bins=edges)[0]
+    else:
+        counts = np.array([count])
+    cumulative = np.concatenate([[0], np.cumsum(counts)]) / count
+    levels = {p: float(np.interp(p / 100, cumulative, edges)) for p in percentiles}
+
+    std = float(np.sqrt(m2 / (count - 1))) if count > 1 else 0.0
+    return UncertaintyResult(float(mean), std, levels, unit, count, "monte_carlo")
+
+
+def linearized(compiled, knowns: dict, percentiles=(2.5, 50, 97.5), unit: str = None) -> UncertaintyResult:
+    """
+    First-order propagation: std = sqrt(sum((df/dx * sigma_x) ** 2)), with the
+    derivatives from central differences, all evaluated in one vectorized solve.
+    Percentiles assume the result is normally distributed.
+    """
+    uncertain, fixed = _split(knowns)
+    names = list(uncertain)
+    rows = 1 + 2 * len(names)
+    columns = {}
+    steps = {}
+    for position, var in enumerate(names):
+        known = uncertain[var]
+        step = _std(known) * 1e-3 or abs(known.value) * 1e-6 or 1e-9
+        column = np.full(rows, known.value)
+        column[1 + 2 * position] += step
+        column[2 + 2 * position] -= step
+        columns[var] = (column, known.unit)
+        steps[var] = step
+    for var, (magnitude, known_unit) in fixed.items():
+        columns[var] = (np.full(rows, magnitude), known_unit)
+
+    values, unit = solve_batch(compiled, columns, unit)
+    variance = 0.0
+    for position, var in enumerate(names):
+        derivative = (values[1 + 2 * position] - values[2 + 2 * position]) / (2 * steps[var])
+        variance += (derivative * _std(uncertain[var])) ** 2
+    mean, std = float(values[0]), float(np.sqrt(variance))
+    normal = NormalDist(mean, std) if std > 0 else None
+    levels = {p: normal.inv_cdf(p / 100) if normal else mean for p in percentiles}
+    return UncertaintyResult(mean, std, levels, unit, 0, "linear")
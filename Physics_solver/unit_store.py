@@ -1,8 +1,15 @@
-from pint import UnitRegistry
-from pint.errors import UndefinedUnitError
+from time import perf_counter
+from Physics_solver.cache import LRUCache
+from Physics_solver.metrics import metrics
+from Physics_solver.units import get_registry
 import re
 
-ureg = UnitRegistry()
+# "10kg ± 0.1", "10 +/- 0.1 kg": a value and its uncertainty.
+UNCERTAINTY_PATTERN = re.compile(r"^\s*(?P<value>.+?)\s*(?:±|\+/-|\+-)\s*(?P<error>.+?)\s*$")
+
+# Memo of raw known -> (magnitude, unit). Traffic repeats a handful of strings
+# like "10kg" and "2A", so most knowns skip the regexes and pint entirely.
+unit_cache = LRUCache(maxsize=1024)
 
 def normalize_units(value: str) -> str:
     """
@@ -29,32 +36,74 @@ def normalize_units(value: str) -> str:
         value = re.sub(pattern, replacement, value)
 
     # Optional replacements for aliases
-    value = value.replace("amps", "ampere").replace("amp", "ampere")
+    value = re.sub(r'\bamps?\b', 'ampere', value)
     value = value.replace("Ω", "ohm")
 
     return value.lower()
 
 
+def convert_value(var: str, value) -> tuple:
+    """
+    Converts one raw known such as '10kg' into a (magnitude, unit) pair.
+    Bare numbers get the variable's default unit. Results are memoized on the
+    raw string and the default unit.
+    """
+    key = (str(value), default_units.get(var))
+    converted = unit_cache.get(key)
+    if converted is None:
+        converted = parse_value(var, value)
+        unit_cache.put(key, converted)
+    return converted
+
+
+def parse_value(var: str, value) -> tuple:
+    """convert_value without the memo: every call goes through pint."""
+    from pint.errors import UndefinedUnitError
+
+    try:
+        timed = metrics.enabled
+        start = perf_counter() if timed else 0.0
+        cleaned = normalize_units(str(value))
+
+        # Fallback: attach unit if value is bare number
+        if re.fullmatch(r"\d+(\.\d+)?", cleaned) and var in default_units:
+            cleaned += f" {default_units[var]}"
+
+        parsed = perf_counter() if timed else 0.0
+        qty = get_registry()(cleaned)
+        if timed:
+            metrics.observe("normalize_units", parsed - start)
+            metrics.observe("unit_parse", perf_counter() - parsed)
+        return qty.magnitude, qty.units
+    except UndefinedUnitError as e:
+        raise ValueError(f"Unknown unit in variable '{var}' with value '{value}': {e}")
+    except Exception as e:
+        raise ValueError(f"Error processing variable '{var}' with value '{value}': {e}")
+
+
+def split_uncertainty(value) -> tuple:
+    """
+    Splits '10kg ± 0.1' into ('10kg', '0.1'). Values without an uncertainty
+    come back as (value, None).
+    """
+    match = UNCERTAINTY_PATTERN.match(value) if isinstance(value, str) else None
+    if match is None:
+        return value, None
+    return match.group("value"), match.group("error")
+
+
 class UnitAwareVariableStore:
-    def __init__(self, raw_inputs: dict[str, str]):
+    def __init__(self, raw_inputs: dict[str, str], convert=convert_value):
+        # convert=parse_value skips the memo, e.g. for reference solves.
         self.raw = raw_inputs
         self.converted = {}
+        self.uncertainties = {}  # variable -> raw uncertainty, for values written "10kg ± 0.1"
 
         for var, value in raw_inputs.items():
-            try:
-                cleaned = normalize_units(str(value))
-
-                # Fallback: attach unit if value is bare number
-                if re.fullmatch(r"\d+(\.\d+)?", cleaned) and var in default_units:
-                    cleaned += f" {default_units[var]}"
-
-
-                qty = ureg(cleaned)
-                self.converted[var] = (qty.magnitude, qty.units)
-            except UndefinedUnitError as e:
-                raise ValueError(f"Unknown unit in variable '{var}' with value '{value}': {e}")
-            except Exception as e:
-                raise ValueError(f"Error processing variable '{var}' with value '{value}': {e}")
+            value, error = split_uncertainty(value)
+            if error is not None:
+                self.uncertainties[var] = error
+            self.converted[var] = convert(var, value)
 
     def get_converted(self, var: str):
         return self.converted.get(var.lower(), (None, None))
@@ -0,0 +1,85 @@
+import os
+import threading
+
+# Custom dimensions and aliases used across the solver, layered on top of pint's defaults.
+CUSTOM_DEFINITIONS = (
+    "[voltage] = [mass] * [length] ** 2 / [time] ** 3 / [current]",
+    "A = ampere",  # so "2A" parses as "2 * ampere"
+    "amps = ampere",
+    "ohms = ohm",
+    "Ω = ohm",
+    "kg = kilogram",
+    "J = joule",
+    "N = newton",
+    "W = watt",
+    "C = coulomb",
+)
+
+# Preferred output unit for each well-known variable.
+preferred_units = {
+    "f": "newton",
+    "e": "joule",
+    "p": "watt",
+    "v": "volt",       # For voltage, now defined via [voltage]
+    "q": "coulomb",
+    "t": "second",
+    "m": "kilogram",
+    "a": "meter / second ** 2",
+    "s": "meter",      # displacement
+    "i": "ampere",
+    "r": "ohm"
+}
+
+# Output unit for results of a given dimensionality, checked in this order.
+dimensional_fallbacks = {
+    "[force]": "newton",
+    "[energy]": "joule",
+    "[power]": "watt",
+    "[voltage]": "volt",
+    "[current]": "ampere",
+    "[resistance]": "ohm",
+    "[mass]": "kilogram"
+}
+
+# Where pint keeps its parsed-definitions cache. ":auto:" uses the user cache directory;
+# set PHYSICS_SOLVER_UNIT_CACHE to a folder to move it, or to "off" to disable it.
+cache_folder = os.environ.get("PHYSICS_SOLVER_UNIT_CACHE", ":auto:")
+
+_registry = None
+_lock = threading.Lock()
+
+
+def _build_registry():
+    import pint  # slow to import, so only once a registry is actually needed
+
+    folder = None if cache_folder in ("", "off") else cache_folder
+    registry = pint.UnitRegistry(cache_folder=folder, on_redefinition="ignore")
+    for definition in CUSTOM_DEFINITIONS:
+        registry.define(definition)
+    # Quantities pickled in worker processes unpickle against this registry.
+    pint.set_application_registry(registry)
+    return registry
+
+
+def get_registry():
+    """
+    Returns the process-wide UnitRegistry, building it on first use.
+    With a cache folder set, later processes load the parsed definitions from disk.
+    """
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = _build_registry()
+    return _registry
+
+
+def set_cache_folder(folder):
+    """
+    Sets where the registry cache is saved and loaded from. Must be called before
+    the registry is first used; pass None to disable the disk cache.
+    """
+    global cache_folder
+    if _registry is not None:
+        raise RuntimeError("The unit registry has already been built.")
+    cache_folder = "off" if folder is None else str(folder)
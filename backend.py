@@ -1,53 +1,218 @@
 import logging
-import numpy as np
-import re
-from Physics_solver.unit_store import UnitAwareVariableStore
-from Physics_solver.equation_parser import EquationParser
+from time import perf_counter
+from Physics_solver import profiling
+from Physics_solver.metrics import metrics
+from Physics_solver.oracle import oracle as shared_oracle
+from Physics_solver.profiling import profiled
+from Physics_solver.unit_store import UnitAwareVariableStore, unit_cache
 from Physics_solver.equation_solver import EquationSolver
-from Physics_solver.NLP_processing import NLPProcessor  # <-- External NLP module
-
-# Setup logging
-logging.basicConfig(
-    filename='backend.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from Physics_solver.compiled_equation import compile_equation, equation_cache
+from Physics_solver.chain_solver import plan_cache, solve_chain
+from Physics_solver.NLP_processing import NLPProcessor, NoTemplateError  # <-- External NLP module
 
 class PhysicsAI:
-    def __init__(self):
+    def __init__(self, engine: str = "pint", result_cache=None, profiler=None, oracle=None):
+        # "fast" computes on SI floats and only falls back to pint when it has to.
+        self.engine = engine
         self.nlp = NLPProcessor()
-        self.weights = np.random.rand(5)
+        # Optional ResultCache: repeated problems skip the solve entirely.
+        self.result_cache = result_cache
+        # Samples calls into cProfile/tracemalloc captures; off unless PHYSICS_SOLVER_PROFILE is set.
+        self.profiler = profiler if profiler is not None else profiling.profiler
+        # Re-checks sampled solves against the reference pint pipeline; off unless PHYSICS_SOLVER_ORACLE is set.
+        self.oracle = oracle if oracle is not None else shared_oracle
 
+    @profiled
     def solve_equation(self, equation: str, knowns: dict) -> str:
         """
         Solve the equation using the EquationSolver pipeline.
         """
+        stage = "compile"
+        timed = metrics.enabled  # with metrics off, not even the clock is read
         try:
-            parser = EquationParser(equation)
-            parser.validate_format()
+            start = perf_counter() if timed else 0.0
+            compiled = compile_equation(equation)
+            if timed:
+                compiled_at = perf_counter()
+                metrics.observe("compile", compiled_at - start)
 
+            stage = "knowns"
             store = UnitAwareVariableStore(knowns)
-            solver = EquationSolver(parser, store)
+            if timed:
+                metrics.observe("knowns", perf_counter() - compiled_at)
+
+            key = None
+            if self.result_cache is not None:
+                key = self.result_cache.key(self.engine, compiled.key, store.converted)
+                result = self.result_cache.get(key)
+                if result is not None:
+                    metrics.increment("result_cache_hits")
+                    return self._verify(equation, knowns, result)
+
+            solver = EquationSolver(compiled.parser, store, compiled, engine=self.engine)
             result = solver.solve_equation()
+            if key is not None and not result.startswith("Error"):
+                self.result_cache.put(key, result)
 
-            return result
+            if timed:
+                metrics.observe("solve_equation", perf_counter() - start)
+            return self._verify(equation, knowns, result, solver.solution)
         except Exception as e:
-            logging.error(f"PhysicsAI Error: {e}")
+            # Failures inside the solver are logged there; only compile and knowns errors reach here.
+            metrics.record_error(e)
+            logging.error(f"PhysicsAI Error: {e}", extra={"equation": equation, "stage": stage})
             return f"Error: {str(e)}"
 
+    def _verify(self, equation: str, knowns: dict, result: str, solution: tuple = None) -> str:
+        """
+        Hands a sampled fraction of results to the oracle, with the unrounded
+        solution when there is one (not for cache hits); never changes the result.
+        """
+        if self.oracle.sampled():
+            try:
+                self.oracle.check(equation, knowns, result, self.engine, solution)
+            except Exception as e:
+                logging.error(f"Oracle Error: {e}", extra={"equation": equation, "stage": "oracle"})
+        return result
+
+    @profiled
+    def solve_chain(self, target: str, knowns: dict, equations=None) -> str:
+        """
+        Solve for target through a chain of equations when no single one closes,
+        e.g. p from v and r via v = i * r then p = v * i.
+        Uses the template library's equations unless a list is given.
+        """
+        try:
+            if equations is None:
+                equations = dict.fromkeys(t.equation for t in self.nlp.library.templates)
+            result, _ = solve_chain(equations, knowns, target)
+            return f"{target.lower()} = {round(result.magnitude, 2)} {result.units}"
+        except Exception as e:
+            logging.error(f"Chain Solve Error: {e}", extra={"variable": target, "stage": "chain"})
+            return f"Error: {str(e)}"
+
+    def session(self, equation: str, knowns: dict = None):
+        """
+        A SolveSession for live editing: session.set("m", "12kg") then
+        session.solve() re-converts and re-evaluates only what that known touches.
+        """
+        from Physics_solver.session import SolveSession
+        return SolveSession(equation, knowns)
+
+    @profiled
+    def solve_batch(self, equation: str, knowns_columns: dict, unit: str = None):
+        """
+        Solve one equation over many rows at once.
+        knowns_columns maps each known variable to a NumPy array (in its default unit),
+        a (values, unit) pair or a list of value+unit strings.
+        Returns (values, unit) with the unknown as a NumPy array in a single unit.
+        """
+        from Physics_solver.batch_solver import solve_batch  # NumPy is only needed from here on
+        return solve_batch(compile_equation(equation), knowns_columns, unit)
+
+    def sweep(self, equation: str, knowns: dict, chunk_size: int = 65536, grid: bool = True, unit: str = None):
+        """
+        Solves an equation over ranges of knowns, yielding SweepChunk(start, inputs,
+        values, unit) blocks of at most chunk_size results. Knowns given as arrays,
+        lists or (values, unit) pairs are swept; with grid=True over every combination.
+        """
+        from Physics_solver.sweep import sweep
+        return sweep(compile_equation(equation), knowns, chunk_size, grid, unit)
+
+    @profiled
+    def sweep_to_npy(self, equation: str, knowns: dict, path: str, chunk_size: int = 65536,
+                     grid: bool = True, unit: str = None):
+        """
+        Like sweep, but writes the results into a memory-mapped .npy file shaped
+        like the grid. Returns (memmap, unit).
+        """
+        from Physics_solver.sweep import sweep_to_npy
+        return sweep_to_npy(compile_equation(equation), knowns, path, chunk_size, grid, unit)
+
+    @profiled
+    def propagate_uncertainty(self, equation: str, knowns: dict, samples: int = 100000,
+                              percentiles=(2.5, 50, 97.5), method: str = "monte_carlo",
+                              seed: int = None, unit: str = None, chunk_size: int = 65536):
+        """
+        Solves with uncertain knowns such as "10kg ± 0.1" or
+        {"value": "10kg", "uncertainty": "0.1", "distribution": "uniform"}.
+        Returns UncertaintyResult(mean, std, percentiles, unit, samples, method).
+        method="linear" uses first-order propagation instead of sampling.
+        """
+        from Physics_solver.uncertainty import linearized, monte_carlo
+        compiled = compile_equation(equation)
+        if method == "linear":
+            return linearized(compiled, knowns, percentiles, unit)
+        if method != "monte_carlo":
+            raise ValueError(f"Unknown method '{method}'. Use 'monte_carlo' or 'linear'.")
+        return monte_carlo(compiled, knowns, samples, percentiles, chunk_size, seed, unit)
+
+    def cache_stats(self) -> dict:
+        """
+        Hit/miss/eviction counts for the solver caches, for sizing them.
+        """
+        stats = {"equations": equation_cache.stats(), "units": unit_cache.stats(), "plans": plan_cache.stats()}
+        if self.result_cache is not None:
+            stats["results"] = self.result_cache.stats()
+        return stats
+
+    def register_preferred_unit(self, unit: str, variable: str = None):
+        """
+        Reports a variable in the given unit from now on, e.g. ("km", "s"),
+        or with no variable, every result with that unit's dimension.
+        """
+        from Physics_solver.fast_engine import register_preferred_unit
+        register_preferred_unit(unit, variable)
+
+    def stage_metrics(self) -> dict:
+        """
+        Latency histograms per solve stage and error counts by category.
+        metrics.to_prometheus() gives the same data in Prometheus text format.
+        """
+        return metrics.snapshot()
+
+    @profiled
     def solve_from_natural_language(self, sentence: str) -> str:
         """
         Solve a physics problem from a natural language sentence.
         """
         try:
+            return self.solve_sentence(sentence)
+        except NoTemplateError as e:
+            return str(e)
+
+    @profiled
+    def solve_sentence(self, sentence: str) -> str:
+        """
+        solve_from_natural_language for callers that need to tell the outcomes
+        apart: a sentence no template fits raises NoTemplateError (with the
+        closest matches in its message) instead of coming back as a result.
+        """
+        try:
+            timed = metrics.enabled
+            start = perf_counter() if timed else 0.0
             equation, knowns = self.nlp.parse(sentence)
+            if timed:
+                metrics.observe("nlp_parse", perf_counter() - start)
 
             if not equation:
-                return "Sorry, I couldn't understand the equation from your input."
+                metrics.increment("errors", "no_template")
+                message = "Sorry, I couldn't understand the equation from your input."
+                suggestions = self.nlp.match_templates(sentence)
+                if suggestions:
+                    hints = "; ".join(
+                        f"{match.label} (also needs {', '.join(sorted(match.missing))})" if match.missing
+                        else f"{match.label} (leaves a given value unused)"
+                        for match in suggestions
+                    )
+                    message += f" Closest matches: {hints}."
+                raise NoTemplateError(message)
 
             return self.solve_equation(equation, knowns)
+        except NoTemplateError:
+            raise
         except Exception as e:
-            logging.error(f"NLP Solve Error: {e}")
+            logging.error(f"NLP Solve Error: {e}", extra={"stage": "nlp"})
             return f"Error: {str(e)}"
 
     def predict_missing_value(self, params):
@@ -59,15 +224,17 @@ class PhysicsAI:
             else:
                 return "Error: Not enough data for prediction"
         except Exception as e:
-            logging.error(f"AI Prediction Error: {e}")
+            logging.error(f"AI Prediction Error: {e}", extra={"stage": "prediction"})
             return "Error: Could not compute prediction"
 
     def classify_equation_type(self, text):
-        if "force" in text and "mass" in text and "acceleration" in text:
-            return "Newton's Second Law: F = ma"
-        elif "voltage" in text and "current" in text and "resistance" in text:
-            return "Ohm's Law: V = IR"
-        elif "energy" in text and "mass" in text:
-            return "Einstein's Energy Equation: E = mc^2"
-        else:
-            return "Unknown Equation Type"
+        """
+        Names the equation a piece of text is about, using the template index.
+        A template missing one keyword still counts if at least two were mentioned.
+        """
+        matches = self.nlp.match_templates(text, limit=1)
+        if matches:
+            match = matches[0]
+            if match.complete or (len(match.missing) == 1 and len(match.matched) >= 2):
+                return match.label
+        return "Unknown Equation Type"
@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import islice
+from Physics_solver.log_config import configure_logging
+from workers import create_pool, init_worker, solve_lines
+
+
+def read_chunks(source, chunk_size: int):
+    """Yields (first line number, lines) from a text stream without reading it all in."""
+    first_line = 1
+    while True:
+        lines = list(islice(source, chunk_size))
+        if not lines:
+            return
+        yield first_line, lines
+        first_line += len(lines)
+
+
+def _write(sink, answers):
+    if answers:
+        sink.write("\n".join(answers) + "\n")
+
+
+def run(source, sink, workers: int = None, chunk_size: int = 256, max_in_flight: int = None,
+        ordered: bool = True, engine: str = "pint", cache_path: str = None):
+    """
+    Streams JSONL problems from source to JSONL answers in sink. Chunks of lines go
+    to the worker pool with at most max_in_flight chunks outstanding, so memory stays
+    bounded however long the input is. Each answer carries the "line" it answers,
+    as blank lines get none. Answers come out in input order unless ordered is
+    False, in which case they are written as they finish. workers=0 solves in this
+    process. cache_path names a SQLite result cache shared by the workers.
+    """
+    chunks = read_chunks(source, chunk_size)
+    if workers == 0:
+        init_worker(engine, cache_path=cache_path)
+        for first_line, lines in chunks:
+            _write(sink, solve_lines(lines, first_line))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    pool = create_pool(workers, engine, cache_path)
+    max_in_flight = max_in_flight or 2 * workers
+    try:
+        if ordered:
+            in_flight = deque()
+            for first_line, lines in chunks:
+                if len(in_flight) >= max_in_flight:
+                    _write(sink, in_flight.popleft().result())
+                in_flight.append(pool.submit(solve_lines, lines, first_line))
+            while in_flight:
+                _write(sink, in_flight.popleft().result())
+        else:
+            in_flight = set()
+            for first_line, lines in chunks:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _write(sink, future.result())
+                in_flight.add(pool.submit(solve_lines, lines, first_line))
+            for future in in_flight:
+                _write(sink, future.result())
+    finally:
+        pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Solve JSONL problems: one {\"equation\": ..., \"knowns\": {...}} or {\"sentence\": ...} per line."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file to read (default: stdin).")
+    parser.add_argument("-o", "--output", default="-", help="Where to write JSONL answers (default: stdout).")
+    parser.add_argument("-w", "--workers", type=int, help="Worker processes (default: one per CPU, 0 for none).")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Lines sent to a worker at a time.")
+    parser.add_argument("--max-in-flight", type=int, help="Chunks outstanding at once (default: twice the workers).")
+    parser.add_argument("--unordered", action="store_true", help="Write answers as they finish, not in input order.")
+    parser.add_argument("--engine", choices=("pint", "fast"), default="pint")
+    parser.add_argument("--log-file", default="backend.log")
+    parser.add_argument("--result-cache", help="SQLite file of solved problems shared by the workers.")
+    args = parser.parse_args(argv)
+    configure_logging(args.log_file, multiprocess=True)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        run(source, sink, args.workers, args.chunk_size, args.max_in_flight, not args.unordered, args.engine,
+            args.result_cache)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "corpus.json")
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Snippet timed in a fresh interpreter for the cold-start numbers.
+COLD_START = """
+import time
+start = time.perf_counter()
+import backend
+imported = time.perf_counter()
+backend.PhysicsAI().solve_equation("f = m * a", {"m": "10kg", "a": "2 m/s**2"})
+solved = time.perf_counter()
+print(imported - start, solved - start)
+"""
+
+
+def load_corpus(path: str = CORPUS_FILE) -> dict:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+# In-memory result caches of the PhysicsAI objects being timed, cleared with the rest.
+result_caches = []
+
+
+def clear_caches():
+    """Empties every cache the solve path fills, so --cold-caches times each call from scratch."""
+    from Physics_solver import fast_engine
+    from Physics_solver.chain_solver import plan_cache
+    from Physics_solver.compiled_equation import equation_cache
+    from Physics_solver.numeric_solver import _residuals
+    from Physics_solver.unit_store import unit_cache
+    for cache in (equation_cache, unit_cache, plan_cache, _residuals, fast_engine._unit_signatures,
+                  fast_engine._dimension_checks, fast_engine._base_units):
+        cache.clear()
+    fast_engine.output_units.clear()
+    for cache in result_caches:
+        cache.memory.clear()
+
+
+def time_calls(function, inputs, repeat: int, cold_caches: bool = False) -> list:
+    """Calls function(item) for every input, repeat times, and returns each call's time in seconds."""
+    for item in inputs:
+        function(item)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        for item in inputs:
+            if cold_caches:
+                clear_caches()
+            start = time.perf_counter()
+            function(item)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: list) -> dict:
+    """Median, 95th percentile and mean in microseconds."""
+    ordered = sorted(timings)
+    return {
+        "median_us": statistics.median(ordered) * 1e6,
+        "p95_us": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1e6,
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "calls": len(ordered),
+    }
+
+
+def stage_benchmarks(corpus: dict) -> dict:
+    """name -> (function, inputs) for every pipeline stage."""
+    from backend import PhysicsAI
+    from Physics_solver.NLP_processing import NLPProcessor
+    from Physics_solver.equation_parser import EquationParser
+    from Physics_solver.equation_solver import EquationSolver
+    from Physics_solver.result_cache import ResultCache
+    from Physics_solver.unit_store import UnitAwareVariableStore, normalize_units
+
+    nlp = NLPProcessor()
+    ai = PhysicsAI()
+    fast_ai = PhysicsAI(engine="fast")
+    result_caches[:] = [ResultCache()]
+    cached_ai = PhysicsAI(result_cache=result_caches[0])
+    problems = corpus["problems"]
+
+    def solve(problem):
+        store = UnitAwareVariableStore(problem["knowns"])
+        EquationSolver(EquationParser(problem["equation"]), store).solve_equation()
+
+    return {
+        "nlp_parse": (nlp.parse, corpus["sentences"]),
+        "normalize_units": (normalize_units, corpus["values"]),
+        "variable_store": (lambda problem: UnitAwareVariableStore(problem["knowns"]), problems),
+        "equation_parser": (lambda problem: EquationParser(problem["equation"]), problems),
+        "equation_solver": (solve, problems),
+        "solve_equation": (lambda problem: ai.solve_equation(problem["equation"], problem["knowns"]), problems),
+        "solve_equation_fast": (lambda problem: fast_ai.solve_equation(problem["equation"], problem["knowns"]), problems),
+        "solve_equation_cached": (
+            lambda problem: cached_ai.solve_equation(problem["equation"], problem["knowns"]), problems),
+        "solve_from_natural_language": (ai.solve_from_natural_language, corpus["sentences"]),
+    }
+
+
+def cold_start(runs: int) -> dict:
+    """Times `import backend` and the first solve, each in a new interpreter."""
+    imports, first_solves = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        imports.append(float(output[0]))
+        first_solves.append(float(output[1]))
+    return {"import_backend": summarize(imports), "first_solve": summarize(first_solves)}
+
+
+def run_benchmarks(corpus: dict = None, repeat: int = 50, cold_runs: int = 5,
+                   cold_caches: bool = False, only=None) -> dict:
+    """Runs every stage (or those named in only) and returns the results document."""
+    corpus = corpus or load_corpus()
+    results = {}
+    for name, (function, inputs) in stage_benchmarks(corpus).items():
+        if only and name not in only:
+            continue
+        results[name] = summarize(time_calls(function, inputs, repeat, cold_caches))
+    if cold_runs and (not only or {"import_backend", "first_solve"} & set(only)):
+        results.update(cold_start(cold_runs))
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "cold_caches": cold_caches,
+        },
+        "stages": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25) -> list:
+    """
+    Returns (stage, baseline median, current median, ratio, regressed) for each
+    stage in both documents; regressed means the median grew by more than threshold.
+    """
+    rows = []
+    for name, stats in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before is None:
+            continue
+        ratio = stats["median_us"] / before["median_us"] if before["median_us"] else float("inf")
+        rows.append((name, before["median_us"], stats["median_us"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def print_report(results: dict, rows: list):
+    print(f"{'stage':<30}{'median µs':>12}{'p95 µs':>12}{'baseline':>12}{'ratio':>8}")
+    compared = {row[0]: row for row in rows}
+    for name, stats in results["stages"].items():
+        line = f"{name:<30}{stats['median_us']:>12.1f}{stats['p95_us']:>12.1f}"
+        if name in compared:
+            _, before, _, ratio, regressed = compared[name]
+            line += f"{before:>12.1f}{ratio:>8.2f}" + ("  REGRESSION" if regressed else "")
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each stage of the solver pipeline.")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Results file to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the corpus per stage.")
+    parser.add_argument("--cold-runs", type=int, default=5, help="Fresh interpreters for the cold-start numbers.")
+    parser.add_argument("--cold-caches", action="store_true", help="Clear the solver caches before every call.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Slowdown that counts as a regression.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on a regression.")
+    parser.add_argument("stages", nargs="*", help="Only run these stages.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeat=args.repeat, cold_runs=args.cold_runs,
+                             cold_caches=args.cold_caches, only=args.stages)
+    rows = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            rows = compare(results, json.load(handle), args.threshold)
+    print_report(results, rows)
+
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.fail_on_regression and any(row[4] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import re
+from kivy.clock import Clock
 from kivymd.app import MDApp
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.card import MDCard
@@ -7,8 +8,16 @@ from kivymd.uix.textfield import MDTextField
 from kivymd.uix.label import MDLabel
 from kivymd.uix.scrollview import MDScrollView
 
-from backend import PhysicsAI
-from Physics_solver.NLP_processing import NLPProcessor
+from Physics_solver.log_config import configure_logging
+from Physics_solver.physical_constants import PHYSICAL_CONSTANTS
+from solve_worker import SolveWorker
+
+# Seconds to wait after the last keystroke before re-solving in live mode.
+LIVE_DELAY = 0.4
+
+
+def post_to_ui(callback):
+    Clock.schedule_once(lambda dt: callback())
 
 def preprocess_equation(equation: str) -> str:
     equation = equation.replace("^", "**")
@@ -20,6 +29,10 @@ def preprocess_equation(equation: str) -> str:
 class IntegratedPhysicsSolverApp(MDApp):
     def build(self):
         self.title = "Integrated Physics Solver (with NLP)"
+        # One engine for the whole session, working off the UI thread.
+        self.worker = SolveWorker(post=post_to_ui)
+        self.live_mode = False
+        self._live_event = None
         main_layout = MDBoxLayout(orientation="vertical", padding=20, spacing=20)
         card = MDCard(orientation="vertical", padding=20, spacing=20)
 
@@ -73,6 +86,15 @@ class IntegratedPhysicsSolverApp(MDApp):
         )
         card.add_widget(solve_button)
 
+        # Live mode: re-solve shortly after any field changes
+        self.live_button = MDRaisedButton(
+            text="Live Mode: Off",
+            size_hint=(1, None),
+            height=40,
+            on_release=self.toggle_live_mode
+        )
+        card.add_widget(self.live_button)
+
         # Result label
         self.result_label = MDLabel(
             text="Result will appear here",
@@ -90,8 +112,14 @@ class IntegratedPhysicsSolverApp(MDApp):
             self.result_label.text = "Please enter a sentence first."
             return
 
-        nlp = NLPProcessor()
-        equation, values = nlp.parse(sentence)
+        self.result_label.text = "Parsing..."
+        self.worker.parse(sentence, self.show_parse)
+
+    def show_parse(self, parsed):
+        if isinstance(parsed, str):
+            self.result_label.text = parsed  # an error message
+            return
+        equation, values = parsed
 
         if not equation:
             self.result_label.text = "Could not detect equation. Try another sentence."
@@ -121,7 +149,9 @@ class IntegratedPhysicsSolverApp(MDApp):
         processed_eq = preprocess_equation(raw_eq)
         self.processed_equation = processed_eq
         self.fields_box.clear_widgets()
-        self.variables = list(set(re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', processed_eq)))
+        # Physical constants such as c and G get no field: their value is built in.
+        names = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', processed_eq)
+        self.variables = list(set(name for name in names if name not in PHYSICAL_CONSTANTS))
 
         for var in self.variables:
             tf = MDTextField(
@@ -130,11 +160,12 @@ class IntegratedPhysicsSolverApp(MDApp):
                 height=40
             )
             tf.variable_name = var
+            tf.bind(text=self.on_field_edit)
             self.fields_box.add_widget(tf)
 
         self.result_label.text = "Fields generated. Enter known values, leave one blank."
 
-    def solve_equation_ui(self, instance):
+    def solve_equation_ui(self, instance, live=False):
         if not hasattr(self, "processed_equation"):
             self.result_label.text = "Please generate fields first."
             return
@@ -148,14 +179,35 @@ class IntegratedPhysicsSolverApp(MDApp):
 
         missing = [v for v in self.variables if v.lower() not in knowns]
         if len(missing) != 1:
-            self.result_label.text = f"Exactly one variable must be left blank. Found {len(missing)} missing."
+            if not live:
+                self.result_label.text = f"Exactly one variable must be left blank. Found {len(missing)} missing."
+            self.worker.cancel("solve")
+            return
+
+        if not live:
+            self.result_label.text = "Solving..."
+        self.worker.solve_equation(self.processed_equation, knowns, self.show_result)
+
+    def show_result(self, result):
+        self.result_label.text = result
+
+    def toggle_live_mode(self, instance):
+        self.live_mode = not self.live_mode
+        self.live_button.text = f"Live Mode: {'On' if self.live_mode else 'Off'}"
+        if self.live_mode:
+            self.on_field_edit()
+
+    def on_field_edit(self, *args):
+        if not self.live_mode:
             return
+        # Debounce: only the last edit in a burst of typing triggers a solve.
+        if self._live_event is not None:
+            self._live_event.cancel()
+        self._live_event = Clock.schedule_once(lambda dt: self.solve_equation_ui(None, live=True), LIVE_DELAY)
 
-        try:
-            result = PhysicsAI().solve_equation(self.processed_equation, knowns)
-            self.result_label.text = result
-        except Exception as e:
-            self.result_label.text = f"Error: {str(e)}"
+    def on_stop(self):
+        self.worker.shutdown()
 
 if __name__ == "__main__":
+    configure_logging("backend.log")
     IntegratedPhysicsSolverApp().run()
@@ -0,0 +1,65 @@
+import argparse
+import json
+import logging
+import sys
+import warnings
+from collections import Counter
+from backend import PhysicsAI
+from Physics_solver.oracle import Oracle, ProblemGenerator
+from Physics_solver.session import SolveSession
+
+ENGINES = ("pint", "fast", "session")
+
+
+def stress(problems, engines=("fast",), path: str = None, rel_tol: float = 1e-9) -> Counter:
+    """
+    Solves every problem on each engine, checking every answer with the oracle.
+    Returns counts of (engine, "agree" / "diverge").
+    """
+    oracle = Oracle(1.0, path, rel_tol)
+    solvers = {engine: PhysicsAI(engine=engine, oracle=oracle) for engine in engines if engine != "session"}
+    for problem in problems:
+        for engine in engines:
+            if engine == "session":
+                session = SolveSession(problem["equation"], problem["knowns"])
+                result = session.solve()
+                oracle.check(problem["equation"], problem["knowns"], result, engine, session.solution)
+            else:
+                solvers[engine].solve_equation(problem["equation"], problem["knowns"])  # checked in PhysicsAI
+    return oracle.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check solve paths against an independent reference solve on random equations."
+    )
+    parser.add_argument("-n", "--count", type=int, default=1000, help="Problems to generate.")
+    parser.add_argument("--seed", type=int, help="Seed for a repeatable run.")
+    parser.add_argument("--max-depth", type=int, default=3, help="Nesting depth of the generated expressions.")
+    parser.add_argument("--engine", action="append", choices=ENGINES,
+                        help="Solve path to check; repeat for several (default: fast).")
+    parser.add_argument("--divergences", default="oracle_divergences.jsonl", help="Where divergences are appended.")
+    parser.add_argument("--rel-tol", type=float, default=1e-9)
+    parser.add_argument("--emit", action="store_true",
+                        help="Only print the generated problems as JSONL, e.g. for batch_runner.py.")
+    args = parser.parse_args(argv)
+
+    problems = ProblemGenerator(args.seed, args.max_depth).problems(args.count)
+    if args.emit:
+        for problem in problems:
+            sys.stdout.write(json.dumps(problem) + "\n")
+        return
+
+    # The random problems fail often (overflow, roots of negatives...); only divergences matter here.
+    logging.disable(logging.ERROR)
+    warnings.simplefilter("ignore")
+    counts = stress(problems, args.engine or ["fast"], args.divergences, args.rel_tol)
+    for engine in args.engine or ["fast"]:
+        print(f"{engine}: {counts[engine, 'agree']} agree, {counts[engine, 'diverge']} diverge")
+    if any(count for (_, outcome), count in counts.items() if outcome == "diverge"):
+        print(f"Divergences written to {args.divergences}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import glob
+import json
+import os
+import pstats
+import sys
+
+
+def load_captures(directory: str, stage: str = None) -> list:
+    """Reads every capture's .json tags, adding the path of its .prof file."""
+    captures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as handle:
+            capture = json.load(handle)
+        if stage and capture.get("stage") != stage:
+            continue
+        capture["profile"] = path[:-len(".json")] + ".prof"
+        captures.append(capture)
+    return captures
+
+
+def hot_functions(captures: list, top: int = 20, sort: str = "tottime") -> list:
+    """
+    Merges the cProfile data of every capture. Returns the top functions as
+    dicts with calls, tottime and cumtime summed over all captures.
+    """
+    profiles = [capture["profile"] for capture in captures if os.path.exists(capture["profile"])]
+    if not profiles:
+        return []
+    stats = pstats.Stats(*profiles)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({"function": f"{name} ({filename}:{line})", "calls": calls,
+                     "tottime": tottime, "cumtime": cumtime})
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    return rows[:top]
+
+
+def allocation_sites(captures: list, top: int = 20) -> list:
+    """Allocation sites summed over every capture, largest first."""
+    sites = {}
+    for capture in captures:
+        for site in capture.get("allocations", []):
+            key = f"{site['file']}:{site['line']}"
+            total = sites.setdefault(key, {"site": key, "size": 0, "count": 0, "captures": 0})
+            total["size"] += site["size"]
+            total["count"] += site["count"]
+            total["captures"] += 1
+    return sorted(sites.values(), key=lambda site: site["size"], reverse=True)[:top]
+
+
+def report(captures: list, top: int = 20, sort: str = "tottime") -> dict:
+    slowest = sorted(captures, key=lambda capture: capture["seconds"], reverse=True)[:top]
+    return {
+        "captures": len(captures),
+        "slowest": [{key: capture.get(key) for key in ("seconds", "stage", "peak_memory", "input", "profile")}
+                    for capture in slowest],
+        "hot_functions": hot_functions(captures, top, sort),
+        "allocation_sites": allocation_sites(captures, top),
+    }
+
+
+def format_report(summary: dict) -> str:
+    lines = [f"{summary['captures']} captures", "", "Slowest calls:"]
+    for capture in summary["slowest"]:
+        text = json.dumps(capture["input"])
+        text = text if len(text) <= 100 else text[:97] + "..."
+        lines.append(f"  {capture['seconds'] * 1000:9.2f} ms  {capture['stage']:<28} {text}")
+    lines += ["", "Hot functions:", f"  {'tottime':>9} {'cumtime':>9} {'calls':>8}  function"]
+    for row in summary["hot_functions"]:
+        lines.append(f"  {row['tottime']:9.4f} {row['cumtime']:9.4f} {row['calls']:8d}  {row['function']}")
+    lines += ["", "Allocation sites:", f"  {'KiB':>10} {'blocks':>8} {'captures':>8}  site"]
+    for site in summary["allocation_sites"]:
+        lines.append(f"  {site['size'] / 1024:10.1f} {site['count']:8d} {site['captures']:8d}  {site['site']}")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Merge PhysicsAI profile captures (PHYSICS_SOLVER_PROFILE) into hot functions and allocation sites."
+    )
+    parser.add_argument("directory", nargs="?", default="profiles", help="Where the captures were written.")
+    parser.add_argument("--stage", help="Only captures of this PhysicsAI method, e.g. solve_equation.")
+    parser.add_argument("--top", type=int, default=20, help="Rows per section.")
+    parser.add_argument("--sort", choices=("tottime", "cumtime", "calls"), default="tottime")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    summary = report(load_captures(args.directory, args.stage), args.top, args.sort)
+    sys.stdout.write(json.dumps(summary, indent=2) + "\n" if args.json else format_report(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import json
+import logging
+from Physics_solver.log_config import configure_logging
+from workers import create_pool, solve_many
+
+MAX_BODY = 16 * 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+}
+
+
+class SolveServer:
+    """
+    JSON over HTTP for PhysicsAI. Solves run in a pool of warm worker processes;
+    at most max_pending problems are queued or running, anything beyond that is
+    turned away with a 429 so clients can back off (a 413 for a batch larger
+    than max_pending on its own).
+
+        POST /solve_equation               {"equation": "f = m * a", "knowns": {"m": "10kg", "a": "2 m/s**2"}}
+        POST /solve_from_natural_language  {"sentence": "Find the force when mass is 10kg and ..."}
+        POST /batch                        {"problems": [<either of the above>, ...]}
+        GET  /health
+    """
+
+    def __init__(self, pool, max_pending: int = 1024, chunk_size: int = 64):
+        self.pool = pool
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self.pending = 0
+
+    async def solve(self, problems: list) -> list:
+        """Splits problems into chunks and solves the chunks in parallel on the pool."""
+        loop = asyncio.get_running_loop()
+        chunks = [problems[i:i + self.chunk_size] for i in range(0, len(problems), self.chunk_size)]
+        results = await asyncio.gather(*(loop.run_in_executor(self.pool, solve_many, chunk) for chunk in chunks))
+        return [answer for chunk in results for answer in chunk]
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        """Returns (status, JSON-able payload) for one request."""
+        if path == "/health":
+            return 200, {"status": "ok", "pending": self.pending, "max_pending": self.max_pending}
+        if path not in ("/solve_equation", "/solve_from_natural_language", "/batch"):
+            return 404, {"error": f"No such endpoint: {path}"}
+        if method != "POST":
+            return 405, {"error": f"{path} only accepts POST"}
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+
+        if path == "/batch":
+            problems = payload.get("problems") if isinstance(payload, dict) else None
+            if not isinstance(problems, list):
+                return 400, {"error": "Expected {\"problems\": [...]}"}
+        else:
+            if not isinstance(payload, dict):
+                return 400, {"error": "Expected a JSON object"}
+            field = "sentence" if path == "/solve_from_natural_language" else "equation"
+            if field not in payload:
+                return 400, {"error": f"Missing '{field}'"}
+            problems = [{key: payload[key] for key in (field, "knowns", "id") if key in payload}]
+
+        if len(problems) > self.max_pending:
+            # Would never fit, however long the client backs off.
+            return 413, {"error": f"Batch of {len(problems)} exceeds the limit of {self.max_pending}"}
+        if self.pending + len(problems) > self.max_pending:
+            return 429, {"error": "Server busy, retry later", "pending": self.pending}
+        self.pending += len(problems)
+        try:
+            results = await self.solve(problems)
+        finally:
+            self.pending -= len(problems)
+        return 200, ({"results": results} if path == "/batch" else results[0])
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves HTTP/1.1 requests on one connection, keeping it open between them."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Malformed request line"}, close=True)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                close = headers.get("connection", "").lower() == "close"
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Invalid Content-Length"}, close=True)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {"error": "Request body too large"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method.upper(), path.split("?", 1)[0], body)
+                await self.respond(writer, status, payload, close=close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logging.error(f"Server Error: {e}", extra={"stage": "server"})
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer: asyncio.StreamWriter, status: int, payload, close: bool = False):
+        body = json.dumps(payload).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'close' if close else 'keep-alive'}",
+        ]
+        if status == 429:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8080, unix_path: str = None,
+                workers: int = None, max_pending: int = 1024, engine: str = "pint", cache_path: str = None):
+    pool = create_pool(workers, engine, cache_path)
+    app = SolveServer(pool, max_pending=max_pending)
+    try:
+        if unix_path:
+            server = await asyncio.start_unix_server(app.handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(app.handle, host, port)
+        address = unix_path or f"http://{host}:{port}"
+        print(f"Physics solver listening on {address}")
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON solver service for PhysicsAI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="Listen on this Unix socket path instead of TCP.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--max-pending", type=int, default=1024, help="Problems queued or running before 429s.")
+    parser.add_argument("--engine", choices=("pint", "fast"), default="pint")
+    parser.add_argument("--log-file", default="backend.log")
+    parser.add_argument("--result-cache", help="SQLite file of solved problems shared by the workers.")
+    args = parser.parse_args(argv)
+    configure_logging(args.log_file, multiprocess=True)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.max_pending, args.engine,
+                          args.result_cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from backend import PhysicsAI
+from Physics_solver.compiled_equation import normalize_equation
+
+
+class SolveWorker:
+    """
+    Runs PhysicsAI calls for the UI on one background thread, sharing one
+    long-lived engine. Results are handed to post(callback), which should run
+    the callback on the UI thread (Clock.schedule_once in the Kivy app).
+
+    Each channel ("solve", "parse") only cares about its latest request: a newer
+    submit makes older queued requests skip their work and older results get
+    dropped instead of overwriting newer ones. A solve already running is left
+    to finish, since pint calls cannot be interrupted.
+    """
+
+    def __init__(self, post=None, engine: str = "pint"):
+        self.post = post or (lambda callback: callback())
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="physics-solver")
+        self.ai = None
+        self.session = None  # kept between solves of the same equation, see solve_equation
+        self._generations = {}
+        self._lock = threading.Lock()
+        # Build the engine and unit registry now, before the first click needs them.
+        self.ready = self.executor.submit(self._start, engine)
+
+    def _start(self, engine: str):
+        self.ai = PhysicsAI(engine=engine)
+        self.ai.solve_equation("f = m * a", {"m": "1kg", "a": "1 m/s**2"})
+
+    def _current(self, channel: str, generation: int) -> bool:
+        return self._generations.get(channel) == generation
+
+    def submit(self, channel: str, task, callback):
+        """
+        Runs task() on the worker thread and posts callback(result) unless a newer
+        request on the same channel came in meanwhile. Exceptions become "Error: ..." results.
+        """
+        with self._lock:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+
+        def deliver(result):
+            if self._current(channel, generation):
+                callback(result)
+
+        def run():
+            if not self._current(channel, generation):
+                return  # superseded while waiting in the queue
+            try:
+                result = task()
+            except Exception as e:
+                result = f"Error: {str(e)}"
+            if self._current(channel, generation):
+                self.post(lambda: deliver(result))
+
+        return self.executor.submit(run)
+
+    def cancel(self, channel: str):
+        """Drops every queued and in-flight request on a channel."""
+        with self._lock:
+            self._generations[channel] = self._generations.get(channel, 0) + 1
+
+    def _solve(self, equation: str, knowns: dict) -> str:
+        # Edits usually change one field of the same equation: only that known is redone.
+        if self.session is None or self.session.equation != normalize_equation(equation):
+            self.session = self.ai.session(equation, knowns)
+        else:
+            self.session.update(knowns)
+        return self.session.solve()
+
+    def solve_equation(self, equation: str, knowns: dict, callback):
+        return self.submit("solve", lambda: self._solve(equation, knowns), callback)
+
+    def parse(self, sentence: str, callback):
+        """Posts callback((equation, values)) from the NLP parser."""
+        return self.submit("parse", lambda: self.ai.nlp.parse(sentence), callback)
+
+    def shutdown(self):
+        for channel in list(self._generations):
+            self.cancel(channel)
+        self.executor.shutdown(wait=False)
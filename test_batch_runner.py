@@ -0,0 +1,45 @@
+import io
+import json
+from batch_runner import read_chunks, run
+
+LINES = [
+    json.dumps({"equation": "f = m * a", "knowns": {"m": "10kg", "a": "2 m/s**2"}}),
+    "{not json",
+    "",
+    json.dumps({"sentence": "Power when energy is 100J and time is 5s", "id": "p"}),
+    json.dumps({"equation": "f = m * a", "knowns": {}}),
+]
+
+
+def _run(**options):
+    sink = io.StringIO()
+    run(io.StringIO("\n".join(LINES) + "\n"), sink, chunk_size=2, **options)
+    return [json.loads(line) for line in sink.getvalue().splitlines()]
+
+
+def test_read_chunks_numbers_lines():
+    chunks = list(read_chunks(io.StringIO("a\nb\nc\n"), 2))
+    assert [(first, len(lines)) for first, lines in chunks] == [(1, 2), (3, 1)]
+
+
+def test_answers_in_input_order_with_inline_errors():
+    answers = _run(workers=0)
+    assert len(answers) == 4
+    assert answers[0] == {"result": "f = 20.0 newton", "line": 1}
+    assert answers[1]["error"].startswith("Invalid JSON")
+    assert answers[2] == {"result": "p = 20.0 watt", "id": "p", "line": 4}
+    assert "error" in answers[3]
+
+
+def test_ordered_answers_name_their_line_past_blank_lines():
+    assert [answer["line"] for answer in _run(workers=0)] == [1, 2, 4, 5]
+    assert [answer["line"] for answer in _run(workers=2)] == [1, 2, 4, 5]
+
+
+def test_worker_pool_matches_in_process_run():
+    assert _run(workers=2) == _run(workers=0)
+
+
+def test_unordered_answers_carry_line_numbers():
+    answers = sorted(_run(workers=2, ordered=False), key=lambda answer: answer["line"])
+    assert [answer["line"] for answer in answers] == [1, 2, 4, 5]
@@ -0,0 +1,33 @@
+from benchmarks.run import compare, run_benchmarks
+
+
+def test_every_stage_is_timed():
+    results = run_benchmarks(repeat=1, cold_runs=0)
+    assert set(results["stages"]) >= {
+        "nlp_parse", "normalize_units", "variable_store", "equation_parser",
+        "equation_solver", "solve_equation", "solve_from_natural_language",
+    }
+    assert all(stats["median_us"] > 0 for stats in results["stages"].values())
+
+
+def test_compare_flags_slowdowns():
+    baseline = {"stages": {"a": {"median_us": 10.0}, "b": {"median_us": 10.0}}}
+    current = {"stages": {"a": {"median_us": 11.0}, "b": {"median_us": 20.0}, "c": {"median_us": 1.0}}}
+    rows = compare(current, baseline, threshold=0.25)
+    assert [(name, regressed) for name, _, _, _, regressed in rows] == [("a", False), ("b", True)]
+
+
+def test_clear_caches_empties_every_solver_cache():
+    from backend import PhysicsAI
+    from benchmarks import run
+    from Physics_solver import fast_engine
+    from Physics_solver.compiled_equation import equation_cache
+    from Physics_solver.result_cache import ResultCache
+
+    cache = ResultCache()
+    run.result_caches[:] = [cache]
+    PhysicsAI(engine="fast", result_cache=cache).solve_equation("t = s / v", {"s": "100 km", "v": "50 km/hour"})
+    run.clear_caches()
+    for lru in (equation_cache, cache.memory, fast_engine._dimension_checks, fast_engine._unit_signatures):
+        assert lru.stats()["size"] == 0
+    assert not fast_engine.output_units.by_variable
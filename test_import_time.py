@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+
+# Cold `import backend` must stay under this many seconds.
+IMPORT_BUDGET = 0.15
+
+PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import backend
+elapsed = time.perf_counter() - start
+backend.PhysicsAI()
+from Physics_solver import units
+print(json.dumps({
+    "seconds": elapsed,
+    "heavy": sorted(name for name in ("numpy", "pint") if name in sys.modules),
+    "handlers": len(logging.getLogger().handlers),
+    "registry": units._registry is not None,
+}))
+"""
+
+
+def _probe():
+    root = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=root, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout)
+
+
+def test_import_has_no_side_effects():
+    result = _probe()
+    assert result["heavy"] == []
+    assert result["handlers"] == 0
+    assert not result["registry"]
+
+
+def test_import_time_budget():
+    fastest = min(_probe()["seconds"] for _ in range(3))
+    assert fastest < IMPORT_BUDGET, f"import backend took {fastest:.3f}s (budget {IMPORT_BUDGET}s)"
@@ -0,0 +1,16 @@
+import json
+from oracle_stress import main, stress
+from Physics_solver.oracle import ProblemGenerator
+
+
+def test_stress_counts_each_engine(tmp_path):
+    problems = list(ProblemGenerator(seed=5).problems(20))
+    counts = stress(problems, ("pint", "session"), str(tmp_path / "divergences.jsonl"))
+    assert counts["pint", "agree"] + counts["pint", "diverge"] == 20
+    assert counts["session", "agree"] + counts["session", "diverge"] == 20
+
+
+def test_emit_prints_batch_runner_problems(capsys):
+    main(["-n", "3", "--seed", "2", "--emit"])
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == list(ProblemGenerator(seed=2).problems(3))
@@ -0,0 +1,17 @@
+from backend import PhysicsAI
+from Physics_solver.profiling import Profiler
+from profile_report import format_report, load_captures, report
+
+
+def test_report_merges_captures(tmp_path):
+    ai = PhysicsAI(profiler=Profiler(rate=1.0, directory=str(tmp_path)))
+    for mass in ("1kg", "2kg", "3kg"):
+        ai.solve_equation("f = m * a", {"m": mass, "a": "2 m/s**2"})
+    ai.solve_chain("p", {"v": "10V", "r": "5ohm"})
+
+    summary = report(load_captures(str(tmp_path), stage="solve_equation"), top=5)
+    assert summary["captures"] == 3
+    assert summary["slowest"][0]["input"]["equation"] == "f = m * a"
+    assert len(summary["hot_functions"]) == 5
+    assert all(site["captures"] >= 1 for site in summary["allocation_sites"])
+    assert "Hot functions:" in format_report(summary)
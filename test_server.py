@@ -0,0 +1,107 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from server import SolveServer
+from workers import init_worker, solve_problem
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # Threads stand in for worker processes; the request handling is the same.
+    with ThreadPoolExecutor(max_workers=2, initializer=init_worker) as executor:
+        yield executor
+
+
+def _request(app, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    return asyncio.run(app.dispatch(method, path, body))
+
+
+def test_solve_problem_forms():
+    assert solve_problem({"equation": "f = m * a", "knowns": {"m": "10kg", "a": "2 m/s**2"}}) == {"result": "f = 20.0 newton"}
+    assert solve_problem({"sentence": "Calculate voltage if current is 2A and resistance is 5ohm", "id": 7}) == {
+        "result": "v = 10.0 volt", "id": 7,
+    }
+    assert "error" in solve_problem({"equation": "f = m * a", "knowns": {}})
+    assert "error" in solve_problem({"knowns": {}})
+    unmatched = solve_problem({"sentence": "Find the mass when object is flying"})
+    assert unmatched["error"].startswith("Sorry, I couldn't understand the equation")
+
+
+def test_single_and_batch_endpoints(pool):
+    app = SolveServer(pool)
+    status, answer = _request(app, "POST", "/solve_equation", {"equation": "p = e / t", "knowns": {"e": "100J", "t": "5s"}})
+    assert (status, answer) == (200, {"result": "p = 20.0 watt"})
+
+    problems = [{"equation": "f = m * a", "knowns": {"m": f"{n}kg", "a": "2 m/s**2"}, "id": n} for n in range(1, 6)]
+    app.chunk_size = 2
+    status, answer = _request(app, "POST", "/batch", {"problems": problems})
+    assert status == 200
+    assert [r["id"] for r in answer["results"]] == [1, 2, 3, 4, 5]
+    assert answer["results"][4]["result"] == "f = 10.0 newton"
+
+
+def test_bad_requests(pool):
+    app = SolveServer(pool)
+    assert _request(app, "POST", "/nowhere", {})[0] == 404
+    assert _request(app, "GET", "/batch")[0] == 405
+    assert _request(app, "POST", "/solve_from_natural_language", {"text": "hi"})[0] == 400
+    assert asyncio.run(app.dispatch("POST", "/batch", b"{not json"))[0] == 400
+
+
+def test_rejects_when_full(pool):
+    app = SolveServer(pool, max_pending=3)
+    app.pending = 2
+    problems = [{"sentence": "Power when energy is 100J and time is 5s"}] * 2
+    status, answer = _request(app, "POST", "/batch", {"problems": problems})
+    assert status == 429
+    assert app.pending == 2
+
+
+def test_rejects_batches_that_can_never_fit(pool):
+    app = SolveServer(pool, max_pending=3)
+    problems = [{"sentence": "Power when energy is 100J and time is 5s"}] * 4
+    status, answer = _request(app, "POST", "/batch", {"problems": problems})
+    assert status == 413
+    assert app.pending == 0
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length(pool, length):
+    async def exchange():
+        app = SolveServer(pool)
+        server = await asyncio.start_server(app.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /batch HTTP/1.1\r\nHost: x\r\nContent-Length: " + length + b"\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    assert asyncio.run(exchange()).startswith(b"HTTP/1.1 400")
+
+
+def test_http_round_trip(pool):
+    async def exchange():
+        app = SolveServer(pool)
+        server = await asyncio.start_server(app.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps({"sentence": "Find the force when mass is 10kg and acceleration is 2m/s^2"}).encode()
+        writer.write(
+            b"POST /solve_from_natural_language HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(exchange())
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200")
+    assert json.loads(body) == {"result": "f = 20.0 newton"}
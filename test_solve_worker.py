@@ -0,0 +1,57 @@
+import threading
+from solve_worker import SolveWorker
+
+
+def test_results_are_posted_back():
+    posted = []
+    worker = SolveWorker(post=lambda callback: (posted.append(callback), callback()))
+    done = threading.Event()
+    results = []
+    worker.solve_equation("f = m * a", {"m": "10kg", "a": "2 m/s**2"}, lambda r: (results.append(r), done.set()))
+    assert done.wait(10)
+    assert results == ["f = 20.0 newton"]
+    assert posted  # went through post, not called directly
+    worker.shutdown()
+
+
+def test_newer_requests_supersede_older_ones():
+    worker = SolveWorker()
+    gate = threading.Event()
+    worker.submit("solve", gate.wait, lambda r: None)  # keep the thread busy
+    results = []
+    worker.submit("solve", lambda: "old", results.append)
+    last = worker.submit("solve", lambda: "new", results.append)
+    gate.set()
+    last.result(10)
+    assert results == ["new"]
+    worker.shutdown()
+
+
+def test_cancel_drops_in_flight_result():
+    worker = SolveWorker()
+    worker.ready.result(10)
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait()
+        return "stale"
+
+    future = worker.submit("solve", slow, results.append)
+    started.wait(10)
+    worker.cancel("solve")
+    release.set()
+    future.result(10)
+    assert results == []
+    worker.shutdown()
+
+
+def test_parse_uses_the_shared_engine():
+    worker = SolveWorker()
+    results = []
+    worker.parse("Power when energy is 100J and time is 5s", results.append).result(10)
+    equation, values = results[0]
+    assert equation == "p = e / t"
+    assert values == {"e": "100j", "t": "5s"}
+    worker.shutdown()
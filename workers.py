@@ -0,0 +1,106 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from backend import PhysicsAI
+from Physics_solver.compiled_equation import compile_equation
+from Physics_solver.log_config import attach_worker, log_queue
+from Physics_solver.NLP_processing import NoTemplateError
+from Physics_solver.result_cache import ResultCache
+from Physics_solver.units import get_registry
+
+# The solver owned by this worker process, built once by init_worker.
+_ai = None
+
+
+def init_worker(engine: str = "pint", queue=None, cache_path: str = None):
+    """
+    Runs once in every worker: builds the PhysicsAI object, the unit registry and
+    every template equation rearranged for each of its variables, so the first
+    real problem a worker sees is as fast as the rest. Log records go to the
+    parent's queue when one is given; with cache_path, workers share one
+    SQLite result cache.
+    """
+    global _ai
+    if queue is not None:
+        attach_worker(queue)
+    result_cache = ResultCache(cache_path) if cache_path else None
+    _ai = PhysicsAI(engine=engine, result_cache=result_cache)
+    get_registry()
+    for template in _ai.nlp.library.templates:
+        compiled = compile_equation(template.equation)
+        for var in dict.fromkeys(compiled.parser.variables):
+            try:
+                compiled.solve_for(var)
+            except ValueError:
+                pass
+
+
+def solve_problem(problem) -> dict:
+    """
+    Solves one JSON problem: {"equation": ..., "knowns": {...}} or {"sentence": ...}.
+    Returns {"result": ...} or {"error": ...}, carrying over an "id" field if given.
+    """
+    if _ai is None:
+        init_worker()
+    if not isinstance(problem, dict):
+        return {"error": "Each problem must be a JSON object."}
+
+    if "sentence" in problem:
+        try:
+            result = _ai.solve_sentence(str(problem["sentence"]))
+        except NoTemplateError as e:
+            result = f"Error: {e}"
+    elif "equation" in problem:
+        knowns = problem.get("knowns", {})
+        if not isinstance(knowns, dict):
+            result = "Error: 'knowns' must be an object of variable -> value."
+        else:
+            result = _ai.solve_equation(str(problem["equation"]), {var: str(value) for var, value in knowns.items()})
+    else:
+        result = "Error: A problem needs an 'equation' with 'knowns', or a 'sentence'."
+
+    answer = {"error": result[len("Error: "):]} if result.startswith("Error: ") else {"result": result}
+    if "id" in problem:
+        answer["id"] = problem["id"]
+    return answer
+
+
+def solve_many(problems) -> list:
+    """Solves a list of problems in one call, so a batch costs one round trip to a worker."""
+    return [solve_problem(problem) for problem in problems]
+
+
+def solve_lines(lines, first_line: int = 1) -> list:
+    """
+    Solves JSONL records and returns the answers as JSON strings, each with the
+    "line" number it answers (lines counted from first_line). Blank lines are
+    skipped; a line that is not valid JSON gets an inline error instead of
+    stopping the run.
+    """
+    answers = []
+    for number, line in enumerate(lines, first_line):
+        if not line.strip():
+            continue
+        try:
+            answer = solve_problem(json.loads(line))
+        except ValueError as e:
+            answer = {"error": f"Invalid JSON: {e}"}
+        answer["line"] = number
+        answers.append(json.dumps(answer))
+    return answers
+
+
+def _ready():
+    return os.getpid()
+
+
+def create_pool(workers: int = None, engine: str = "pint", cache_path: str = None) -> ProcessPoolExecutor:
+    """
+    Starts a process pool and waits until every worker has run init_worker,
+    so no request pays for the start-up.
+    """
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(engine, log_queue(), cache_path))
+    for future in [pool.submit(_ready) for _ in range(workers)]:
+        future.result()
+    return pool